@@ -0,0 +1,4 @@
+"""Benchmarks for pymammotion built on recorded mower frames.
+
+Run every suite with ``python -m benchmarks``, or a single one with ``python -m benchmarks.<suite>``.
+"""
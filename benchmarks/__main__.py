@@ -0,0 +1,96 @@
+"""Run the benchmarks and write the results as JSON.
+
+Run with ``python -m benchmarks [--suite NAME ...] [--number N] [--output FILE]``.
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any, Callable
+
+from google.protobuf.internal import api_implementation
+
+from benchmarks import (
+    cloud_commands,
+    commands,
+    coordinates,
+    coverage,
+    decode,
+    hash_list,
+    map_sync,
+    mqtt,
+    raw_data,
+    replay,
+    simulator,
+    spatial,
+    state_manager,
+    telemetry,
+)
+
+SUITES: dict[str, Callable[..., dict[str, Any]]] = {
+    "decode": decode.run,
+    "state_manager": state_manager.run,
+    "raw_data": raw_data.run,
+    "hash_list": hash_list.run,
+    "coordinates": coordinates.run,
+    "spatial": spatial.run,
+    "coverage": coverage.run,
+    "telemetry": telemetry.run,
+    "commands": commands.run,
+    "mqtt": mqtt.run,
+    "cloud_commands": cloud_commands.run,
+    "map_sync": map_sync.run,
+    "replay": replay.run,
+    "simulator": simulator.run,
+}
+
+
+def _version() -> str:
+    """Installed pymammotion version, if it is installed at all."""
+    try:
+        return metadata.version("pymammotion")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def run(suites: list[str], number: int | None = None) -> dict[str, Any]:
+    """Run the suites, number overrides the iterations each suite defaults to."""
+    results: dict[str, Any] = {
+        "meta": {
+            "pymammotion": _version(),
+            "python": platform.python_version(),
+            "protobuf": api_implementation.Type(),
+            "machine": platform.machine(),
+            "time": datetime.now(timezone.utc).isoformat(),
+        }
+    }
+    kwargs = {} if number is None else {"number": number}
+    # some command builders print, keep stdout for the JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        for suite in suites:
+            results[suite] = SUITES[suite](**kwargs)
+    return results
+
+
+def main() -> None:
+    """Parse the arguments, run the suites and write the JSON."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run, all when omitted")
+    parser.add_argument("--number", type=int, help="iterations per measurement")
+    parser.add_argument("--output", help="write the JSON to this file instead of stdout")
+    args = parser.parse_args()
+
+    output = json.dumps(run(args.suite or list(SUITES), args.number), indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Aggregate command throughput of one account against a local fake gateway.
+
+Run with ``python -m benchmarks.cloud_commands``.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from pymammotion.mammotion.commands.mammotion_command import MammotionCommand
+from pymammotion.mammotion.devices.mammotion_cloud import DEFAULT_MAX_IN_FLIGHT, MammotionCloud
+from pymammotion.proto.wire import expected_response
+
+# round trip of a command through the cloud and the mower
+LATENCY = 0.02
+
+
+class FakeGateway:
+    """Answer every command with its expected response after LATENCY."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Create a gateway answering on loop."""
+        self.loop = loop
+        self.cloud: MammotionCloud | None = None
+
+    def send_cloud_command(self, iot_id: str, command: bytes) -> None:
+        """Schedule the answer, called from the executor like the real gateway."""
+        self.loop.call_soon_threadsafe(self._answer_later, iot_id, expected_response(command))
+
+    def _answer_later(self, iot_id: str, response: frozenset[tuple[str, str]]) -> None:
+        self.loop.call_later(LATENCY, self.cloud.waiting_queue.resolve, iot_id, min(response), b"")
+
+
+async def throughput(devices: int, commands: int, max_in_flight: int) -> float:
+    """Queue commands for every device at once and return the commands answered per second."""
+    gateway = FakeGateway(asyncio.get_running_loop())
+    mqtt_client = SimpleNamespace(get_cloud_client=lambda: gateway)
+    cloud = MammotionCloud(mqtt_client, None, max_in_flight=max_in_flight)
+    gateway.cloud = cloud
+    await cloud.on_ready()
+    command = MammotionCommand("Luba-TEST").get_all_boundary_hash_list(sub_cmd=0)
+
+    async def send(iot_id: str) -> None:
+        future = asyncio.get_running_loop().create_future()
+        await cloud.queue_command(iot_id, "get_all_boundary_hash_list", command, future)
+        await future
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(f"IOT-{device}") for device in range(devices) for _ in range(commands)))
+    return devices * commands / (time.perf_counter() - start)
+
+
+def run(number: int = 20) -> dict[str, Any]:
+    """Commands per second for 1, 10 and 50 devices, number commands each.
+
+    ``serial`` allows one command in flight for the account, which is how the shared queue behaved.
+    """
+    return {
+        f"devices_{devices}": {
+            "serial_per_s": asyncio.run(throughput(devices, number, 1)),
+            "concurrent_per_s": asyncio.run(throughput(devices, number, DEFAULT_MAX_IN_FLIGHT)),
+        }
+        for devices in (1, 10, 50)
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Build and serialize every MammotionCommand command.
+
+Run with ``python -m benchmarks.commands``.
+"""
+
+import inspect
+import json
+import sys
+from typing import Any
+
+from benchmarks.timer import time_call
+from pymammotion.mammotion.commands.mammotion_command import TEMPLATE_COMMANDS, MammotionCommand
+from tests.command_arguments import commands
+
+
+def run(number: int = 50) -> dict[str, Any]:
+    """Time each command builder, in microseconds.
+
+    ``template_us`` is the cost through ``MammotionCommand.build`` for commands served from a template.
+
+    Builders that fail with the generated arguments, or do not return bytes, are reported with the error.
+    """
+    command = MammotionCommand("Luba-BENCHMARK")
+    results: dict[str, Any] = {}
+    for name, kwargs in commands().items():
+        builder = getattr(command, name)
+        try:
+            encoded = builder(**kwargs)
+        except Exception as err:  # noqa: BLE001
+            results[name] = {"error": f"{type(err).__name__}: {err}"}
+            continue
+        if inspect.iscoroutine(encoded):
+            encoded.close()
+        if not isinstance(encoded, bytes):
+            results[name] = {"error": f"returned {type(encoded).__name__}"}
+            continue
+        results[name] = {
+            "bytes": len(encoded),
+            "build_us": time_call(lambda builder=builder, kwargs=kwargs: builder(**kwargs), number),
+        }
+        if name in TEMPLATE_COMMANDS:
+            results[name]["template_us"] = time_call(
+                lambda name=name, kwargs=kwargs: command.build(name, **kwargs), number
+            )
+    return results
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Convert mower positions and map points from ENU to latitude/longitude.
+
+Run with ``python -m benchmarks.coordinates``.
+"""
+
+import json
+import sys
+from typing import Any
+
+import numpy as np
+
+from benchmarks.timer import time_call
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.utility.map import CoordinateConverter
+
+# RTK origin in radians
+ORIGIN = (0.9, 0.1)
+MAP_POINTS = 10000
+
+
+def run(number: int = 200) -> dict[str, Any]:
+    """Time one position per report and a whole map of points, in microseconds."""
+    device = MowingDevice()
+    device.location.RTK.latitude, device.location.RTK.longitude = ORIGIN
+    converter = CoordinateConverter(*ORIGIN)
+    points = np.random.default_rng(0).uniform(-200.0, 200.0, (MAP_POINTS, 2))
+    return {
+        "position": {
+            "new_converter_us": time_call(lambda: CoordinateConverter(*ORIGIN).enu_to_lla(3.5, -12.25), number),
+            "cached_converter_us": time_call(lambda: device.coordinate_converter.enu_to_lla(3.5, -12.25), number),
+        },
+        f"map_{MAP_POINTS}_points": {
+            "per_point_us": time_call(
+                lambda: [converter.enu_to_lla(north, east) for east, north in points], max(number // 100, 1)
+            ),
+            "array_us": time_call(lambda: converter.enu_to_lla_array(points[:, 1], points[:, 0]), number),
+        },
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Stamp a mowing job onto the coverage grid of a 5 hectare site.
+
+Run with ``python -m benchmarks.coverage``.
+"""
+
+import itertools
+import json
+import sys
+import time
+from typing import Any
+
+import numpy as np
+
+from benchmarks.timer import time_call
+from pymammotion.utility.coverage import MAX_GAP, CoverageGrid
+
+# side of a square 5 hectare area in metres
+SIDE = 224.0
+# metres between the lanes of the simulated job, wider than the blade to keep the run short
+LANE = 2.0
+
+
+def run(number: int = 200) -> dict[str, Any]:
+    """Time stamping positions and reporting coverage, and the memory a whole site takes."""
+    grid = CoverageGrid()
+    square = np.array([(0.0, 0.0), (SIDE, 0.0), (SIDE, SIDE), (0.0, SIDE)])
+    start = time.perf_counter()
+    grid.set_areas([(1, square)])
+    rasterize_ms = (time.perf_counter() - start) * 1e3
+
+    step = MAX_GAP * 0.9
+    stamps = 0
+    start = time.perf_counter()
+    for lane in np.arange(LANE / 2, SIDE, LANE):
+        grid.lift()
+        for x in np.arange(0.0, SIDE, step):
+            grid.stamp(float(x), float(lane))
+            stamps += 1
+    stamp_us = (time.perf_counter() - start) / stamps * 1e6
+
+    # a mower at 0.4 m/s reporting 5 times a second
+    walk = itertools.count(0.0, 0.08)
+    return {
+        "rasterize_ms": rasterize_ms,
+        "segment_stamp_us": stamp_us,
+        "position_stamp_us": time_call(lambda: grid.stamp(float(next(walk)) % SIDE, 100.0), number),
+        "area_coverage_ms": time_call(grid.area_coverage, max(number // 100, 1)) / 1e3,
+        "covered_percent": grid.area_coverage()[1],
+        "megabytes": grid.nbytes / 1e6,
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
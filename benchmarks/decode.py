@@ -0,0 +1,34 @@
+"""Decode every recorded frame with each protobuf codec.
+
+Run with ``python -m benchmarks.decode``.
+"""
+
+import json
+import sys
+from typing import Any
+
+from benchmarks.timer import time_call
+from pymammotion.proto.codec import get_codec
+from pymammotion.proto.wire import classify_frame
+from tests.frames import FRAMES
+
+
+def run(number: int = 200) -> dict[str, Any]:
+    """Time decoding and wire classification of each frame, in microseconds."""
+    codecs = [get_codec(name) for name in ("betterproto", "protobuf")]
+    results: dict[str, Any] = {}
+    for name, frame in FRAMES.items():
+        result = {"bytes": len(frame), "classify_us": time_call(lambda frame=frame: classify_frame(frame), number)}
+        for codec in codecs:
+            result[f"{codec.name}_us"] = time_call(lambda codec=codec, frame=frame: codec.decode(frame), number)
+        results[name] = result
+    return results
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Grow a HashList one area at a time and time the updates on the way.
+
+Run with ``python -m benchmarks.hash_list``.
+"""
+
+import json
+import sys
+import time
+from typing import Any
+
+from benchmarks.timer import time_call
+from pymammotion.data.model.hash_list import HashList, PathType
+from pymammotion.proto.luba_msg import LubaMsg
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck, NavGetHashListAck
+from tests.frames import FRAMES
+
+SIZES = (10, 100, 500, 1000)
+# frames of the single long path in the frame benchmark
+PATH_FRAMES = 500
+
+
+def legacy_missing_hashlist(hash_list: HashList) -> list[int]:
+    """Missing hashes the way they were found before the HashList kept an index."""
+    return [
+        i
+        for obj in hash_list.root_hash_list.data
+        for i in obj.data_couple
+        if i
+        not in set(hash_list.area.keys()).union(
+            hash_list.path.keys(), hash_list.obstacle.keys(), hash_list.dump.keys(), hash_list.svg.keys()
+        )
+    ]
+
+
+def _frame(template: NavGetCommDataAck, hash_id: int, current_frame: int = 1) -> NavGetCommDataAck:
+    """Copy of the recorded area frame under another hash."""
+    return NavGetCommDataAck(
+        type=PathType.AREA,
+        hash=hash_id,
+        total_frame=2,
+        current_frame=current_frame,
+        data_couple=template.data_couple,
+        area_label=template.area_label,
+    )
+
+
+def run(number: int = 50) -> dict[str, Any]:
+    """Time HashList updates and lookups at growing map sizes, in microseconds.
+
+    ``update_us`` is the mean cost of adding each of the areas between the previous size and this one.
+    """
+    template = LubaMsg().parse(FRAMES["single_hash_result"]).nav.toapp_get_commondata_ack
+    hash_ids = list(range(1, SIZES[-1] + 1))
+    hash_list = HashList()
+    hash_list.update_root_hash_list(NavGetHashListAck(total_frame=1, current_frame=1, data_couple=hash_ids))
+
+    results: dict[str, Any] = {}
+    added = 0
+    for size in SIZES:
+        frames = [_frame(template, hash_id) for hash_id in hash_ids[added:size]]
+        start = time.perf_counter()
+        for frame in frames:
+            hash_list.update(frame)
+        update_us = (time.perf_counter() - start) / len(frames) * 1e6
+        added = size
+
+        existing = _frame(template, hash_ids[size // 2])
+        results[str(size)] = {
+            "update_us": update_us,
+            "duplicate_frame_us": time_call(lambda frame=existing: hash_list.update(frame), number),
+            "missing_frame_us": time_call(lambda frame=existing: hash_list.missing_frame(frame), number),
+            "missing_hashlist_us": time_call(lambda: hash_list.missing_hashlist, number),
+            "legacy_missing_hashlist_us": time_call(lambda: legacy_missing_hashlist(hash_list), number),
+        }
+    results[f"path_{PATH_FRAMES}_frames"] = _path_frames(template, number)
+    return results
+
+
+def _path_frames(template: NavGetCommDataAck, number: int) -> dict[str, float]:
+    """Add the frames of one long path, every frame is checked against the ones already there."""
+    frames = [
+        NavGetCommDataAck(
+            type=PathType.PATH,
+            hash=1,
+            total_frame=PATH_FRAMES,
+            current_frame=current_frame,
+            data_couple=template.data_couple,
+        )
+        for current_frame in range(1, PATH_FRAMES + 1)
+    ]
+    hash_list = HashList()
+    start = time.perf_counter()
+    for frame in frames[:-1]:
+        hash_list.update(frame)
+    add_frame_us = (time.perf_counter() - start) / (PATH_FRAMES - 1) * 1e6
+    return {
+        "add_frame_us": add_frame_us,
+        "duplicate_frame_us": time_call(lambda: hash_list.update(frames[0]), number),
+        "missing_frame_us": time_call(lambda: hash_list.missing_frame(frames[0]), number),
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Sync a simulated yard through MapSync with one and with several requests in flight.
+
+Run with ``python -m benchmarks.map_sync``.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from typing import Any
+
+from pymammotion.mammotion.devices.map_sync import DEFAULT_WINDOW
+from tests.fakes import FakeYard
+
+
+async def sync_time(areas: int, frames: int, window: int) -> float:
+    """Sync a whole yard and return the seconds it took."""
+    yard = FakeYard(areas, frames)
+    yard.sync.window = window
+    start = time.perf_counter()
+    await yard.sync.run(refresh=True)
+    return time.perf_counter() - start
+
+
+def run(number: int = 30) -> dict[str, Any]:
+    """Seconds to sync a yard of number areas with 3 frames each.
+
+    ``serial`` keeps one request in flight, which is how the frame by frame sync behaved.
+    """
+    return {
+        "serial_s": asyncio.run(sync_time(number, 3, 1)),
+        "windowed_s": asyncio.run(sync_time(number, 3, DEFAULT_WINDOW)),
+        "window_16_s": asyncio.run(sync_time(number, 3, 16)),
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Pump synthetic thing events through MammotionMQTT from a producer thread.
+
+Run with ``python -m benchmarks.mqtt``.
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from typing import Any
+
+import orjson
+
+from pymammotion.mqtt import MammotionMQTT
+from pymammotion.mqtt.topic_router import THING_EVENTS
+from tests.frames import FRAMES, thing_event_payload
+
+
+class LegacyMQTT(MammotionMQTT):
+    """Hand every message to the loop on its own, the way it was done before the batched inbox."""
+
+    def _forward_message(self, topic: str, payload: bytes) -> None:
+        payload = orjson.loads(payload)
+        iot_id = payload.get("params", {}).get("iotId", "")
+        if iot_id != "" and self.on_message:
+            future = asyncio.run_coroutine_threadsafe(self.on_message(topic, payload, iot_id), self.loop)
+            asyncio.wrap_future(future, loop=self.loop)
+
+
+async def pump(client_cls: type[MammotionMQTT], number: int, burst: int) -> dict[str, float]:
+    """Send number messages in bursts from another thread and wait until every handler ran."""
+    client = client_cls("cn-shanghai", "a1pk", "Luba-TEST", "secret", "token", None)
+    topic = client._router.topic(THING_EVENTS)  # noqa: SLF001
+    payloads = [
+        orjson.dumps(thing_event_payload(FRAMES["toapp_report_data"], message_id=str(i))) for i in range(number)
+    ]
+    sent = [0.0] * number
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def on_message(_topic: str, payload: dict, _iot_id: str) -> None:
+        latencies.append(time.perf_counter() - sent[int(payload["id"])])
+        if len(latencies) == number:
+            done.set()
+
+    client.on_message = on_message
+
+    def produce() -> None:
+        for start in range(0, number, burst):
+            for i in range(start, min(start + burst, number)):
+                sent[i] = time.perf_counter()
+                client._thing_on_topic_message(topic, payloads[i], 0, None)  # noqa: SLF001
+            # let the loop catch up between bursts like report traffic does
+            time.sleep(0.001)
+
+    start = time.perf_counter()
+    producer = threading.Thread(target=produce)
+    producer.start()
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    producer.join()
+    latencies.sort()
+    return {
+        "per_message_us": elapsed / number * 1e6,
+        "latency_p50_us": statistics.median(latencies) * 1e6,
+        "latency_p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+def run(number: int = 2000) -> dict[str, Any]:
+    """Time the batched inbox against the per message handoff for single messages and bursts."""
+    results: dict[str, Any] = {}
+    for burst in (1, 20, 100):
+        results[f"burst_{burst}"] = {
+            "legacy": asyncio.run(pump(LegacyMQTT, number, burst)),
+            "batched": asyncio.run(pump(MammotionMQTT, number, burst)),
+        }
+    return results
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare the RawData store with rebuilding LubaMsg from the whole raw dict.
+
+Run with ``python -m benchmarks.raw_data``.
+"""
+
+import json
+import sys
+from typing import Any
+
+import betterproto
+
+from benchmarks.timer import time_call
+from pymammotion.data.model.raw_data import SUB_MESSAGE_GROUPS, RawData
+from pymammotion.proto.luba_msg import LubaMsg
+from tests.frames import FRAMES
+
+
+def legacy_update(raw: dict[str, Any], message: LubaMsg) -> LubaMsg:
+    """Update the raw dict the way it was done before RawData and rebuild the LubaMsg."""
+    group, group_msg = betterproto.which_one_of(message, "LubaSubMsg")
+    name, value = betterproto.which_one_of(group_msg, SUB_MESSAGE_GROUPS[group])
+    sub = raw.get(group, {})
+    sub[name] = value if isinstance(value, int) else value.to_dict(casing=betterproto.Casing.SNAKE)
+    raw[group] = sub
+    return LubaMsg(**raw)
+
+
+def run(number: int = 2000) -> dict[str, Any]:
+    """Time one rapid state update against an empty and a fully populated state.
+
+    ``raw_data_with_read_us`` also reads the LubaMsg view after every update, the worst case for RawData.
+    """
+    messages = {name: LubaMsg().parse(frame) for name, frame in FRAMES.items()}
+    rapid = messages["sys_rapid_state_tunnel"]
+    # warm up the betterproto class metadata so the first case is not penalised
+    legacy_update({}, rapid)
+    results: dict[str, Any] = {}
+
+    for state in ("empty", "populated"):
+        legacy_raw: dict[str, Any] = {}
+        store = RawData()
+        if state == "populated":
+            for message in messages.values():
+                legacy_update(legacy_raw, message)
+                store.update(message)
+            store.device  # noqa: B018
+
+        results[state] = {
+            "legacy_us": time_call(lambda raw=legacy_raw: legacy_update(raw, rapid), number),
+            "raw_data_us": time_call(lambda store=store: store.update(rapid), number),
+            "raw_data_with_read_us": time_call(lambda store=store: (store.update(rapid), store.device), number),
+        }
+    return results
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Record notification frames and replay them into a device as fast as possible.
+
+Run with ``python -m benchmarks.replay`` for recorded fixture frames, or
+``python -m benchmarks.replay <recording>`` to replay a recorded mowing session.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.timer import time_call
+from pymammotion.data.recording import NotificationRecorder, NotificationReplayer
+from pymammotion.proto.codec import ProtoCodec, get_codec
+from tests.fakes import REPLAY_DEVICE_NAME, SESSION_FRAMES, ReplayDevice
+from tests.frames import FRAMES
+
+
+def write_session(path: Path, frames: int) -> None:
+    """Record frames fixture frames one second apart."""
+    with NotificationRecorder(path) as recorder:
+        for index in range(frames):
+            recorder.record(REPLAY_DEVICE_NAME, "cloud", SESSION_FRAMES[index % len(SESSION_FRAMES)], float(index))
+
+
+async def _replay(path: Path, codec: ProtoCodec) -> int:
+    with NotificationReplayer(path) as replayer:
+        return await replayer.replay(ReplayDevice(codec=codec), speed=None)
+
+
+def replay_rate(path: Path) -> dict[str, Any]:
+    """Replay a recording as fast as possible into a fresh device for every codec."""
+    result: dict[str, Any] = {}
+    for name in ("betterproto", "protobuf"):
+        start = time.perf_counter()
+        fed = asyncio.run(_replay(path, get_codec(name)))
+        result.update({"frames": fed, f"{name}_frames_per_s": fed / (time.perf_counter() - start)})
+    return result
+
+
+def run(number: int = 1000) -> dict[str, Any]:
+    """Time recording a frame and reading one back, and the end to end replay rate."""
+    frame = FRAMES["sys_rapid_state_tunnel"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "session.rec"
+        with NotificationRecorder(Path(directory) / "record.rec") as recorder:
+            record_us = time_call(lambda: recorder.record(REPLAY_DEVICE_NAME, "ble", frame), number)
+        write_session(path, number)
+        with NotificationReplayer(path) as replayer:
+            read_us = time_call(lambda: sum(1 for _ in replayer), 1) / number
+        return {
+            "record_us": record_us,
+            "read_us": read_us,
+            "bytes_per_frame": (path.stat().st_size) / number,
+            **replay_rate(path),
+        }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    result = replay_rate(Path(sys.argv[1])) if len(sys.argv) > 1 else run()
+    sys.stdout.write(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Load one account with simulated mowers pushing over the cloud path and time what the library keeps up with.
+
+Run with ``python -m benchmarks.simulator`` for 10 and 50 mowers, or
+``python -m benchmarks.simulator 500`` for a fleet of that size.
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Any
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.state_manager import StateManager
+from pymammotion.mammotion.devices.mammotion_cloud import MammotionBaseCloudDevice, MammotionCloud
+from pymammotion.proto.codec import get_codec
+from pymammotion.simulator import SimulatedCloud, SimulatedMower
+
+# round trip of a command through the cloud and the mower
+LATENCY = 0.02
+# seconds between the reports of a mower, and between its rapid states
+INTERVAL = 1.0
+# period of the ticker that measures how late the loop runs
+TICK = 0.05
+# mowers whose command round trip is timed, all of them would only queue behind each other
+PROBES = 20
+
+
+async def load(mowers: int, seconds: float, codec: str) -> dict[str, Any]:
+    """Push for seconds, then ask PROBES mowers for their base info at once while the pushes go on."""
+    loop = asyncio.get_running_loop()
+    simulated = SimulatedCloud(latency=LATENCY)
+    cloud = MammotionCloud(simulated, None)
+    devices = [
+        MammotionBaseCloudDevice(
+            cloud,
+            simulated.add_mower(
+                SimulatedMower(f"Luba-SIM{index:03d}", report_interval=INTERVAL, rapid_state_interval=INTERVAL)
+            ),
+            StateManager(MowingDevice(), get_codec(codec)),
+        )
+        for index in range(mowers)
+    ]
+    simulated.connect_async()
+    await asyncio.sleep(0.1)
+    lag = 0.0
+
+    async def ticker() -> None:
+        nonlocal lag
+        while True:
+            start = loop.time()
+            await asyncio.sleep(TICK)
+            lag = max(lag, loop.time() - start - TICK)
+
+    async def timed_command(device: MammotionBaseCloudDevice) -> float:
+        start = loop.time()
+        await device.queue_command("get_device_base_info")
+        return loop.time() - start
+
+    ticker_task = loop.create_task(ticker())
+    simulated.start(spread=INTERVAL)
+    frames_before = simulated.frames
+    wall, cpu = time.perf_counter(), time.process_time()
+    await asyncio.sleep(seconds)
+    latencies = sorted(await asyncio.gather(*(timed_command(device) for device in devices[:PROBES])))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    backlog = simulated.pending
+    simulated.disconnect()
+    ticker_task.cancel()
+    return {
+        # a report and a rapid state every INTERVAL, the pushes slow down with the loop they share
+        "target_per_s": 2 * mowers / INTERVAL,
+        "pushed_per_s": (simulated.frames - frames_before) / wall,
+        "handled_per_s": (simulated.frames - frames_before - backlog) / wall,
+        "backlog": backlog,
+        "command_p50_ms": 1000 * statistics.median(latencies),
+        "command_max_ms": 1000 * latencies[-1],
+        "loop_lag_ms": 1000 * lag,
+        "cpu_share": cpu / wall,
+    }
+
+
+def run(number: int = 5, fleets: tuple[int, ...] = (10, 50)) -> dict[str, Any]:
+    """Load every fleet size for number seconds with each codec.
+
+    A fleet the library keeps up with is pushed at target_per_s and handles what is pushed with
+    a small backlog. One it does not keep up with falls behind the target and the loop runs late.
+    """
+    return {
+        f"mowers_{mowers}": {codec: asyncio.run(load(mowers, number, codec)) for codec in ("betterproto", "protobuf")}
+        for mowers in fleets
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    fleets = tuple(int(mowers) for mowers in sys.argv[1:]) or (10, 50)
+    sys.stdout.write(json.dumps(run(fleets=fleets), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Locate positions among the areas and obstacles of a large map.
+
+Run with ``python -m benchmarks.spatial``.
+"""
+
+import json
+import sys
+from typing import Any
+
+from benchmarks.timer import time_call
+from pymammotion.utility.spatial import Polygon, SpatialIndex
+from tests.shapes import SIDE, SPACING, naive_locate, yard
+
+
+def run(number: int = 200) -> dict[str, Any]:
+    """Time locating a position in a yard of SIDE x SIDE areas, in microseconds."""
+    areas, obstacles = yard()
+    index = SpatialIndex(areas, obstacles)
+    polygons = [Polygon(hash_id, points) for hash_id, points in areas + obstacles]
+    x, y = SIDE / 2 * SPACING + 5.0, SIDE / 3 * SPACING + 1.0
+    return {
+        "polygons": len(index),
+        "build_us": time_call(lambda: SpatialIndex(areas, obstacles), max(number // 100, 1)),
+        "locate_us": time_call(lambda: index.locate(x, y), number),
+        "naive_locate_us": time_call(lambda: naive_locate(polygons, x, y), max(number // 10, 1)),
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Run recorded frames through decode, RawData and StateManager.notification.
+
+Run with ``python -m benchmarks.state_manager``.
+"""
+
+import json
+import sys
+from typing import Any
+
+from benchmarks.timer import time_async
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.raw_data import RawData
+from pymammotion.data.state_manager import StateManager
+from pymammotion.proto.codec import ProtoCodec, get_codec
+from tests.frames import FRAMES
+
+
+async def _ignore(*_args: Any) -> None:
+    """Stand in for the device callbacks."""
+
+
+def _notification(codec: ProtoCodec, frame: bytes) -> Any:
+    """Return a coroutine function handling the frame the way a device does."""
+    state_manager = StateManager(MowingDevice(), codec)
+    state_manager.gethash_ack_callback = _ignore
+    state_manager.get_commondata_ack_callback = _ignore
+    raw_data = RawData(codec=codec)
+
+    async def notification() -> None:
+        message = codec.decode(frame)
+        raw_data.update(message)
+        state_manager.get_device().update_raw(raw_data)
+        await state_manager.notification(message)
+
+    return notification
+
+
+def run(number: int = 200) -> dict[str, Any]:
+    """Time the handling of each frame end to end, in microseconds."""
+    codecs = [get_codec(name) for name in ("betterproto", "protobuf")]
+    results: dict[str, Any] = {}
+    for name, frame in FRAMES.items():
+        result: dict[str, Any] = {}
+        for codec in codecs:
+            result[f"{codec.name}_us"] = time_async(_notification(codec, frame), number)
+        results[name] = result
+    return results
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
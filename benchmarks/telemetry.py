@@ -0,0 +1,59 @@
+"""Append rapid state samples to the telemetry ring and read windows back.
+
+Run with ``python -m benchmarks.telemetry``.
+"""
+
+import json
+import sys
+import tracemalloc
+from typing import Any
+
+from benchmarks.timer import time_call
+from pymammotion.data.model.rapid_state import RapidState
+from pymammotion.data.telemetry import TelemetryBuffer
+
+RAW = [4, 1, 30, 12, 150, 160, 20, 123456789, -98765432, 31415, 0, 7]
+SAMPLES = 10000
+
+
+def _traced_bytes(build: Any) -> int:
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def run(number: int = 2000) -> dict[str, Any]:
+    """Time appends and reads, and compare the memory of SAMPLES samples with a list of RapidState."""
+    buffer = TelemetryBuffer(SAMPLES)
+    clock = iter(range(10**9))
+    for _ in range(SAMPLES):
+        buffer.append_rapid_state(RAW, float(next(clock)))
+
+    def filled() -> TelemetryBuffer:
+        ring = TelemetryBuffer(SAMPLES)
+        for second in range(SAMPLES):
+            ring.append_rapid_state(RAW, float(second))
+        return ring
+
+    latest = float(SAMPLES)
+    return {
+        "append_us": time_call(lambda: buffer.append_rapid_state(RAW, float(next(clock))), number),
+        "rapid_state_from_raw_us": time_call(lambda: RapidState.from_raw(RAW), number),
+        "window_hour_us": time_call(lambda: buffer.window(latest - 3600, latest), number),
+        "downsample_minute_us": time_call(lambda: buffer.downsample(60.0), max(number // 100, 1)),
+        "ring_bytes_per_sample": _traced_bytes(filled) / SAMPLES,
+        "dataclass_bytes_per_sample": _traced_bytes(lambda: [RapidState.from_raw(RAW) for _ in range(SAMPLES)])
+        / SAMPLES,
+    }
+
+
+def main() -> None:
+    """Print the results as JSON."""
+    sys.stdout.write(json.dumps(run(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
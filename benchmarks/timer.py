@@ -0,0 +1,29 @@
+"""Timing helpers shared by the benchmarks."""
+
+import asyncio
+import time
+import timeit
+from typing import Any, Awaitable, Callable
+
+REPEAT = 5
+
+
+def time_call(func: Callable[[], Any], number: int, repeat: int = REPEAT) -> float:
+    """Return the mean time of a call in microseconds, best of repeat runs."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def time_async(func: Callable[[], Awaitable[Any]], number: int, repeat: int = REPEAT) -> float:
+    """Return the mean time of awaiting a coroutine in microseconds, best of repeat runs."""
+
+    async def run() -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        return time.perf_counter() - start
+
+    loop = asyncio.new_event_loop()
+    try:
+        return min(loop.run_until_complete(run()) for _ in range(repeat)) / number * 1e6
+    finally:
+        loop.close()
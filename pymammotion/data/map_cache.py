@@ -0,0 +1,99 @@
+"""Keep complete map elements on disk, keyed by the hash the device gives them."""
+
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Iterable
+
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck, SvgMessageAckT
+
+_LOGGER = logging.getLogger(__name__)
+
+SUFFIX = ".bin"
+# kind byte and length in front of every serialized frame
+_HEADER = struct.Struct("<BI")
+_KINDS: dict[int, type[NavGetCommDataAck | SvgMessageAckT]] = {0: NavGetCommDataAck, 1: SvgMessageAckT}
+
+Frames = list[NavGetCommDataAck | SvgMessageAckT]
+
+
+def _encode(frames: Frames) -> bytes:
+    records = []
+    for frame in frames:
+        data = bytes(frame)
+        records.append(_HEADER.pack(int(isinstance(frame, SvgMessageAckT)), len(data)) + data)
+    return b"".join(records)
+
+
+def _decode(data: bytes) -> Frames:
+    frames: Frames = []
+    pos = 0
+    while pos < len(data):
+        kind, length = _HEADER.unpack_from(data, pos)
+        pos += _HEADER.size
+        if pos + length > len(data):
+            raise ValueError("truncated frame")
+        frames.append(_KINDS[kind]().parse(data[pos : pos + length]))
+        pos += length
+    return frames
+
+
+class MapCache:
+    """Frames of complete map elements of one device, one file per hash.
+
+    A hash names the content of an element, so a file is written once and only removed when the
+    hash is no longer in the root hash list. All methods do blocking file IO.
+    """
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        """Create a cache in directory, which is made on the first save."""
+        self.directory = Path(directory)
+        self._hashes: set[int] | None = None
+
+    def _path(self, hash_id: int) -> Path:
+        return self.directory / f"{hash_id}{SUFFIX}"
+
+    @property
+    def hashes(self) -> set[int]:
+        """Get the hashes that are on disk."""
+        if self._hashes is None:
+            self._hashes = set()
+            if self.directory.is_dir():
+                self._hashes.update(
+                    int(path.stem) for path in self.directory.glob(f"*{SUFFIX}") if path.stem.lstrip("-").isdigit()
+                )
+        return self._hashes
+
+    def load(self, hash_ids: Iterable[int]) -> dict[int, Frames]:
+        """Read the frames of the hashes that are on disk, unreadable files are dropped."""
+        loaded: dict[int, Frames] = {}
+        for hash_id in hash_ids:
+            if hash_id not in self.hashes:
+                continue
+            try:
+                loaded[hash_id] = _decode(self._path(hash_id).read_bytes())
+            except (OSError, ValueError, KeyError, struct.error):
+                _LOGGER.warning("Dropping unreadable map cache entry %s", hash_id)
+                self._remove(hash_id)
+        return loaded
+
+    def save(self, hash_ids: set[int], elements: dict[int, Frames]) -> None:
+        """Write elements that are not on disk yet and remove the hashes not in hash_ids."""
+        for hash_id in self.hashes - hash_ids:
+            self._remove(hash_id)
+        new = {hash_id: frames for hash_id, frames in elements.items() if hash_id not in self.hashes}
+        if not new:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for hash_id, frames in new.items():
+            path = self._path(hash_id)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(_encode(frames))
+            # a reader never sees half a file
+            os.replace(tmp_path, path)
+            self.hashes.add(hash_id)
+
+    def _remove(self, hash_id: int) -> None:
+        self.hashes.discard(hash_id)
+        self._path(hash_id).unlink(missing_ok=True)
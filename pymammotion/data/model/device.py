@@ -1,17 +1,20 @@
 """MowingDevice class to wrap around the betterproto dataclasses."""
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import betterproto
+import numpy as np
 from mashumaro.mixins.orjson import DataClassORJSONMixin
 
 from pymammotion.data.model import HashList, RapidState
 from pymammotion.data.model.device_config import DeviceLimits
 from pymammotion.data.model.device_info import MowerInfo
 from pymammotion.data.model.location import Location
+from pymammotion.data.model.raw_data import RawData
 from pymammotion.data.model.report_info import ReportData
 from pymammotion.data.mqtt.properties import ThingPropertiesMessage
+from pymammotion.data.telemetry import TelemetryBuffer
 from pymammotion.http.model.http import ErrorInfo
 from pymammotion.proto.dev_net import DevNet
 from pymammotion.proto.luba_msg import LubaMsg
@@ -29,7 +32,9 @@ from pymammotion.proto.mctrl_sys import (
 )
 from pymammotion.utility.constant import WorkMode
 from pymammotion.utility.conversions import parse_double
+from pymammotion.utility.coverage import CoverageGrid
 from pymammotion.utility.map import CoordinateConverter
+from pymammotion.utility.spatial import SpatialIndex
 
 
 @dataclass
@@ -45,19 +50,41 @@ class MowingDevice(DataClassORJSONMixin):
     err_code_list: list = field(default_factory=list)
     err_code_list_time: Optional[list] = field(default_factory=list)
     limits: DeviceLimits = field(default_factory=DeviceLimits)
-    device: Optional[LubaMsg] = field(default_factory=LubaMsg)
     error_codes: dict[str, ErrorInfo] = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        """Attach an empty raw data store, it is not part of the serialized state."""
+        self._raw_data = RawData()
+        self._coordinate_converter: CoordinateConverter | None = None
+        # ground mowed since the grid was last cleared, set coverage.width to the blade in use
+        self.coverage = CoverageGrid()
+        self._coverage_index: SpatialIndex | None = None
+        # history of positions, RTK quality and battery, not part of the serialized state
+        self.telemetry = TelemetryBuffer()
+
+    @property
+    def coordinate_converter(self) -> CoordinateConverter:
+        """Converter for the current RTK origin, rebuilt only when the origin moves."""
+        origin = (self.location.RTK.latitude, self.location.RTK.longitude)
+        if self._coordinate_converter is None or self._coordinate_converter.origin != origin:
+            self._coordinate_converter = CoordinateConverter(*origin)
+        return self._coordinate_converter
+
     @classmethod
     def from_raw(cls, raw: dict) -> "MowingDevice":
         """Take in raw data to hold in the betterproto dataclass."""
         mowing_device = MowingDevice()
-        mowing_device.device = LubaMsg(**raw)
+        mowing_device.update_raw(raw)
         return mowing_device
 
-    def update_raw(self, raw: dict) -> None:
-        """Update the raw LubaMsg data."""
-        self.device = LubaMsg(**raw)
+    def update_raw(self, raw: RawData | dict) -> None:
+        """Update the raw LubaMsg data, the LubaMsg view is only rebuilt when read."""
+        self._raw_data = raw if isinstance(raw, RawData) else RawData(raw)
+
+    @property
+    def device(self) -> LubaMsg:
+        """LubaMsg built from the raw data, to_dict and from_dict leave it out."""
+        return self._raw_data.device
 
     def buffer(self, buffer_list: SystemUpdateBufMsg) -> None:
         """Update the device based on which buffer we are reading from."""
@@ -101,8 +128,34 @@ class MowingDevice(DataClassORJSONMixin):
                     ]
                 )
 
-    def update_report_data(self, toapp_report_data: ReportInfoData) -> None:
-        coordinate_converter = CoordinateConverter(self.location.RTK.latitude, self.location.RTK.longitude)
+    def _locate(self, east: float, north: float) -> None:
+        position = self.map.spatial_index.locate(east, north)
+        self.location.area_hash = position.area
+        self.location.obstacle_hash = position.obstacle
+        self.location.boundary_distance = position.boundary_distance
+
+    def _coverage(self) -> CoverageGrid:
+        """Coverage grid with the areas of the current map."""
+        # the index is rebuilt whenever an area changed
+        if self._coverage_index is not self.map.spatial_index:
+            self._coverage_index = self.map.spatial_index
+            self.coverage.set_areas(
+                (hash_id, frames.enu) for hash_id, frames in self.map.area.items() if frames.enu is not None
+            )
+        return self.coverage
+
+    def area_coverage(self) -> dict[int, float]:
+        """Get the percent mowed of every area."""
+        return self._coverage().area_coverage()
+
+    def uncovered_patches(self, hash_id: int, block: float = 1.0) -> np.ndarray:
+        """Get the (K, 2) ENU centres of block metre squares of an area that are mostly not mowed."""
+        return self._coverage().uncovered_patches(hash_id, block)
+
+    def update_report_data(
+        self, toapp_report_data: ReportInfoData, has_field: Callable[[Any], bool] = betterproto.serialized_on_wire
+    ) -> None:
+        coordinate_converter = self.coordinate_converter
         for index, location in enumerate(toapp_report_data.locations):
             if index == 0 and location.real_pos_y != 0:
                 self.location.position_type = location.pos_type
@@ -110,21 +163,29 @@ class MowingDevice(DataClassORJSONMixin):
                 self.location.device = coordinate_converter.enu_to_lla(
                     parse_double(location.real_pos_y, 4.0), parse_double(location.real_pos_x, 4.0)
                 )
+                self._locate(parse_double(location.real_pos_x, 4.0), parse_double(location.real_pos_y, 4.0))
                 if location.zone_hash:
                     self.location.work_zone = (
                         location.zone_hash if self.report_data.dev.sys_status == WorkMode.MODE_WORKING else 0
                     )
 
+        self.telemetry.append_report(toapp_report_data, has_field=has_field)
         self.report_data.update(toapp_report_data.to_dict(casing=betterproto.Casing.SNAKE))
 
     def run_state_update(self, rapid_state: SystemRapidStateTunnelMsg) -> None:
-        coordinate_converter = CoordinateConverter(self.location.RTK.latitude, self.location.RTK.longitude)
+        coordinate_converter = self.coordinate_converter
         self.mowing_state = RapidState().from_raw(rapid_state.rapid_state_data)
+        self.telemetry.append_rapid_state(rapid_state.rapid_state_data)
         self.location.position_type = self.mowing_state.pos_type
         self.location.orientation = self.mowing_state.toward / 10000
         self.location.device = coordinate_converter.enu_to_lla(
             parse_double(self.mowing_state.pos_y, 4.0), parse_double(self.mowing_state.pos_x, 4.0)
         )
+        self._locate(parse_double(self.mowing_state.pos_x, 4.0), parse_double(self.mowing_state.pos_y, 4.0))
+        if self.report_data.dev.sys_status == WorkMode.MODE_WORKING:
+            self.coverage.stamp(parse_double(self.mowing_state.pos_x, 4.0), parse_double(self.mowing_state.pos_y, 4.0))
+        else:
+            self.coverage.lift()
         if self.mowing_state.zone_hash:
             self.location.work_zone = (
                 self.mowing_state.zone_hash if self.report_data.dev.sys_status == WorkMode.MODE_WORKING else 0
@@ -139,37 +200,37 @@ class MowingDevice(DataClassORJSONMixin):
     @property
     def net(self):
         """Will return a wrapped betterproto of net."""
-        return DevNetData(net=self.device.net)
+        return DevNetData(net=self._raw_data.get("net"))
 
     @property
     def sys(self):
         """Will return a wrapped betterproto of sys."""
-        return SysData(sys=self.device.sys)
+        return SysData(sys=self._raw_data.get("sys"))
 
     @property
     def nav(self):
         """Will return a wrapped betterproto of nav."""
-        return NavData(nav=self.device.nav)
+        return NavData(nav=self._raw_data.get("nav"))
 
     @property
     def driver(self):
         """Will return a wrapped betterproto of driver."""
-        return DriverData(driver=self.device.driver)
+        return DriverData(driver=self._raw_data.get("driver"))
 
     @property
     def mul(self):
         """Will return a wrapped betterproto of mul."""
-        return MulData(mul=self.device.mul)
+        return MulData(mul=self._raw_data.get("mul"))
 
     @property
     def ota(self):
         """Will return a wrapped betterproto of ota."""
-        return OtaData(ota=self.device.ota)
+        return OtaData(ota=self._raw_data.get("ota"))
 
     @property
     def pept(self):
         """Will return a wrapped betterproto of pept."""
-        return PeptData(pept=self.device.pept)
+        return PeptData(pept=self._raw_data.get("pept"))
 
 
 @dataclass
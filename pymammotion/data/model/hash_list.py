@@ -1,9 +1,15 @@
 from dataclasses import dataclass, field
 from enum import IntEnum
+from typing import TYPE_CHECKING
 
+import numpy as np
 from mashumaro.mixins.orjson import DataClassORJSONMixin
 
 from pymammotion.proto.mctrl_nav import NavGetCommDataAck, NavGetHashListAck, SvgMessageAckT
+from pymammotion.utility.spatial import SpatialIndex
+
+if TYPE_CHECKING:
+    from pymammotion.utility.map import CoordinateConverter
 
 
 class PathType(IntEnum):
@@ -21,6 +27,68 @@ class FrameList(DataClassORJSONMixin):
     total_frame: int
     data: list[NavGetCommDataAck | SvgMessageAckT]
 
+    def __post_init__(self) -> None:
+        """Index the frames by current_frame, kept in step with data."""
+        self._frames = {frame.current_frame: frame for frame in self.data}
+        self._enu: np.ndarray | None = None
+        # origin the lat/lon points were converted for, and the points
+        self._lla: tuple[tuple[float, float], np.ndarray] | None = None
+        if self.complete:
+            self._build_geometry()
+
+    def add(self, frame: NavGetCommDataAck | SvgMessageAckT) -> bool:
+        """Add or replace the frame with the same current_frame, return whether anything changed."""
+        existing = self._frames.get(frame.current_frame)
+        if existing is None:
+            self.data.append(frame)
+        elif existing == frame:
+            return False
+        else:
+            self.data[self.data.index(existing)] = frame
+        self._frames[frame.current_frame] = frame
+        self._enu = self._lla = None
+        if self.complete:
+            self._build_geometry()
+        return True
+
+    def _build_geometry(self) -> None:
+        points = [
+            (couple.x, couple.y)
+            for current_frame in sorted(self._frames)
+            for couple in getattr(self._frames[current_frame], "data_couple", ())
+        ]
+        enu = np.array(points, dtype=np.float64).reshape(-1, 2)
+        # shared between every consumer
+        enu.flags.writeable = False
+        self._enu = enu
+
+    @property
+    def enu(self) -> np.ndarray | None:
+        """Get the (N, 2) east/north points in metres of all frames in order, None until complete."""
+        return self._enu
+
+    def lla(self, converter: "CoordinateConverter") -> np.ndarray | None:
+        """Get the (N, 2) latitude/longitude points in degrees, converted once per origin."""
+        if self._enu is None:
+            return None
+        if self._lla is None or self._lla[0] != converter.origin:
+            # enu_to_lla takes north before east
+            lla = converter.enu_to_lla_array(self._enu[:, 1], self._enu[:, 0])
+            lla.flags.writeable = False
+            self._lla = (converter.origin, lla)
+        return self._lla[1]
+
+    @property
+    def complete(self) -> bool:
+        """Check if every frame is there."""
+        return len(self._frames) >= self.total_frame
+
+    def missing_frames(self) -> list[int]:
+        """Get the numbers of the frames that are not there yet."""
+        if self.complete:
+            return []
+        return [frame for frame in range(1, self.total_frame + 1) if frame not in self._frames]
+
 
 @dataclass
 class NavGetHashListData(DataClassORJSONMixin, NavGetHashListAck):
@@ -32,6 +100,28 @@ class RootHashList(DataClassORJSONMixin):
     total_frame: int = 0
     data: list[NavGetHashListAck] = field(default_factory=list)
 
+    def __post_init__(self) -> None:
+        """Index the frame numbers that are there."""
+        self._frames = {frame.current_frame for frame in self.data}
+
+    def add(self, frame: NavGetHashListAck) -> bool:
+        """Add or replace the frame with the same current_frame, return whether it replaced one."""
+        self.total_frame = frame.total_frame
+        if frame.current_frame not in self._frames:
+            self._frames.add(frame.current_frame)
+            self.data.append(frame)
+            return False
+        for index, obj in enumerate(self.data):
+            if obj.current_frame == frame.current_frame:
+                self.data[index] = frame
+        return True
+
+    def missing_frames(self) -> list[int]:
+        """Get the numbers of the frames that are not there yet."""
+        if len(self._frames) >= self.total_frame:
+            return []
+        return [frame for frame in range(1, self.total_frame + 1) if frame not in self._frames]
+
 
 @dataclass
 class AreaHashNameList(DataClassORJSONMixin):
@@ -56,12 +146,40 @@ class HashList(DataClassORJSONMixin):
     svg: dict = field(default_factory=dict)  # type 13
     area_name: list[AreaHashNameList] = field(default_factory=list)
 
+    def __post_init__(self) -> None:
+        """Index the known, missing and incomplete hashes."""
+        self._reindex()
+
+    def _reindex(self) -> None:
+        # hashes that have at least one frame, hashes of the root list that have none,
+        # and frame lists that are still missing frames
+        self._known: set[int] = set()
+        self._incomplete: dict[int, FrameList] = {}
+        for frames in (self.area, self.path, self.obstacle, self.dump, self.svg):
+            self._known.update(frames.keys())
+            self._incomplete.update(
+                (hash_id, frame_list) for hash_id, frame_list in frames.items() if not frame_list.complete
+            )
+        self._missing = dict.fromkeys(i for i in self.hashlist if i not in self._known)
+        self._spatial_index: SpatialIndex | None = None
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """Get the index over the complete areas and obstacles, rebuilt after any of them changed."""
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(
+                ((hash_id, frames.enu) for hash_id, frames in self.area.items() if frames.enu is not None),
+                ((hash_id, frames.enu) for hash_id, frames in self.obstacle.items() if frames.enu is not None),
+            )
+        return self._spatial_index
+
     def update_hash_lists(self, hashlist: list[int]) -> None:
         self.area = {hash_id: frames for hash_id, frames in self.area.items() if hash_id in hashlist}
         self.path = {hash_id: frames for hash_id, frames in self.path.items() if hash_id in hashlist}
         self.obstacle = {hash_id: frames for hash_id, frames in self.obstacle.items() if hash_id in hashlist}
         self.dump = {hash_id: frames for hash_id, frames in self.dump.items() if hash_id in hashlist}
         self.svg = {hash_id: frames for hash_id, frames in self.svg.items() if hash_id in hashlist}
+        self._reindex()
 
     @property
     def hashlist(self) -> list[int]:
@@ -71,46 +189,45 @@ class HashList(DataClassORJSONMixin):
 
     @property
     def missing_hashlist(self) -> list[int]:
-        return [
-            i
-            for obj in self.root_hash_list.data
-            for i in obj.data_couple
-            if i
-            not in set(self.area.keys()).union(
-                self.path.keys(), self.obstacle.keys(), self.dump.keys(), self.svg.keys()
-            )
-        ]
+        return list(self._missing)
 
-    def update_root_hash_list(self, hash_list: NavGetHashListAck) -> None:
-        self.root_hash_list.total_frame = hash_list.total_frame
+    def frame_list(self, hash_id: int) -> FrameList | None:
+        """Get the frames of a hash of any type."""
+        for frames in (self.area, self.path, self.obstacle, self.dump, self.svg):
+            if hash_id in frames:
+                return frames[hash_id]
+        return None
 
-        for index, obj in enumerate(self.root_hash_list.data):
-            if obj.current_frame == hash_list.current_frame:
-                # Replace the item if current_frame matches
-                self.root_hash_list.data[index] = hash_list
-                return
+    @property
+    def incomplete_frame_lists(self) -> list[FrameList]:
+        """Get the frame lists that have some but not all of their frames."""
+        return list(self._incomplete.values())
 
-        # If no match was found, append the new item
-        self.root_hash_list.data.append(hash_list)
+    def update_root_hash_list(self, hash_list: NavGetHashListAck) -> None:
+        if self.root_hash_list.add(hash_list):
+            # a replaced frame can drop hashes, start over
+            self._missing = dict.fromkeys(i for i in self.hashlist if i not in self._known)
+            return
+        self._missing.update((i, None) for i in hash_list.data_couple if i not in self._known)
 
     def missing_hash_frame(self):
-        return self._find_missing_frames(self.root_hash_list)
-
-    def missing_frame(self, hash_data: NavGetCommDataAck | SvgMessageAckT) -> list[int]:
-        if hash_data.type == PathType.AREA:
-            return self._find_missing_frames(self.area.get(hash_data.hash))
-
-        if hash_data.type == PathType.OBSTACLE:
-            return self._find_missing_frames(self.obstacle.get(hash_data.hash))
+        return self.root_hash_list.missing_frames()
 
-        if hash_data.type == PathType.PATH:
-            return self._find_missing_frames(self.path.get(hash_data.hash))
+    def _frames_of_type(self, path_type: int) -> dict | None:
+        return {
+            PathType.AREA: self.area,
+            PathType.OBSTACLE: self.obstacle,
+            PathType.PATH: self.path,
+            PathType.DUMP: self.dump,
+            PathType.SVG: self.svg,
+        }.get(path_type)
 
-        if hash_data.type == PathType.DUMP:
-            return self._find_missing_frames(self.dump.get(hash_data.hash))
-
-        if hash_data.type == PathType.SVG:
-            return self._find_missing_frames(self.svg.get(hash_data.data_hash))
+    def missing_frame(self, hash_data: NavGetCommDataAck | SvgMessageAckT) -> list[int]:
+        frames = self._frames_of_type(hash_data.type)
+        if frames is None:
+            return None
+        hash_id = hash_data.data_hash if hash_data.type == PathType.SVG else hash_data.hash
+        return self._find_missing_frames(frames.get(hash_id))
 
     def update(self, hash_data: NavGetCommDataAck | SvgMessageAckT) -> bool:
         """Update the map data."""
@@ -119,47 +236,30 @@ class HashList(DataClassORJSONMixin):
             if not existing_name:
                 name = f"area {len(self.area_name)+1}" if hash_data.area_label is None else hash_data.area_label.label
                 self.area_name.append(AreaHashNameList(name=name, hash=hash_data.hash))
-            return self._add_hash_data(self.area, hash_data)
 
-        if hash_data.type == PathType.OBSTACLE:
-            return self._add_hash_data(self.obstacle, hash_data)
-
-        if hash_data.type == PathType.PATH:
-            return self._add_hash_data(self.path, hash_data)
-
-        if hash_data.type == PathType.DUMP:
-            return self._add_hash_data(self.dump, hash_data)
-
-        if hash_data.type == PathType.SVG:
-            return self._add_hash_data(self.svg, hash_data)
+        frames = self._frames_of_type(hash_data.type)
+        if frames is None:
+            return None
+        return self._add_hash_data(frames, hash_data)
 
     @staticmethod
     def _find_missing_frames(frame_list: FrameList | RootHashList) -> list[int]:
-        if frame_list.total_frame == len(frame_list.data):
-            return []
-        number_list = list(range(1, frame_list.total_frame + 1))
-
-        current_frames = {frame.current_frame for frame in frame_list.data}
-        missing_numbers = [num for num in number_list if num not in current_frames]
-        return missing_numbers
-
-    @staticmethod
-    def _add_hash_data(hash_dict: dict, hash_data: NavGetCommDataAck | SvgMessageAckT) -> bool:
-        if isinstance(hash_data, SvgMessageAckT):
-            if hash_dict.get(hash_data.data_hash) is None:
-                hash_dict[hash_data.data_hash] = FrameList(total_frame=hash_data.total_frame, data=[hash_data])
-                return True
-
-            if hash_data not in hash_dict[hash_data.data_hash].data:
-                hash_dict[hash_data.data_hash].data.append(hash_data)
-                return True
-            return False
-
-        if hash_dict.get(hash_data.hash) is None:
-            hash_dict[hash_data.hash] = FrameList(total_frame=hash_data.total_frame, data=[hash_data])
-            return True
-
-        if hash_data not in hash_dict[hash_data.hash].data:
-            hash_dict[hash_data.hash].data.append(hash_data)
-            return True
-        return False
+        return frame_list.missing_frames()
+
+    def _add_hash_data(self, hash_dict: dict, hash_data: NavGetCommDataAck | SvgMessageAckT) -> bool:
+        hash_id = hash_data.data_hash if isinstance(hash_data, SvgMessageAckT) else hash_data.hash
+        frame_list = hash_dict.get(hash_id)
+        if frame_list is None:
+            frame_list = hash_dict[hash_id] = FrameList(total_frame=hash_data.total_frame, data=[hash_data])
+            self._known.add(hash_id)
+            self._missing.pop(hash_id, None)
+            updated = True
+        else:
+            updated = frame_list.add(hash_data)
+        if frame_list.complete:
+            self._incomplete.pop(hash_id, None)
+            if updated:
+                self._spatial_index = None
+        else:
+            self._incomplete[hash_id] = frame_list
+        return updated
@@ -34,3 +34,8 @@ class Location(DataClassORJSONMixin):
     position_type: int = 0
     orientation: int = 0  # 360 degree rotation +-
     work_zone: int = 0
+    # hashes of the area and obstacle the device is in, from the map, 0 when in none
+    area_hash: int = 0
+    obstacle_hash: int = 0
+    # metres to the edge of the area the device is in
+    boundary_distance: float | None = None
@@ -0,0 +1,87 @@
+"""Incrementally updated store of the latest LubaMsg sub messages."""
+
+import logging
+from typing import Any
+
+from betterproto import Casing
+
+from pymammotion.proto.codec import ProtoCodec, get_codec
+from pymammotion.proto.luba_msg import LubaMsg
+
+_LOGGER = logging.getLogger(__name__)
+
+# LubaSubMsg field -> name of the oneof group inside that sub message
+SUB_MESSAGE_GROUPS: dict[str, str] = {
+    "nav": "SubNavMsg",
+    "sys": "SubSysMsg",
+    "driver": "SubDrvMsg",
+    "net": "NetSubType",
+    "mul": "SubMul",
+    "ota": "SubOtaMsg",
+}
+
+
+class RawData:
+    """Keep the newest sub message of every LubaMsg group.
+
+    An update only swaps the reference of the sub message that arrived. The snake cased
+    dicts and the LubaMsg view are built on read, and only for the parts that changed.
+    """
+
+    def __init__(self, raw: dict[str, Any] | None = None, codec: ProtoCodec | None = None) -> None:
+        """Create the store, optionally seeded with a raw dict of previously converted groups."""
+        self._codec = codec or get_codec()
+        self._messages: dict[str, dict[str, Any]] = {}
+        self._dicts: dict[str, dict[str, Any]] = {}
+        self._dirty: dict[str, set[str]] = {}
+        self._device: LubaMsg | None = None
+        if raw:
+            for group, values in raw.items():
+                self._dicts[group] = dict(values)
+
+    def update(self, message: Any) -> bool:
+        """Store the sub message carried by a notification, returns False if nothing was stored."""
+        group, group_msg = self._codec.which_one_of(message, "LubaSubMsg")
+        sub_group = SUB_MESSAGE_GROUPS.get(group)
+        if sub_group is None:
+            return False
+
+        name, value = self._codec.which_one_of(group_msg, sub_group)
+        if value is None:
+            _LOGGER.debug("Sub message was NoneType %s", name)
+            return False
+
+        self._messages.setdefault(group, {})[name] = value
+        self._dirty.setdefault(group, set()).add(name)
+        self._device = None
+        return True
+
+    def get(self, group: str) -> dict[str, Any]:
+        """Return the snake cased dict of a group, converting only the sub messages that changed."""
+        converted = self._dicts.get(group)
+        if converted is None:
+            if group not in self._messages:
+                return {}
+            converted = self._dicts[group] = {}
+        dirty = self._dirty.pop(group, None)
+        if dirty:
+            messages = self._messages[group]
+            for name in dirty:
+                value = messages[name]
+                if self._codec.is_message(value):
+                    converted[name] = value.to_dict(casing=Casing.SNAKE)
+                else:
+                    converted[name] = value
+        return converted
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the raw data of every group received so far."""
+        groups = self._dicts.keys() | self._messages.keys()
+        return {group: self.get(group) for group in groups}
+
+    @property
+    def device(self) -> LubaMsg:
+        """LubaMsg view over the raw data, rebuilt on the first read after an update."""
+        if self._device is None:
+            self._device = LubaMsg(**self.to_dict())
+        return self._device
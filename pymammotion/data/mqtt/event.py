@@ -176,3 +176,72 @@ class ThingEventMessage(DataClassORJSONMixin):
             raise ValueError(f"Unknown identifier: {identifier} {params_dict}")
 
         return cls(method=method, id=event_id, params=params_obj, version=version)
+
+
+class ThingEventPayload:
+    """Thing event read straight from the parsed MQTT payload.
+
+    The fields needed to route and decode an event come from the dict, the mashumaro
+    ThingEventMessage is only built when ``params`` or ``event`` is read.
+    """
+
+    __slots__ = ("payload", "_params", "_event")
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        """Wrap a parsed payload without converting it."""
+        self.payload = payload
+        self._params: dict[str, Any] = payload.get("params") or {}
+        self._event: ThingEventMessage | None = None
+
+    @property
+    def method(self) -> str | None:
+        """Get the method, thing.events or thing.properties."""
+        return self.payload.get("method")
+
+    @property
+    def id(self) -> str | None:
+        """Get the message id."""
+        return self.payload.get("id")
+
+    @property
+    def version(self) -> str | None:
+        """Get the protocol version."""
+        return self.payload.get("version")
+
+    @property
+    def identifier(self) -> str | None:
+        """Get the event identifier, None for a configuration request."""
+        return self._params.get("identifier")
+
+    @property
+    def iot_id(self) -> str:
+        """Get the iot_id of the device the event is from."""
+        return self._params.get("iotId", "")
+
+    @property
+    def device_name(self) -> str | None:
+        """Get the name of the device the event is from."""
+        return self._params.get("deviceName")
+
+    @property
+    def product_key(self) -> str | None:
+        """Get the product key of the device the event is from."""
+        return self._params.get("productKey")
+
+    @property
+    def content(self) -> str | None:
+        """Base64 protobuf content of a device_protobuf_msg_event."""
+        value = self._params.get("value")
+        return value.get("content") if isinstance(value, dict) else None
+
+    @property
+    def event(self) -> ThingEventMessage:
+        """The full ThingEventMessage, built on first use."""
+        if self._event is None:
+            self._event = ThingEventMessage.from_dicts(self.payload)
+        return self._event
+
+    @property
+    def params(self) -> Union[DeviceProtobufMsgEventParams, DeviceWarningEventParams, dict]:
+        """Get the params of the full ThingEventMessage."""
+        return self.event.params
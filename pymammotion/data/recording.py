@@ -0,0 +1,145 @@
+"""Record the raw notification frames of devices to a file and replay them later."""
+
+import asyncio
+import contextlib
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+
+if TYPE_CHECKING:
+    from pymammotion.mammotion.devices.base import MammotionBaseDevice
+
+MAGIC = b"PMREC\x01"
+# monotonic timestamp, transport, device id length and frame length in front of every frame
+_RECORD = struct.Struct("<dBBI")
+TRANSPORTS = ("", "ble", "cloud")
+
+
+@dataclass(frozen=True)
+class RecordedFrame:
+    """One notification as it came in."""
+
+    timestamp: float
+    device: str
+    transport: str
+    # a view into the mapped file, valid until the replayer is closed
+    data: memoryview
+
+
+class NotificationRecorder:
+    """Append frames to a length-prefixed log, the header is written when the file is new."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """Open path for appending."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO = self.path.open("ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self.frames = 0
+
+    def record(self, device: str, transport: str, data: bytes, timestamp: float | None = None) -> None:
+        """Append a frame, buffered until the buffer fills or the recorder is flushed.
+
+        Raises ValueError if the transport is unknown or the device id is over 255 bytes.
+        """
+        device_id = device.encode()
+        if len(device_id) > 255:
+            raise ValueError(f"Device id is over 255 bytes: {device}")
+        self._file.write(
+            _RECORD.pack(
+                time.monotonic() if timestamp is None else timestamp,
+                TRANSPORTS.index(transport),
+                len(device_id),
+                len(data),
+            )
+        )
+        self._file.write(device_id)
+        self._file.write(data)
+        self.frames += 1
+
+    def flush(self) -> None:
+        """Write buffered frames to the file."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._file.close()
+
+    def __enter__(self) -> "NotificationRecorder":
+        """Return the recorder."""
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        """Close the recorder."""
+        self.close()
+
+
+class NotificationReplayer:
+    """Read a recording through a memory map, frames are not copied until they are decoded."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """Map the recording at path, which must start with MAGIC."""
+        with Path(path).open("rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a notification recording")
+        self._view = memoryview(self._map)
+
+    def close(self) -> None:
+        """Unmap the file, frames read from it must not be used after this."""
+        self._view.release()
+        # a frame still holding a view keeps the map open until it is gone
+        with contextlib.suppress(BufferError):
+            self._map.close()
+
+    def __enter__(self) -> "NotificationReplayer":
+        """Return the replayer."""
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        """Close the replayer."""
+        self.close()
+
+    def __iter__(self) -> Iterator[RecordedFrame]:
+        """Yield the frames in the order they were recorded, a truncated last frame is left out."""
+        view = self._view
+        pos = len(MAGIC)
+        while pos + _RECORD.size <= len(view):
+            timestamp, transport, id_length, length = _RECORD.unpack_from(view, pos)
+            start = pos + _RECORD.size + id_length
+            if start + length > len(view):
+                return
+            device = bytes(view[pos + _RECORD.size : start]).decode()
+            yield RecordedFrame(timestamp, device, TRANSPORTS[transport], view[start : start + length])
+            pos = start + length
+
+    async def replay(
+        self, device: "MammotionBaseDevice", speed: float | None = 1.0, device_id: str | None = None
+    ) -> int:
+        """Feed the frames into device and return how many were fed.
+
+        speed 1.0 keeps the recorded pace, 10.0 plays ten times as fast and None does not wait at
+        all. Only the frames of device_id are fed when it is given.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first: float | None = None
+        fed = 0
+        for frame in self:
+            if device_id is not None and frame.device != device_id:
+                continue
+            if first is None:
+                first = frame.timestamp
+            if speed:
+                delay = started + (frame.timestamp - first) / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await device.feed_notification(bytes(frame.data))
+            fed += 1
+        return fed
@@ -10,6 +10,7 @@ from pymammotion.data.model.device import MowingDevice
 from pymammotion.data.model.device_info import SideLight
 from pymammotion.data.model.hash_list import AreaHashNameList
 from pymammotion.data.mqtt.properties import ThingPropertiesMessage
+from pymammotion.proto.codec import ProtoCodec, get_codec
 from pymammotion.proto.dev_net import WifiIotStatusReport
 from pymammotion.proto.luba_msg import LubaMsg
 from pymammotion.proto.mctrl_nav import AppGetAllAreaHashName, NavGetCommDataAck, NavGetHashListAck, SvgMessageAckT
@@ -24,8 +25,9 @@ class StateManager:
     _device: MowingDevice
     last_updated_at: datetime = datetime.now()
 
-    def __init__(self, device: MowingDevice) -> None:
+    def __init__(self, device: MowingDevice, codec: ProtoCodec | None = None) -> None:
         self._device = device
+        self.codec = codec or get_codec()
         self.gethash_ack_callback: Optional[Callable[[NavGetHashListAck], Awaitable[None]]] = None
         self.get_commondata_ack_callback: Optional[Callable[[NavGetCommDataAck | SvgMessageAckT], Awaitable[None]]] = (
             None
@@ -48,7 +50,7 @@ class StateManager:
 
     async def notification(self, message: LubaMsg) -> None:
         """Handle protobuf notifications."""
-        res = betterproto.which_one_of(message, "LubaSubMsg")
+        res = self.codec.which_one_of(message, "LubaSubMsg")
         self.last_updated_at = datetime.now()
 
         match res[0]:
@@ -70,19 +72,19 @@ class StateManager:
 
     async def _update_nav_data(self, message) -> None:
         """Update nav data."""
-        nav_msg = betterproto.which_one_of(message.nav, "SubNavMsg")
+        nav_msg = self.codec.which_one_of(message.nav, "SubNavMsg")
         match nav_msg[0]:
             case "toapp_gethash_ack":
-                hashlist_ack: NavGetHashListAck = nav_msg[1]
+                hashlist_ack: NavGetHashListAck = self.codec.to_betterproto(nav_msg[1])
                 self._device.map.update_root_hash_list(hashlist_ack)
-                await self.gethash_ack_callback(nav_msg[1])
+                await self.gethash_ack_callback(hashlist_ack)
             case "toapp_get_commondata_ack":
-                common_data: NavGetCommDataAck = nav_msg[1]
+                common_data: NavGetCommDataAck = self.codec.to_betterproto(nav_msg[1])
                 updated = self._device.map.update(common_data)
                 if updated:
                     await self.get_commondata_ack_callback(common_data)
             case "toapp_svg_msg":
-                common_data: SvgMessageAckT = nav_msg[1]
+                common_data: SvgMessageAckT = self.codec.to_betterproto(nav_msg[1])
                 updated = self._device.map.update(common_data)
                 if updated:
                     await self.get_commondata_ack_callback(common_data)
@@ -94,16 +96,19 @@ class StateManager:
 
     async def _update_sys_data(self, message) -> None:
         """Update system."""
-        sys_msg = betterproto.which_one_of(message.sys, "SubSysMsg")
+        sys_msg = self.codec.which_one_of(message.sys, "SubSysMsg")
         match sys_msg[0]:
             case "system_update_buf":
                 self._device.buffer(sys_msg[1])
             case "toapp_report_data":
-                self._device.update_report_data(sys_msg[1])
+                self._device.update_report_data(sys_msg[1], self.codec.has_field)
             case "mow_to_app_info":
                 self._device.mow_info(sys_msg[1])
-            case "system_tard_state_tunnel":
+            case "system_rapid_state_tunnel":
                 self._device.run_state_update(sys_msg[1])
+            case "system_tard_state_tunnel":
+                # tard state has no rapid_state_data, nothing reads it yet
+                pass
             case "todev_time_ctrl_light":
                 ctrl_light: TimeCtrlLight = sys_msg[1]
                 side_led: SideLight = SideLight.from_dict(ctrl_light.to_dict(casing=betterproto.Casing.SNAKE))
@@ -116,7 +121,7 @@ class StateManager:
         pass
 
     def _update_net_data(self, message) -> None:
-        net_msg = betterproto.which_one_of(message.net, "NetSubType")
+        net_msg = self.codec.which_one_of(message.net, "NetSubType")
         match net_msg[0]:
             case "toapp_wifi_iot_status":
                 wifi_iot_status: WifiIotStatusReport = net_msg[1]
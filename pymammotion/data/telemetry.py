@@ -0,0 +1,152 @@
+"""Fixed-size history of positions and RTK quality, kept in a preallocated NumPy ring."""
+
+import time
+from typing import Any, Callable, Sequence
+
+import betterproto
+import numpy as np
+
+from pymammotion.data.model.rapid_state import RTKStatus
+from pymammotion.proto.mctrl_sys import ReportInfoData
+
+# positions are in the metres location.device is converted from
+TELEMETRY_DTYPE = np.dtype(
+    [
+        ("timestamp", np.float64),
+        ("pos_x", np.float32),
+        ("pos_y", np.float32),
+        ("toward", np.float32),
+        ("rtk_status", np.uint8),
+        ("satellites", np.uint8),
+        ("lat_std", np.float32),
+        ("lon_std", np.float32),
+        ("zone_hash", np.int64),
+        ("battery", np.int8),
+    ]
+)
+# a day of samples once a second
+DEFAULT_CAPACITY = 24 * 3600
+
+
+def _rtk_status(raw: int) -> int:
+    """Map the raw RTK status the same way RapidState does."""
+    if raw == 4:
+        return RTKStatus.FINE.value
+    if raw in (1, 5):
+        return RTKStatus.BAD.value
+    return RTKStatus.NONE.value
+
+
+class TelemetryBuffer:
+    """Ring of the last capacity samples, oldest overwritten first.
+
+    Every sample carries the values of the one before it forward, so a report that only has the
+    battery still gives a complete row. Reads return views into the ring where they can.
+    Timestamps default to time.monotonic(), reads search them and need them in order.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Allocate capacity samples up front."""
+        self.capacity = capacity
+        # zeroed pages are only backed by memory once written to
+        self._data = np.zeros(capacity, dtype=TELEMETRY_DTYPE)
+        # samples appended since creation, the next one goes to _appended % capacity
+        self._appended = 0
+        # values of the last sample in field order, battery is unknown until a report has it
+        assert TELEMETRY_DTYPE.names is not None
+        self._last: dict[str, float] = dict.fromkeys(TELEMETRY_DTYPE.names, 0)
+        self._last["battery"] = -1
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return min(self._appended, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the bytes of the ring."""
+        return self._data.nbytes
+
+    def _append(self, timestamp: float | None, **fields: float) -> None:
+        self._last.update(fields, timestamp=time.monotonic() if timestamp is None else timestamp)
+        # one tuple assignment is several times cheaper than setting fields of a row one by one
+        self._data[self._appended % self.capacity] = tuple(self._last.values())
+        self._appended += 1
+
+    def append_rapid_state(self, raw: Sequence[int], timestamp: float | None = None) -> None:
+        """Append a sample from the rapid_state_data of a SystemRapidStateTunnelMsg."""
+        self._append(
+            timestamp,
+            rtk_status=_rtk_status(raw[0]),
+            satellites=raw[2],
+            lat_std=raw[4] / 10000,
+            lon_std=raw[5] / 10000,
+            pos_x=raw[7] / 100000000,
+            pos_y=raw[8] / 100000000,
+            toward=raw[9] / 10000,
+            zone_hash=raw[11],
+        )
+
+    def append_report(
+        self,
+        report: ReportInfoData,
+        timestamp: float | None = None,
+        has_field: Callable[[Any], bool] = betterproto.serialized_on_wire,
+    ) -> None:
+        """Append a sample from the parts of a report that are there, has_field is the one of the codec that decoded it."""
+        fields: dict[str, float] = {}
+        if has_field(report.dev):
+            fields["battery"] = report.dev.battery_val
+        if has_field(report.rtk):
+            fields.update(
+                rtk_status=_rtk_status(report.rtk.status),
+                satellites=report.rtk.gps_stars,
+                lat_std=report.rtk.lat_std / 10000,
+                lon_std=report.rtk.lon_std / 10000,
+            )
+        if report.locations and report.locations[0].real_pos_y != 0:
+            location = report.locations[0]
+            fields.update(
+                pos_x=location.real_pos_x / 10000,
+                pos_y=location.real_pos_y / 10000,
+                toward=location.real_toward / 10000,
+                zone_hash=location.zone_hash,
+            )
+        self._append(timestamp, **fields)
+
+    def views(self, since: float | None = None, until: float | None = None) -> list[np.ndarray]:
+        """Get the samples with since <= timestamp < until as views into the ring, oldest first.
+
+        The ring can wrap inside the window, so there are up to two views.
+        """
+        end = self._appended % self.capacity
+        if self._appended < self.capacity:
+            segments = [self._data[:end]]
+        else:
+            segments = [self._data[end:], self._data[:end]]
+        views = []
+        for segment in segments:
+            timestamps = segment["timestamp"]
+            first = 0 if since is None else int(np.searchsorted(timestamps, since, side="left"))
+            last = len(segment) if until is None else int(np.searchsorted(timestamps, until, side="left"))
+            if first < last:
+                views.append(segment[first:last])
+        return views
+
+    def window(self, since: float | None = None, until: float | None = None) -> np.ndarray:
+        """Get the samples with since <= timestamp < until, a view unless the ring wraps inside them."""
+        views = self.views(since, until)
+        if len(views) == 1:
+            return views[0]
+        if not views:
+            return self._data[:0]
+        return np.concatenate(views)
+
+    def downsample(self, interval: float, since: float | None = None, until: float | None = None) -> np.ndarray:
+        """Get the last sample of every interval seconds in the window."""
+        window = self.window(since, until)
+        if len(window) == 0:
+            return window
+        buckets = np.floor_divide(window["timestamp"], interval)
+        last_of_bucket = np.flatnonzero(buckets[1:] != buckets[:-1])
+        samples: np.ndarray = window[np.append(last_of_bucket, len(window) - 1)]
+        return samples
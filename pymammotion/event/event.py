@@ -14,6 +14,10 @@ class Event:
         self.__eventhandlers.remove(handler)
         return self
 
+    def __len__(self) -> int:
+        """Return the number of handlers."""
+        return len(self.__eventhandlers)
+
     async def __call__(self, *args: Any, **kwargs: Any) -> None:
         await asyncio.gather(*[handler(*args, **kwargs) for handler in self.__eventhandlers])
 
@@ -65,6 +69,10 @@ class DataEvent:
     def add_subscribers(self, obj_method) -> None:
         self.on_data_event += obj_method
 
+    def has_subscribers(self) -> bool:
+        """Check if anything is subscribed to the event."""
+        return len(self.on_data_event) > 0
+
     def remove_subscribers(self, obj_method) -> None:
         try:
             self.on_data_event -= obj_method
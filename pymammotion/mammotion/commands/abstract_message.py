@@ -1,10 +1,13 @@
 from abc import abstractmethod
 
+from pymammotion.proto.codec import ProtoCodec, get_codec
 from pymammotion.proto.luba_msg import MsgCmdType, MsgDevice
 from pymammotion.utility.device_type import DeviceType
 
 
 class AbstractMessage:
+    _codec: ProtoCodec = get_codec()
+
     @abstractmethod
     def get_device_name(self) -> str:
         """Get device name."""
@@ -20,3 +23,7 @@ class AbstractMessage:
         ):
             return MsgDevice.DEV_NAVIGATION
         return msg_device
+
+    def encode(self, luba_msg) -> bytes:
+        """Serialize a built LubaMsg with the codec of this command builder."""
+        return self._codec.encode(luba_msg)
@@ -0,0 +1,64 @@
+"""Share one request between identical reads that are queued or in flight."""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+# commands that only read state, optionally only when the arguments make them a read
+READ_COMMANDS: dict[str, Callable[[dict[str, Any]], bool] | None] = {
+    "allpowerfull_rw": lambda kwargs: kwargs.get("rw") == 0,
+    "read_and_set_sidelight": lambda kwargs: kwargs.get("operate") == 1,
+    "read_and_set_rtk_pairing_code": lambda kwargs: kwargs.get("op") == 1,
+    "get_all_boundary_hash_list": None,
+    "get_area_name_list": None,
+    "get_device_base_info": None,
+    "get_device_product_model": None,
+    "get_device_version_info": None,
+    "get_hash_response": None,
+    "get_maintenance": None,
+    "get_report_cfg": None,
+    "get_speed": None,
+    "query_job_history": None,
+    "read_plan": None,
+    "synchronize_hash_data": None,
+}
+
+
+def is_idempotent_read(key: str, kwargs: dict[str, Any]) -> bool:
+    """Check if sending the command twice gives nothing the first send does not."""
+    if key not in READ_COMMANDS:
+        return False
+    is_read = READ_COMMANDS[key]
+    return is_read is None or is_read(kwargs)
+
+
+class ReadCoalescer:
+    """Attach identical reads of one device to the request already queued or in flight.
+
+    Writes and anything else not known to be a read are always sent.
+    """
+
+    def __init__(self) -> None:
+        """Create a coalescer without pending reads."""
+        self._pending: dict[tuple, asyncio.Future] = {}
+        self.merged = 0
+
+    async def send(self, key: str, kwargs: dict[str, Any], send: Callable[[], Awaitable[Any]]) -> Any:
+        """Await send, or the pending request of an identical read."""
+        if not is_idempotent_read(key, kwargs):
+            return await send()
+        pending_key = (key, *sorted(kwargs.items()))
+        try:
+            pending = self._pending.get(pending_key)
+        except TypeError:
+            return await send()
+        if pending is None:
+            pending = self._pending[pending_key] = asyncio.ensure_future(send())
+            pending.add_done_callback(lambda done: self._forget(pending_key, done))
+        else:
+            self.merged += 1
+        # a waiter that gives up must not cancel the request for the others
+        return await asyncio.shield(pending)
+
+    def _forget(self, pending_key: tuple, done: asyncio.Future) -> None:
+        if self._pending.get(pending_key) is done:
+            del self._pending[pending_key]
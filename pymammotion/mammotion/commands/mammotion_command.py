@@ -1,3 +1,6 @@
+import inspect
+from typing import Any, Callable
+
 from pymammotion.mammotion.commands.messages.driver import MessageDriver
 from pymammotion.mammotion.commands.messages.media import MessageMedia
 from pymammotion.mammotion.commands.messages.navigation import MessageNavigation
@@ -5,17 +8,85 @@ from pymammotion.mammotion.commands.messages.network import MessageNetwork
 from pymammotion.mammotion.commands.messages.ota import MessageOta
 from pymammotion.mammotion.commands.messages.system import MessageSystem
 from pymammotion.mammotion.commands.messages.video import MessageVideo
+from pymammotion.mammotion.commands.template import CommandTemplate
+from pymammotion.proto.codec import ProtoCodec
 from pymammotion.utility.movement import get_percent, transform_both_speeds
 
+# public methods of the command classes that do not build a command
+NOT_COMMANDS = frozenset(
+    {
+        "build",
+        "encode",
+        "get_device_name",
+        "get_device_product_key",
+        "get_msg_device",
+        "set_device_product_key",
+    }
+)
+
+# commands whose bytes only depend on their arguments and the timestamp, serialized once per set of arguments
+TEMPLATE_COMMANDS = frozenset(
+    {
+        "allpowerfull_rw",
+        "cancel_job",
+        "cancel_return_to_dock",
+        "get_all_boundary_hash_list",
+        "get_area_name_list",
+        "get_area_to_be_transferred",
+        "get_device_base_info",
+        "get_device_product_model",
+        "get_device_version_info",
+        "get_hash_response",
+        "get_maintenance",
+        "get_report_cfg",
+        "get_report_cfg_stop",
+        "get_speed",
+        "leave_dock",
+        "pause_execute_task",
+        "query_job_history",
+        "read_and_set_rtk_pairing_code",
+        "read_and_set_sidelight",
+        "read_plan",
+        "resume_execute_task",
+        "return_to_dock",
+        "send_movement",
+        "send_todev_ble_sync",
+        "start_job",
+        "synchronize_hash_data",
+    }
+)
+
+MAX_TEMPLATES = 256
+
 
 class MammotionCommand(
     MessageSystem, MessageNavigation, MessageNetwork, MessageOta, MessageVideo, MessageMedia, MessageDriver
 ):
     """MQTT commands for Luba."""
 
-    def __init__(self, device_name: str) -> None:
+    def __init__(self, device_name: str, codec: ProtoCodec | None = None) -> None:
         self._device_name = device_name
         self._product_key = ""
+        if codec is not None:
+            self._codec = codec
+        self._builders: dict[str, Callable[..., bytes]] = {key: getattr(self, key) for key in COMMAND_KEYS}
+        self._templates: dict[tuple, CommandTemplate] = {}
+
+    def build(self, key: str, **kwargs: Any) -> bytes:
+        """Serialize the command key, constant commands are stamped from a cached template."""
+        if key not in TEMPLATE_COMMANDS:
+            return self._builders[key](**kwargs)
+        template_key = (key, *sorted(kwargs.items()))
+        try:
+            template = self._templates.get(template_key)
+        except TypeError:
+            # arguments that cannot be hashed are never cached
+            return self._builders[key](**kwargs)
+        if template is None:
+            if len(self._templates) >= MAX_TEMPLATES:
+                del self._templates[next(iter(self._templates))]
+            template = self._templates[template_key] = CommandTemplate(self._builders[key](**kwargs))
+        return template.render()
 
     def get_device_name(self) -> str:
         """Get device name."""
@@ -26,6 +97,8 @@ class MammotionCommand(
 
     def set_device_product_key(self, product_key: str) -> None:
         self._product_key = product_key
+        # the receiver of some commands depends on the product key
+        self._templates.clear()
 
     def move_forward(self, linear: float) -> bytes:
         """Move forward. values 0.0 1.0."""
@@ -50,3 +123,10 @@ class MammotionCommand(
         angular_percent = get_percent(abs(angular * 100))
         (linear_speed, angular_speed) = transform_both_speeds(0.0, 0.0, 0.0, angular_percent)
         return self.send_movement(linear_speed=linear_speed, angular_speed=angular_speed)
+
+
+COMMAND_KEYS = tuple(
+    name
+    for name, _ in inspect.getmembers(MammotionCommand, inspect.isfunction)
+    if not name.startswith(("_", "send_order_msg")) and name not in NOT_COMMANDS
+)
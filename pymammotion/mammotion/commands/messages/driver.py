@@ -12,7 +12,7 @@ logger = getLogger(__name__)
 
 class MessageDriver(AbstractMessage, ABC):
     def send_order_msg_driver(self, driver) -> bytes:
-        return LubaMsg(
+        luba_msg = LubaMsg(
             msgtype=MsgCmdType.MSG_CMD_TYPE_EMBED_DRIVER,
             sender=MsgDevice.DEV_MOBILEAPP,
             rcver=self.get_msg_device(MsgCmdType.MSG_CMD_TYPE_EMBED_DRIVER, MsgDevice.DEV_MAINCTL),
@@ -22,7 +22,9 @@ class MessageDriver(AbstractMessage, ABC):
             version=1,
             subtype=1,
             driver=driver,
-        ).SerializeToString()
+        )
+
+        return self.encode(luba_msg)
 
     def set_blade_height(self, height: int):
         logger.debug(f"Send knife height height={height}")
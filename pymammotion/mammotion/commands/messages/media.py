@@ -20,7 +20,7 @@ class MessageMedia(AbstractMessage, ABC):
             mul=mul,
         )
 
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
 
     def set_car_volume(self, volume: int):
         return self.send_order_msg_media(luba_mul_pb2.SocMul(set_audio=luba_mul_pb2.MulSetAudio(at_switch=volume)))
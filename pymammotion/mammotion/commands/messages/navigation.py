@@ -43,7 +43,7 @@ class MessageNavigation(AbstractMessage, ABC):
             timestamp=round(time.time() * 1000),
         )
 
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
 
     def allpowerfull_rw_adapter_x3(self, id: int, context: int, rw: int) -> bytes:
         build = MctlNav(nav_sys_param_cmd=NavSysParamMsg(id=id, context=context, rw=rw))
@@ -28,8 +28,7 @@ from pymammotion.proto.luba_msg import LubaMsg, MsgAttr, MsgCmdType, MsgDevice
 class MessageNetwork(AbstractMessage, ABC):
     messageNavigation: MessageNavigation = MessageNavigation()
 
-    @staticmethod
-    def send_order_msg_net(build: DevNet) -> bytes:
+    def send_order_msg_net(self, build: DevNet) -> bytes:
         luba_msg = LubaMsg(
             msgtype=MsgCmdType.MSG_CMD_TYPE_ESP,
             sender=MsgDevice.DEV_MOBILEAPP,
@@ -42,7 +41,7 @@ class MessageNetwork(AbstractMessage, ABC):
             timestamp=round(time.time() * 1000),
         )
 
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
 
     def send_todev_ble_sync(self, sync_type: int) -> bytes:
         comm_esp = DevNet(todev_ble_sync=sync_type)
@@ -19,7 +19,7 @@ class MessageOta(AbstractMessage, ABC):
             ota=ota,
         )
 
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
 
     def get_device_ota_info(self, log_type: int):
         todev_get_info_req = mctrl_ota_pb2.MctlOta(
@@ -39,7 +39,7 @@ class MessageSystem(AbstractMessage, ABC):
             timestamp=round(time.time() * 1000),
         )
 
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
 
     @staticmethod
     def send_order_msg_sys_legacy(sys):
@@ -309,7 +309,7 @@ class MessageSystem(AbstractMessage, ABC):
             timestamp=round(time.time() * 1000),
         )
 
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
 
     def get_report_cfg(self, timeout: int = 10000, period: int = 1000, no_change_period: int = 2000):
         # TODO use send_order_msg_sys_legacy
@@ -344,4 +344,4 @@ class MessageSystem(AbstractMessage, ABC):
             sys=mctl_sys,
             timestamp=round(time.time() * 1000),
         )
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
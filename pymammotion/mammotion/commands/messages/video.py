@@ -22,7 +22,7 @@ class MessageVideo(AbstractMessage, ABC):
             timestamp=round(time.time() * 1000),
         )
 
-        return luba_msg.SerializeToString()
+        return self.encode(luba_msg)
 
     def device_agora_join_channel_with_position(self, enter_state: int):
         position = (
@@ -0,0 +1,80 @@
+"""Priority classes of commands and the queue the devices schedule them with."""
+
+import asyncio
+from collections import deque
+from enum import IntEnum
+from typing import Any
+
+
+class CommandPriority(IntEnum):
+    """Lower values are sent first."""
+
+    REALTIME = 0
+    INTERACTIVE = 1
+    BACKGROUND = 2
+
+
+COMMAND_PRIORITIES: dict[str, CommandPriority] = {
+    # control that has to land now, a stop must never wait behind a map sync
+    "send_movement": CommandPriority.REALTIME,
+    "cancel_job": CommandPriority.REALTIME,
+    "return_to_dock": CommandPriority.REALTIME,
+    "cancel_return_to_dock": CommandPriority.REALTIME,
+    "pause_execute_task": CommandPriority.REALTIME,
+    "set_blade_control": CommandPriority.REALTIME,
+    # map and history sync, can be hundreds of frames
+    "get_all_boundary_hash_list": CommandPriority.BACKGROUND,
+    "get_hash_response": CommandPriority.BACKGROUND,
+    "synchronize_hash_data": CommandPriority.BACKGROUND,
+    "get_regional_data": CommandPriority.BACKGROUND,
+    "get_area_to_be_transferred": CommandPriority.BACKGROUND,
+    "get_area_name_list": CommandPriority.BACKGROUND,
+    "get_line_info": CommandPriority.BACKGROUND,
+    "get_line_info_list": CommandPriority.BACKGROUND,
+    "read_plan": CommandPriority.BACKGROUND,
+    "query_job_history": CommandPriority.BACKGROUND,
+    "request_job_history": CommandPriority.BACKGROUND,
+}
+
+# a waiting lower class gets a turn after this many commands jumped ahead of it
+STARVATION_LIMIT = 4
+
+
+def command_priority(key: str) -> CommandPriority:
+    """Priority class of a command key, interactive unless listed."""
+    return COMMAND_PRIORITIES.get(key, CommandPriority.INTERACTIVE)
+
+
+class CommandQueue(asyncio.Queue):
+    """Queue of commands by priority class, put (priority, item) and get item back.
+
+    Realtime commands always go first. Interactive commands jump ahead of background sync,
+    but a waiting background command is let through after STARVATION_LIMIT of them.
+    """
+
+    def _init(self, maxsize: int) -> None:
+        self._queue: dict[CommandPriority, deque] = {priority: deque() for priority in CommandPriority}
+        self._skipped: dict[CommandPriority, int] = dict.fromkeys(CommandPriority, 0)
+
+    def qsize(self) -> int:
+        """Return the number of commands waiting in all classes."""
+        return sum(len(commands) for commands in self._queue.values())
+
+    def empty(self) -> bool:
+        """Check if no command is waiting."""
+        return not any(self._queue.values())
+
+    def _put(self, item: tuple[CommandPriority, Any]) -> None:
+        priority, command = item
+        self._queue[priority].append(command)
+
+    def _get(self) -> Any:
+        waiting = [priority for priority, commands in self._queue.items() if commands]
+        chosen = waiting[0]
+        if chosen != CommandPriority.REALTIME:
+            chosen = next((priority for priority in waiting if self._skipped[priority] >= STARVATION_LIMIT), chosen)
+        self._skipped[chosen] = 0
+        for priority in waiting:
+            if priority > chosen:
+                self._skipped[priority] += 1
+        return self._queue[chosen].popleft()
@@ -0,0 +1,28 @@
+"""Serialized commands that only need a fresh timestamp to be sent again."""
+
+import time
+
+from pymammotion.proto.wire import WIRE_VARINT, encode_varint, split_field
+
+# LubaMsg.timestamp
+TIMESTAMP_FIELD = 15
+_TIMESTAMP_TAG = encode_varint(TIMESTAMP_FIELD << 3 | WIRE_VARINT)
+
+
+class CommandTemplate:
+    """A serialized LubaMsg split around its timestamp."""
+
+    __slots__ = ("_prefix", "_suffix")
+
+    def __init__(self, encoded: bytes) -> None:
+        """Split a serialized command, one without a timestamp is sent as it is."""
+        parts = split_field(encoded, TIMESTAMP_FIELD)
+        self._prefix, self._suffix = parts if parts is not None else (encoded, None)
+
+    def render(self, timestamp: int | None = None) -> bytes:
+        """Return the command stamped with timestamp in milliseconds, now if omitted."""
+        if self._suffix is None:
+            return self._prefix
+        if timestamp is None:
+            timestamp = round(time.time() * 1000)
+        return b"".join((self._prefix, _TIMESTAMP_TAG, encode_varint(timestamp), self._suffix))
@@ -53,14 +53,16 @@ class JoystickControl:
             if self.stopped:
                 return
             self.stopped = True
-        self.stopped = False
+        else:
+            self.stopped = False
         (linear_speed, angular_speed) = transform_both_speeds(
             self.linear_speed,
             self.angular_speed,
             self.linear_percent,
             self.angular_percent,
         )
-        asyncio.run(self._client.command("send_movement", linear_speed=linear_speed, angular_speed=angular_speed))
+        # every tick refreshes the setpoint, the channel stops the mower when the ticks stop
+        self._client.movement.set_threadsafe(linear_speed, angular_speed)
 
     def print_add(self, joy) -> None:
         print("Added", joy)
@@ -0,0 +1,81 @@
+"""Realtime movement that always sends the newest setpoint and stops on its own."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+STOP = (0, 0)
+# setpoints sent per second while moving
+DEFAULT_RATE = 5.0
+# seconds without a new setpoint after which the mower is stopped
+DEFAULT_IDLE_TIMEOUT = 0.6
+
+
+class MovementChannel:
+    """Send the latest linear/angular setpoint at a fixed rate, without waiting for responses.
+
+    Setpoints replace each other instead of queueing. When no setpoint arrives for idle_timeout
+    seconds, or a stop is set, a stop is sent and the channel goes quiet until the next setpoint.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        build: Callable[[int, int], bytes],
+        rate: float = DEFAULT_RATE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        """Create a channel that builds movement commands with build and writes them with send."""
+        self._send = send
+        self._build = build
+        self.period = 1 / rate
+        self.idle_timeout = idle_timeout
+        self.loop = asyncio.get_event_loop()
+        self._setpoint = STOP
+        self._updated = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def moving(self) -> bool:
+        """Check if setpoints are being sent."""
+        return self._task is not None
+
+    def set(self, linear_speed: int, angular_speed: int) -> None:
+        """Replace the setpoint, must be called on the loop."""
+        self._setpoint = (linear_speed, angular_speed)
+        self._updated = self.loop.time()
+        if self._task is None:
+            self._task = self.loop.create_task(self._run())
+
+    def set_threadsafe(self, linear_speed: int, angular_speed: int) -> None:
+        """Replace the setpoint from another thread."""
+        self.loop.call_soon_threadsafe(self.set, linear_speed, angular_speed)
+
+    async def stop(self) -> None:
+        """Send a stop now."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._setpoint = STOP
+        await self._send(self._build(*STOP))
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                if self.loop.time() - self._updated > self.idle_timeout:
+                    _LOGGER.debug("No movement setpoint for %ss, stopping", self.idle_timeout)
+                    self._setpoint = STOP
+                await self._send(self._build(*self._setpoint))
+                # a setpoint may have arrived while the stop was sent
+                if self._setpoint == STOP:
+                    return
+                await asyncio.sleep(self.period)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            _LOGGER.exception("Sending movement failed")
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
@@ -1,14 +1,20 @@
 import asyncio
 import logging
+import os
 from abc import abstractmethod
+from pathlib import Path
 from typing import Any, Awaitable, Callable
 
-import betterproto
-
 from pymammotion.aliyun.model.dev_by_account_response import Device
+from pymammotion.data.map_cache import MapCache
 from pymammotion.data.model import RegionData
 from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.raw_data import RawData
+from pymammotion.data.recording import NotificationRecorder
 from pymammotion.data.state_manager import StateManager
+from pymammotion.mammotion.commands.coalesce import ReadCoalescer
+from pymammotion.mammotion.control.movement_channel import MovementChannel
+from pymammotion.mammotion.devices.map_sync import MapSync
 from pymammotion.proto.luba_msg import LubaMsg
 from pymammotion.proto.mctrl_nav import NavGetCommDataAck, NavGetHashListAck, SvgMessageAckT
 
@@ -33,15 +39,26 @@ def find_next_integer(lst: list[int], current_hash: int) -> int | None:
 class MammotionBaseDevice:
     """Base class for Mammotion devices."""
 
+    # written next to every recorded frame
+    transport = ""
+
     def __init__(self, state_manager: StateManager, cloud_device: Device | None = None) -> None:
         """Initialize MammotionBaseDevice."""
         self.loop = asyncio.get_event_loop()
-        self._raw_data = LubaMsg().to_dict(casing=betterproto.Casing.SNAKE)
         self._state_manager = state_manager
+        self._codec = state_manager.codec
+        self._raw_data = RawData(codec=self._codec)
         self._state_manager.gethash_ack_callback = self.datahash_response
         self._state_manager.get_commondata_ack_callback = self.commdata_response
         self._notify_future: asyncio.Future[bytes] | None = None
         self._cloud_device = cloud_device
+        # identical reads share the request already queued or in flight
+        self._reads = ReadCoalescer()
+        # manual driving bypasses the command queue, only the newest setpoint is sent
+        self.movement = MovementChannel(self.send_unacknowledged, self._build_movement)
+        # map frames are requested a window at a time instead of one per round trip
+        self.map_sync = MapSync(lambda: self.mower.map, self._send_map_request)
+        self.recorder: NotificationRecorder | None = None
 
     def set_notification_callback(self, func: Callable[[tuple[str, Any | None]], Awaitable[None]]) -> None:
         self._state_manager.on_notification_callback = func
@@ -49,8 +66,18 @@ class MammotionBaseDevice:
     def set_queue_callback(self, func: Callable[[str, dict[str, Any]], Awaitable[bytes]]) -> None:
         self._state_manager.queue_command_callback = func
 
+    def set_map_cache(self, directory: str | os.PathLike) -> None:
+        """Keep complete map elements in directory, so a restart only fetches what changed."""
+        self.map_sync.cache = MapCache(Path(directory) / self._commands.get_device_name())
+
+    def set_recorder(self, recorder: NotificationRecorder | None) -> None:
+        """Append every notification frame to recorder, None stops recording."""
+        self.recorder = recorder
+
     async def datahash_response(self, hash_ack: NavGetHashListAck) -> None:
         """Handle datahash responses."""
+        if self.map_sync.running:
+            return self.map_sync.progress()
         current_frame = hash_ack.current_frame
 
         missing_frames = self.mower.map.missing_hash_frame()
@@ -66,6 +93,8 @@ class MammotionBaseDevice:
 
     async def commdata_response(self, common_data: NavGetCommDataAck | SvgMessageAckT) -> None:
         """Handle common data responses."""
+        if self.map_sync.running:
+            return self.map_sync.progress()
         total_frame = common_data.total_frame
         current_frame = common_data.current_frame
 
@@ -90,96 +119,32 @@ class MammotionBaseDevice:
             region_data.current_frame = current_frame
             await self.queue_command("get_regional_data", regional_data=region_data)
 
-    def _update_raw_data(self, data: bytes) -> None:
-        """Update raw and model data from notifications."""
-        tmp_msg = LubaMsg().parse(data)
-        res = betterproto.which_one_of(tmp_msg, "LubaSubMsg")
-        match res[0]:
-            case "nav":
-                self._update_nav_data(tmp_msg)
-            case "sys":
-                self._update_sys_data(tmp_msg)
-            case "driver":
-                self._update_driver_data(tmp_msg)
-            case "net":
-                self._update_net_data(tmp_msg)
-            case "mul":
-                self._update_mul_data(tmp_msg)
-            case "ota":
-                self._update_ota_data(tmp_msg)
+    def _parse_notification(self, data: bytes) -> LubaMsg:
+        """Decode a notification once and mirror it into the raw data."""
+        if self.recorder is not None:
+            self.recorder.record(self._commands.get_device_name(), self.transport, data)
+        tmp_msg = self._codec.decode(data)
+        self._update_raw_data(tmp_msg)
+        return tmp_msg
+
+    async def feed_notification(self, data: bytes) -> None:
+        """Handle a notification frame as if the transport had received it."""
+        try:
+            new_msg = self._parse_notification(data)
+        except (KeyError, ValueError, IndexError, UnicodeDecodeError):
+            _LOGGER.exception("Error parsing message %s", data)
+            return
+        await self._state_manager.notification(new_msg)
 
+    def _update_raw_data(self, tmp_msg: LubaMsg) -> None:
+        """Update raw and model data from an already decoded notification."""
+        self._raw_data.update(tmp_msg)
         self.mower.update_raw(self._raw_data)
 
-    def _update_nav_data(self, tmp_msg) -> None:
-        """Update navigation data."""
-        nav_sub_msg = betterproto.which_one_of(tmp_msg.nav, "SubNavMsg")
-        if nav_sub_msg[1] is None:
-            _LOGGER.debug("Sub message was NoneType %s", nav_sub_msg[0])
-            return
-        nav = self._raw_data.get("nav", {})
-        if isinstance(nav_sub_msg[1], int):
-            nav[nav_sub_msg[0]] = nav_sub_msg[1]
-        else:
-            nav[nav_sub_msg[0]] = nav_sub_msg[1].to_dict(casing=betterproto.Casing.SNAKE)
-        self._raw_data["nav"] = nav
-
-    def _update_sys_data(self, tmp_msg) -> None:
-        """Update system data."""
-        sys_sub_msg = betterproto.which_one_of(tmp_msg.sys, "SubSysMsg")
-        if sys_sub_msg[1] is None:
-            _LOGGER.debug("Sub message was NoneType %s", sys_sub_msg[0])
-            return
-        sys = self._raw_data.get("sys", {})
-        sys[sys_sub_msg[0]] = sys_sub_msg[1].to_dict(casing=betterproto.Casing.SNAKE)
-        self._raw_data["sys"] = sys
-
-    def _update_driver_data(self, tmp_msg) -> None:
-        """Update driver data."""
-        drv_sub_msg = betterproto.which_one_of(tmp_msg.driver, "SubDrvMsg")
-        if drv_sub_msg[1] is None:
-            _LOGGER.debug("Sub message was NoneType %s", drv_sub_msg[0])
-            return
-        drv = self._raw_data.get("driver", {})
-        drv[drv_sub_msg[0]] = drv_sub_msg[1].to_dict(casing=betterproto.Casing.SNAKE)
-        self._raw_data["driver"] = drv
-
-    def _update_net_data(self, tmp_msg) -> None:
-        """Update network data."""
-        net_sub_msg = betterproto.which_one_of(tmp_msg.net, "NetSubType")
-        if net_sub_msg[1] is None:
-            _LOGGER.debug("Sub message was NoneType %s", net_sub_msg[0])
-            return
-        net = self._raw_data.get("net", {})
-        if isinstance(net_sub_msg[1], int):
-            net[net_sub_msg[0]] = net_sub_msg[1]
-        else:
-            net[net_sub_msg[0]] = net_sub_msg[1].to_dict(casing=betterproto.Casing.SNAKE)
-        self._raw_data["net"] = net
-
-    def _update_mul_data(self, tmp_msg) -> None:
-        """Update mul data."""
-        mul_sub_msg = betterproto.which_one_of(tmp_msg.mul, "SubMul")
-        if mul_sub_msg[1] is None:
-            _LOGGER.debug("Sub message was NoneType %s", mul_sub_msg[0])
-            return
-        mul = self._raw_data.get("mul", {})
-        mul[mul_sub_msg[0]] = mul_sub_msg[1].to_dict(casing=betterproto.Casing.SNAKE)
-        self._raw_data["mul"] = mul
-
-    def _update_ota_data(self, tmp_msg) -> None:
-        """Update OTA data."""
-        ota_sub_msg = betterproto.which_one_of(tmp_msg.ota, "SubOtaMsg")
-        if ota_sub_msg[1] is None:
-            _LOGGER.debug("Sub message was NoneType %s", ota_sub_msg[0])
-            return
-        ota = self._raw_data.get("ota", {})
-        ota[ota_sub_msg[0]] = ota_sub_msg[1].to_dict(casing=betterproto.Casing.SNAKE)
-        self._raw_data["ota"] = ota
-
     @property
     def raw_data(self) -> dict[str, Any]:
         """Get the raw data of the device."""
-        return self._raw_data
+        return self._raw_data.to_dict()
 
     @property
     def mower(self) -> MowingDevice:
@@ -190,6 +155,21 @@ class MammotionBaseDevice:
     async def queue_command(self, key: str, **kwargs: any) -> bytes | None:
         """Queue commands to mower."""
 
+    @abstractmethod
+    async def post_command(self, key: str, **kwargs: Any) -> None:
+        """Queue a command at its priority and return once it is sent, without waiting for a response."""
+
+    @abstractmethod
+    async def send_unacknowledged(self, command: bytes) -> None:
+        """Send a serialized command without waiting for a response."""
+
+    async def _send_map_request(self, key: str, kwargs: dict[str, Any]) -> None:
+        # through the command queue, so control commands still go ahead of the sync
+        await self.post_command(key, **kwargs)
+
+    def _build_movement(self, linear_speed: int, angular_speed: int) -> bytes:
+        return self._commands.build("send_movement", linear_speed=linear_speed, angular_speed=angular_speed)
+
     @abstractmethod
     async def _ble_sync(self):
         """Send ble sync command every 3 seconds or sooner."""
@@ -215,11 +195,7 @@ class MammotionBaseDevice:
 
         await self.queue_command("read_plan", sub_cmd=2, plan_index=0)
 
-        await self.queue_command("get_all_boundary_hash_list", sub_cmd=0)
-        await self.queue_command("get_hash_response", total_frame=1, current_frame=1)
-        if len(self.mower.map.missing_hashlist) > 0:
-            data_hash = self.mower.map.missing_hashlist.pop()
-            await self.queue_command("synchronize_hash_data", hash_num=data_hash)
+        await self.map_sync.run(refresh=True)
 
         # sub_cmd 3 is job hashes??
         # sub_cmd 4 is dump location (yuka)
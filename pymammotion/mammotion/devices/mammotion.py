@@ -18,6 +18,7 @@ from pymammotion.http.http import connect_http
 from pymammotion.mammotion.devices.mammotion_bluetooth import MammotionBaseBLEDevice
 from pymammotion.mammotion.devices.mammotion_cloud import MammotionBaseCloudDevice, MammotionCloud
 from pymammotion.mqtt import MammotionMQTT
+from pymammotion.proto.codec import ProtoCodec, get_codec
 
 TIMEOUT_CLOUD_RESPONSE = 10
 
@@ -42,9 +43,10 @@ class MammotionMixedDeviceManager:
         ble_device: BLEDevice | None = None,
         mqtt: MammotionCloud | None = None,
         preference: ConnectionPreference = ConnectionPreference.BLUETOOTH,
+        codec: ProtoCodec | None = None,
     ) -> None:
         self.name = name
-        self._state_manager = StateManager(MowingDevice())
+        self._state_manager = StateManager(MowingDevice(), codec)
         self._ble_device: MammotionBaseBLEDevice | None = None
         self._cloud_device: MammotionBaseCloudDevice | None = None
         self.add_ble(ble_device)
@@ -67,7 +69,7 @@ class MammotionMixedDeviceManager:
 
     def has_queued_commands(self) -> bool:
         if self.has_cloud() and self.preference == ConnectionPreference.WIFI:
-            return not self.cloud().mqtt.command_queue.empty()
+            return self.cloud().mqtt.has_queued_commands(self.cloud().iot_id)
         else:
             return not self.ble().command_queue.empty()
 
@@ -161,16 +163,19 @@ class Mammotion:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self) -> None:
-        """Initialize MammotionDevice."""
+    def __init__(self, codec: ProtoCodec | str | None = None) -> None:
+        """Initialize MammotionDevice, optionally with a codec or the name of one for get_codec."""
         self._login_lock = asyncio.Lock()
+        self._codec = get_codec(codec) if isinstance(codec, str) else codec
 
     def add_ble_device(
         self, ble_device: BLEDevice, preference: ConnectionPreference = ConnectionPreference.BLUETOOTH
     ) -> None:
         if ble_device:
             self.devices.add_device(
-                MammotionMixedDeviceManager(name=ble_device.name, ble_device=ble_device, preference=preference)
+                MammotionMixedDeviceManager(
+                    name=ble_device.name, ble_device=ble_device, preference=preference, codec=self._codec
+                )
             )
 
     async def login_and_initiate_cloud(self, account, password, force: bool = False) -> None:
@@ -213,6 +218,7 @@ class Mammotion:
                         cloud_device=device,
                         mqtt=mqtt_client,
                         preference=ConnectionPreference.WIFI,
+                        codec=self._codec,
                     )
                 )
             elif device.deviceName.startswith(("Luba-", "Yuka-")) and mower_device:
@@ -1,9 +1,8 @@
 import asyncio
 import logging
-from typing import Any, cast
+from typing import Any, Awaitable, Callable, cast
 from uuid import UUID
 
-import betterproto
 from bleak import BleakGATTCharacteristic, BleakGATTServiceCollection, BLEDevice
 from bleak.exc import BleakDBusError
 from bleak_retry_connector import (
@@ -16,9 +15,10 @@ from bleak_retry_connector import (
 from pymammotion.bluetooth import BleMessage
 from pymammotion.data.state_manager import StateManager
 from pymammotion.mammotion.commands.mammotion_command import MammotionCommand
+from pymammotion.mammotion.commands.priority import CommandQueue, command_priority
 from pymammotion.mammotion.devices.base import MammotionBaseDevice
-from pymammotion.proto import has_field
 from pymammotion.proto.luba_msg import LubaMsg
+from pymammotion.proto.wire import WIFI_STATUS_FRAME, classify_frame, is_keepalive
 
 DBUS_ERROR_BACKOFF_TIME = 0.25
 
@@ -69,9 +69,19 @@ async def _handle_retry(fut: asyncio.Future[None], func, command: bytes) -> None
 class MammotionBaseBLEDevice(MammotionBaseDevice):
     """Base class for Mammotion BLE devices."""
 
-    def __init__(self, state_manager: StateManager, device: BLEDevice, interface: int = 0, **kwargs: Any) -> None:
-        """Initialize MammotionBaseBLEDevice."""
+    transport = "ble"
+
+    def __init__(
+        self,
+        state_manager: StateManager,
+        device: BLEDevice,
+        interface: int = 0,
+        connect: Callable[..., Awaitable[BleakClientWithServiceCache]] = establish_connection,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize MammotionBaseBLEDevice, connect takes the place of establish_connection."""
         super().__init__(state_manager)
+        self._establish_connection = connect
         self._disconnect_strategy = True
         self._ble_sync_task = None
         self._prev_notification = None
@@ -82,11 +92,13 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
         self._write_char: BleakGATTCharacteristic | int | str | UUID = 0
         self._disconnect_timer: asyncio.TimerHandle | None = None
         self._message: BleMessage | None = None
-        self._commands: MammotionCommand = MammotionCommand(device.name)
-        self.command_queue = asyncio.Queue()
+        self._commands: MammotionCommand = MammotionCommand(device.name, self._codec)
+        self.command_queue = CommandQueue()
         self._expected_disconnect = False
         self._connect_lock = asyncio.Lock()
         self._operation_lock = asyncio.Lock()
+        # frames of two commands must not interleave
+        self._write_lock = asyncio.Lock()
         self._key: str | None = None
         self.set_queue_callback(self.queue_command)
         loop = asyncio.get_event_loop()
@@ -99,8 +111,17 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
     async def _ble_sync(self) -> None:
         if self._client is not None and self._client.is_connected:
             _LOGGER.debug("BLE SYNC")
-            command_bytes = self._commands.send_todev_ble_sync(2)
-            await self._message.post_custom_data_bytes(command_bytes)
+            command_bytes = self._commands.build("send_todev_ble_sync", sync_type=2)
+            await self._post_command(command_bytes)
+
+    async def _post_command(self, command: bytes) -> None:
+        async with self._write_lock:
+            await self._message.post_custom_data_bytes(command)
+
+    async def send_unacknowledged(self, command: bytes) -> None:
+        """Send a serialized command without waiting for a response."""
+        await self._ensure_connected()
+        await self._post_command(command)
 
     async def run_periodic_sync_task(self) -> None:
         """Send ble sync to robot."""
@@ -124,23 +145,33 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
             await self._client.disconnect()
 
     async def queue_command(self, key: str, **kwargs: Any) -> bytes | None:
+        return await self._reads.send(key, kwargs, lambda: self._enqueue_command(key, **kwargs))
+
+    async def _enqueue_command(self, key: str, **kwargs: Any) -> bytes | None:
         # Create a future to hold the result
         _LOGGER.debug("Queueing command: %s", key)
         future = asyncio.Future()
         # Put the command in the queue as a tuple (key, command, future)
-        command_bytes = getattr(self._commands, key)(**kwargs)
-        await self.command_queue.put((key, command_bytes, future))
+        command_bytes = self._commands.build(key, **kwargs)
+        await self.command_queue.put((command_priority(key), (key, command_bytes, future, True)))
         # Wait for the future to be resolved
         return await future
         # return await self._send_command_with_args(key, **kwargs)
 
+    async def post_command(self, key: str, **kwargs: Any) -> None:
+        """Queue a command at its priority and return once it is sent, without waiting for a response."""
+        future = self.loop.create_future()
+        command_bytes = self._commands.build(key, **kwargs)
+        await self.command_queue.put((command_priority(key), (key, command_bytes, future, False)))
+        await future
+
     async def process_queue(self) -> None:
         while True:
             # Get the next item from the queue
-            key, command, future = await self.command_queue.get()
+            key, command, future, wait_response = await self.command_queue.get()
             try:
                 # Process the command using _execute_command_locked
-                result = await self._send_command_locked(key, command)
+                result = await self._send_command_locked(key, command, wait_response)
                 # Set the result on the future
                 future.set_result(result)
             except Exception as ex:
@@ -160,7 +191,7 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
             )
         async with self._operation_lock:
             try:
-                command_bytes = getattr(self._commands, key)(**kwargs)
+                command_bytes = self._commands.build(key, **kwargs)
                 return await self._send_command_locked(key, command_bytes)
             except BleakNotFoundError:
                 _LOGGER.exception(
@@ -191,7 +222,7 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
             )
         async with self._operation_lock:
             try:
-                command_bytes = getattr(self._commands, key)()
+                command_bytes = self._commands.build(key)
                 return await self._send_command_locked(key, command_bytes)
             except BleakNotFoundError:
                 _LOGGER.exception(
@@ -252,7 +283,7 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
                 self._reset_disconnect_timer()
                 return
             _LOGGER.debug("%s: Connecting; RSSI: %s", self.name, self.rssi)
-            client: BleakClientWithServiceCache = await establish_connection(
+            client: BleakClientWithServiceCache = await self._establish_connection(
                 BleakClientWithServiceCache,
                 self.ble_device,
                 self.name,
@@ -289,10 +320,13 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
             await self._ble_sync()
             self.schedule_ble_sync()
 
-    async def _send_command_locked(self, key: str, command: bytes) -> bytes:
-        """Send command to device and read response."""
+    async def _send_command_locked(self, key: str, command: bytes, wait_response: bool = True) -> bytes:
+        """Send command to device and read response, or return b"" once sent without wait_response."""
         await self._ensure_connected()
         try:
+            if not wait_response:
+                await self._post_command(command)
+                return b""
             return await self._execute_command_locked(key, command)
         except BleakDBusError as ex:
             # Disconnect so we can reset state and try again
@@ -319,8 +353,14 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
         result = self._message.parseNotification(data)
         if result == 0:
             data = await self._message.parseBlufiNotifyData(True)
+            frame = classify_frame(data)
+            keepalive = is_keepalive(data, frame)
+            if keepalive and (frame != WIFI_STATUS_FRAME or self._commands.get_device_product_key() != ""):
+                self._message.clearNotification()
+                return
+            new_msg = LubaMsg()
             try:
-                self._update_raw_data(data)
+                new_msg = self._parse_notification(data)
             except (KeyError, ValueError, IndexError, UnicodeDecodeError):
                 _LOGGER.exception("Error parsing message %s", data)
                 data = b""
@@ -330,13 +370,10 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
             _LOGGER.debug("%s: Received notification: %s", self.name, data)
         else:
             return
-        new_msg = LubaMsg().parse(data)
-        if betterproto.serialized_on_wire(new_msg.net):
-            if new_msg.net.todev_ble_sync != 0 or has_field(new_msg.net.toapp_wifi_iot_status):
-                if has_field(new_msg.net.toapp_wifi_iot_status) and self._commands.get_device_product_key() == "":
-                    self._commands.set_device_product_key(new_msg.net.toapp_wifi_iot_status.productkey)
-
-                return
+        if keepalive:
+            # the wifi status is only decoded while we still need the product key from it
+            self._commands.set_device_product_key(new_msg.net.toapp_wifi_iot_status.productkey)
+            return
 
         # may or may not be correct, some work could be done here to correctly match responses
         if self._notify_future and not self._notify_future.done():
@@ -356,7 +393,7 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
         self._notify_future = self.loop.create_future()
         self._key = key
         _LOGGER.debug("%s: Sending command: %s", self.name, key)
-        await self._message.post_custom_data_bytes(command)
+        await self._post_command(command)
 
         timeout = 2
         timeout_handle = self.loop.call_at(self.loop.time() + timeout, _handle_timeout, self._notify_future)
@@ -468,8 +505,8 @@ class MammotionBaseBLEDevice(MammotionBaseDevice):
         try:
             """We reset what command the robot last heard before disconnecting."""
             if client is not None and client.is_connected:
-                command_bytes = self._commands.send_todev_ble_sync(2)
-                await self._message.post_custom_data_bytes(command_bytes)
+                command_bytes = self._commands.build("send_todev_ble_sync", sync_type=2)
+                await self._post_command(command_bytes)
                 await client.stop_notify(self._read_char)
                 await client.disconnect()
         except BLEAK_RETRY_EXCEPTIONS as ex:
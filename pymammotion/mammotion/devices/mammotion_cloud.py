@@ -1,40 +1,49 @@
 import asyncio
 import base64
-import json
 import logging
 from asyncio import TimerHandle
-from collections import deque
-from typing import Any, Awaitable, Callable, Optional, cast
-
-import betterproto
+from typing import Any, Awaitable, Callable, Optional
 
 from pymammotion import CloudIOTGateway, MammotionMQTT
 from pymammotion.aliyun.cloud_gateway import DeviceOfflineException
 from pymammotion.aliyun.model.dev_by_account_response import Device
-from pymammotion.data.mqtt.event import ThingEventMessage
-from pymammotion.data.mqtt.properties import ThingPropertiesMessage
+from pymammotion.data.mqtt.event import ThingEventPayload
 from pymammotion.data.state_manager import StateManager
 from pymammotion.event.event import DataEvent
 from pymammotion.mammotion.commands.mammotion_command import MammotionCommand
+from pymammotion.mammotion.commands.priority import CommandQueue, command_priority
 from pymammotion.mammotion.devices.base import MammotionBaseDevice
-from pymammotion.mqtt.mammotion_future import MammotionFuture
-from pymammotion.proto import has_field
+from pymammotion.mqtt.mammotion_future import MammotionFuture, MammotionFutures
 from pymammotion.proto.luba_msg import LubaMsg
+from pymammotion.proto.wire import classify_frame, expected_response, is_keepalive
 
 _LOGGER = logging.getLogger(__name__)
 
+ThingEventHandler = Callable[[ThingEventPayload], Awaitable[None]]
+
+# commands waiting for a response at the same time, across all devices of an account
+DEFAULT_MAX_IN_FLIGHT = 8
+
 
 class MammotionCloud:
     """Per account MQTT cloud."""
 
-    def __init__(self, mqtt_client: MammotionMQTT, cloud_client: CloudIOTGateway) -> None:
+    def __init__(
+        self, mqtt_client: MammotionMQTT, cloud_client: CloudIOTGateway, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    ) -> None:
         self.cloud_client = cloud_client
         self.loop = asyncio.get_event_loop()
         self.is_ready = False
-        self.command_queue = asyncio.Queue()
-        self._waiting_queue = deque()
+        # each device has its own queue so a slow device only delays its own commands
+        self._command_queues: dict[str, CommandQueue] = {}
+        self._queue_workers: dict[str, asyncio.Task] = {}
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._processing = False
+        self._waiting_queue = MammotionFutures()
+        # account wide subscribers get every event, devices register for their own iot_id
         self.mqtt_message_event = DataEvent()
         self.mqtt_properties_event = DataEvent()
+        self._device_handlers: dict[str, tuple[ThingEventHandler, ThingEventHandler]] = {}
         self.on_ready_event = DataEvent()
         self.on_disconnected_event = DataEvent()
         self.on_connected_event = DataEvent()
@@ -49,13 +58,26 @@ class MammotionCloud:
         # self._start_sync_task = self.loop.call_later(30, lambda: asyncio.ensure_future(self.start_sync(0)))
 
     async def on_ready(self) -> None:
-        loop = asyncio.get_event_loop()
-        loop.create_task(self.process_queue())
+        self._processing = True
+        for iot_id in self._command_queues:
+            self._start_queue_worker(iot_id)
         await self.on_ready_event.data_event(None)
 
     def is_connected(self) -> bool:
         return self._mqtt_client.is_connected
 
+    def register_device(
+        self, iot_id: str, message_handler: ThingEventHandler, properties_handler: ThingEventHandler
+    ) -> None:
+        """Deliver the protobuf and property events of iot_id to the handlers, replacing earlier ones."""
+        self._device_handlers[iot_id] = (message_handler, properties_handler)
+
+    def unregister_device(self, iot_id: str, message_handler: ThingEventHandler) -> None:
+        """Stop delivering events of iot_id, unless the handlers were replaced in the meantime."""
+        handlers = self._device_handlers.get(iot_id)
+        if handlers is not None and handlers[0] == message_handler:
+            del self._device_handlers[iot_id]
+
     def disconnect(self) -> None:
         self._mqtt_client.disconnect()
 
@@ -73,21 +95,47 @@ class MammotionCloud:
         """Callback for when MQTT disconnects."""
         await self.on_disconnected_event.data_event(None)
 
-    async def process_queue(self) -> None:
+    async def queue_command(
+        self, iot_id: str, key: str, command: bytes, future: asyncio.Future, wait_response: bool = True
+    ) -> None:
+        """Queue a command for a device, future gets the response, or b"" once sent without wait_response."""
+        queue = self._command_queues.get(iot_id)
+        if queue is None:
+            queue = self._command_queues[iot_id] = CommandQueue()
+        if self._processing:
+            self._start_queue_worker(iot_id)
+        await queue.put((command_priority(key), (iot_id, key, command, future, wait_response)))
+
+    def has_queued_commands(self, iot_id: str) -> bool:
+        queue = self._command_queues.get(iot_id)
+        return queue is not None and not queue.empty()
+
+    def _start_queue_worker(self, iot_id: str) -> None:
+        worker = self._queue_workers.get(iot_id)
+        if worker is None or worker.done():
+            self._queue_workers[iot_id] = self.loop.create_task(self.process_queue(self._command_queues[iot_id]))
+
+    async def process_queue(self, queue: CommandQueue) -> None:
         while True:
             # Get the next item from the queue
-            iot_id, key, command, future = await self.command_queue.get()
+            iot_id, key, command, future, wait_response = await queue.get()
             try:
-                # Process the command using _execute_command_locked
-                result = await self._execute_command_locked(iot_id, key, command)
+                # wait for a free slot of the account, other devices keep going meanwhile
+                async with self._in_flight:
+                    if wait_response:
+                        result = await self._execute_command_locked(iot_id, key, command)
+                    else:
+                        result = await self._post_command_locked(iot_id, key, command)
                 # Set the result on the future
-                future.set_result(result)
+                if not future.done():
+                    future.set_result(result)
             except Exception as ex:
                 # Set the exception on the future if something goes wrong
-                future.set_exception(ex)
+                if not future.done():
+                    future.set_exception(ex)
             finally:
                 # Mark the task as done
-                self.command_queue.task_done()
+                queue.task_done()
 
     async def _execute_command_locked(self, iot_id: str, key: str, command: bytes) -> bytes:
         """Execute command and read response."""
@@ -95,44 +143,58 @@ class MammotionCloud:
         self._key = key
         _LOGGER.debug("Sending command: %s", key)
 
-        await self.loop.run_in_executor(None, self._mqtt_client.get_cloud_client().send_cloud_command, iot_id, command)
-        future = MammotionFuture(iot_id)
-        self._waiting_queue.append(future)
+        # wait before sending, a fast response must not find nobody waiting
+        future = MammotionFuture(iot_id, expected_response(command))
+        self._waiting_queue.add(future)
         timeout = 5
         try:
+            await self.loop.run_in_executor(
+                None, self._mqtt_client.get_cloud_client().send_cloud_command, iot_id, command
+            )
             notify_msg = await future.async_get(timeout)
         except asyncio.TimeoutError:
             _LOGGER.debug("command_locked TimeoutError")
             notify_msg = b""
+        finally:
+            self._waiting_queue.discard(future)
 
         _LOGGER.debug("%s: Message received", iot_id)
 
         return notify_msg
 
-    async def _on_mqtt_message(self, topic: str, payload: str, iot_id: str) -> None:
+    async def _post_command_locked(self, iot_id: str, key: str, command: bytes) -> bytes:
+        """Send command without waiting for the response."""
+        _LOGGER.debug("Posting command: %s", key)
+        await self.loop.run_in_executor(None, self._mqtt_client.get_cloud_client().send_cloud_command, iot_id, command)
+        return b""
+
+    async def _on_mqtt_message(self, topic: str, payload: dict, iot_id: str) -> None:
         """Handle incoming MQTT messages."""
         _LOGGER.debug("MQTT message received on topic %s: %s, iot_id: %s", topic, payload, iot_id)
 
-        json_str = json.dumps(payload)
-        payload = json.loads(json_str)
-
         await self._handle_mqtt_message(topic, payload)
 
     async def _parse_mqtt_response(self, topic: str, payload: dict) -> None:
         """Parse the MQTT response."""
         if topic.endswith("/app/down/thing/events"):
             _LOGGER.debug("Thing event received")
-            event = ThingEventMessage.from_dicts(payload)
-            params = event.params
-            if isinstance(params, dict) or params.identifier is None:
-                _LOGGER.debug("Received dict params: %s", params)
+            # subscribers get the payload wrapped, ThingEventMessage is only built if they read params
+            event = ThingEventPayload(payload)
+            if event.identifier in (None, "device_config_req_event"):
+                _LOGGER.debug("Received dict params: %s", payload.get("params"))
                 return
-            if params.identifier == "device_protobuf_msg_event" and event.method == "thing.events":
+            handlers = self._device_handlers.get(event.iot_id)
+            if event.identifier == "device_protobuf_msg_event" and event.method == "thing.events":
                 _LOGGER.debug("Protobuf event")
-                # Call the callbacks for each cloudDevice
-                await self.mqtt_message_event.data_event(event)
+                if handlers is not None:
+                    await handlers[0](event)
+                if self.mqtt_message_event.has_subscribers():
+                    await self.mqtt_message_event.data_event(event)
             if event.method == "thing.properties":
-                await self.mqtt_properties_event.data_event(event)
+                if handlers is not None:
+                    await handlers[1](event)
+                if self.mqtt_properties_event.has_subscribers():
+                    await self.mqtt_properties_event.data_event(event)
                 _LOGGER.debug(event)
 
     async def _handle_mqtt_message(self, topic: str, payload: dict) -> None:
@@ -151,6 +213,8 @@ class MammotionCloud:
 class MammotionBaseCloudDevice(MammotionBaseDevice):
     """Base class for Mammotion Cloud devices."""
 
+    transport = "cloud"
+
     def __init__(self, mqtt: MammotionCloud, cloud_device: Device, state_manager: StateManager) -> None:
         """Initialize MammotionBaseCloudDevice."""
         super().__init__(state_manager, cloud_device)
@@ -162,10 +226,11 @@ class MammotionBaseCloudDevice(MammotionBaseDevice):
         self.iot_id = cloud_device.iotId
         self.device = cloud_device
         self._command_futures = {}
-        self._commands: MammotionCommand = MammotionCommand(cloud_device.deviceName)
+        self._commands: MammotionCommand = MammotionCommand(cloud_device.deviceName, self._codec)
         self.currentID = ""
-        self._mqtt.mqtt_message_event.add_subscribers(self._parse_message_for_device)
-        self._mqtt.mqtt_properties_event.add_subscribers(self._parse_message_properties_for_device)
+        self._mqtt.register_device(
+            self.iot_id, self._parse_message_for_device, self._parse_message_properties_for_device
+        )
         self._mqtt.on_ready_event.add_subscribers(self.on_ready)
         self._mqtt.on_disconnected_event.add_subscribers(self.on_disconnect)
         self._mqtt.on_connected_event.add_subscribers(self.on_connect)
@@ -178,7 +243,7 @@ class MammotionBaseCloudDevice(MammotionBaseDevice):
         self._mqtt.on_ready_event.remove_subscribers(self.on_ready)
         self._mqtt.on_disconnected_event.remove_subscribers(self.on_disconnect)
         self._mqtt.on_connected_event.remove_subscribers(self.on_connect)
-        self._mqtt.mqtt_message_event.remove_subscribers(self._parse_message_for_device)
+        self._mqtt.unregister_device(self.iot_id, self._parse_message_for_device)
         if self._ble_sync_task:
             self._ble_sync_task.cancel()
 
@@ -217,9 +282,12 @@ class MammotionBaseCloudDevice(MammotionBaseDevice):
             self.mqtt.connect_async()
 
     async def _ble_sync(self) -> None:
-        command_bytes = self._commands.send_todev_ble_sync(3)
+        await self.send_unacknowledged(self._commands.build("send_todev_ble_sync", sync_type=3))
+
+    async def send_unacknowledged(self, command: bytes) -> None:
+        """Send a serialized command without waiting for a response."""
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._mqtt.send_command, self.iot_id, command_bytes)
+        await loop.run_in_executor(None, self._mqtt.send_command, self.iot_id, command)
 
     async def run_periodic_sync_task(self) -> None:
         """Send ble sync to robot."""
@@ -238,19 +306,29 @@ class MammotionBaseCloudDevice(MammotionBaseDevice):
             )
 
     async def queue_command(self, key: str, **kwargs: Any) -> bytes:
+        return await self._reads.send(key, kwargs, lambda: self._enqueue_command(key, **kwargs))
+
+    async def _enqueue_command(self, key: str, **kwargs: Any) -> bytes:
         # Create a future to hold the result
         _LOGGER.debug("Queueing command: %s", key)
         future = asyncio.Future()
         # Put the command in the queue as a tuple (key, command, future)
-        command_bytes = getattr(self._commands, key)(**kwargs)
-        await self._mqtt.command_queue.put((self.iot_id, key, command_bytes, future))
+        command_bytes = self._commands.build(key, **kwargs)
+        await self._mqtt.queue_command(self.iot_id, key, command_bytes, future)
         # Wait for the future to be resolved
         try:
             return await future
         except asyncio.CancelledError:
             """Try again once."""
             future = asyncio.Future()
-            await self._mqtt.command_queue.put((self.iot_id, key, command_bytes, future))
+            await self._mqtt.queue_command(self.iot_id, key, command_bytes, future)
+
+    async def post_command(self, key: str, **kwargs: Any) -> None:
+        """Queue a command at its priority and return once it is sent, without waiting for a response."""
+        future = self.loop.create_future()
+        command_bytes = self._commands.build(key, **kwargs)
+        await self._mqtt.queue_command(self.iot_id, key, command_bytes, future, wait_response=False)
+        await future
 
     def _extract_message_id(self, payload: dict) -> str:
         """Extract the message ID from the payload."""
@@ -265,50 +343,30 @@ class MammotionBaseCloudDevice(MammotionBaseDevice):
             _LOGGER.error("Error extracting encoded message. Payload: %s", payload)
             return ""
 
-    @staticmethod
-    def dequeue_by_iot_id(queue, iot_id):
-        for item in queue:
-            if item.iot_id == iot_id:
-                queue.remove(item)
-                return item
-        return None
-
-    async def _parse_message_properties_for_device(self, event: ThingPropertiesMessage) -> None:
-        if event.params.iotId != self.iot_id:
-            return
+    async def _parse_message_properties_for_device(self, event: ThingEventPayload) -> None:
         self.state_manager.properties(event)
 
-    async def _parse_message_for_device(self, event: ThingEventMessage) -> None:
+    async def _parse_message_for_device(self, event: ThingEventPayload) -> None:
         _LOGGER.debug("_parse_message_for_device")
-        params = event.params
+        if event.content is None:
+            _LOGGER.debug("Event %s for %s has no content", event.identifier, event.iot_id)
+            return
         new_msg = LubaMsg()
-        if event.params.iotId != self.iot_id:
+        binary_data = base64.b64decode(event.content)
+
+        if self._commands.get_device_product_key() == "" and self._commands.get_device_name() == event.device_name:
+            self._commands.set_device_product_key(event.product_key)
+
+        frame = classify_frame(binary_data)
+        if is_keepalive(binary_data, frame):
             return
-        binary_data = base64.b64decode(params.value.content)
+
         try:
-            self._update_raw_data(binary_data)
-            new_msg = LubaMsg().parse(binary_data)
+            new_msg = self._parse_notification(binary_data)
         except (KeyError, ValueError, IndexError, UnicodeDecodeError):
             _LOGGER.exception("Error parsing message %s", binary_data)
 
-        if (
-            self._commands.get_device_product_key() == ""
-            and self._commands.get_device_name() == event.params.deviceName
-        ):
-            self._commands.set_device_product_key(event.params.productKey)
-
-        if betterproto.serialized_on_wire(new_msg.net):
-            if new_msg.net.todev_ble_sync != 0 or has_field(new_msg.net.toapp_wifi_iot_status):
-                return
-
-        if len(self._mqtt.waiting_queue) > 0:
-            fut: MammotionFuture = self.dequeue_by_iot_id(self._mqtt.waiting_queue, self.iot_id)
-            if fut is None:
-                return
-            while fut.fut.cancelled() and len(self._mqtt.waiting_queue) > 0:
-                fut = self.dequeue_by_iot_id(self._mqtt.waiting_queue, self.iot_id)
-            if not fut.fut.cancelled():
-                fut.resolve(cast(bytes, binary_data))
+        self._mqtt.waiting_queue.resolve(self.iot_id, frame, binary_data)
         await self._state_manager.notification(new_msg)
 
     @property
@@ -0,0 +1,199 @@
+"""Fetch every missing frame of the map with a window of requests in flight."""
+
+import asyncio
+import contextlib
+import logging
+from typing import Any, Awaitable, Callable
+
+from pymammotion.data.map_cache import MapCache
+from pymammotion.data.model import RegionData
+from pymammotion.data.model.hash_list import FrameList, HashList
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck, SvgMessageAckT
+
+_LOGGER = logging.getLogger(__name__)
+
+# requests sent without waiting for the answers to the earlier ones
+DEFAULT_WINDOW = 4
+# seconds after which a frame that has not arrived is asked for again
+DEFAULT_TIMEOUT = 5.0
+# times a frame is asked for before the sync gives up on it
+DEFAULT_ATTEMPTS = 3
+
+MapRequest = tuple[str, dict[str, Any]]
+
+
+def _frame_requests(frame_list: FrameList) -> dict[tuple, MapRequest]:
+    first = frame_list.data[0]
+    hash_id = first.data_hash if isinstance(first, SvgMessageAckT) else first.hash
+    requests: dict[tuple, MapRequest] = {}
+    for frame in frame_list.missing_frames():
+        if frame == 1:
+            requests[("frame", first.type, hash_id, frame)] = ("synchronize_hash_data", {"hash_num": hash_id})
+            continue
+        region_data = RegionData()
+        region_data.hash = hash_id
+        region_data.action = first.action if isinstance(first, NavGetCommDataAck) else None
+        region_data.type = first.type
+        region_data.total_frame = frame_list.total_frame
+        # the device answers with the frame after current_frame
+        region_data.current_frame = frame - 1
+        requests[("frame", first.type, hash_id, frame)] = ("get_regional_data", {"regional_data": region_data})
+    return requests
+
+
+def missing_requests(hash_list: HashList) -> dict[tuple, MapRequest]:
+    """Build a request for every frame the map is missing, keyed by the frame it fetches.
+
+    Frames of the root hash list come first, then the first frame of hashes not seen yet,
+    then the remaining frames of hashes that are partly there.
+    """
+    root = hash_list.root_hash_list
+    requests: dict[tuple, MapRequest] = {}
+    if len(root.data) == 0:
+        requests[("root", 1)] = ("get_all_boundary_hash_list", {"sub_cmd": 0})
+    for frame in hash_list.missing_hash_frame():
+        if frame == 1:
+            requests[("root", frame)] = ("get_all_boundary_hash_list", {"sub_cmd": 0})
+        else:
+            requests[("root", frame)] = (
+                "get_hash_response",
+                {"total_frame": root.total_frame, "current_frame": frame - 1},
+            )
+    for hash_id in hash_list.missing_hashlist:
+        requests[("hash", hash_id)] = ("synchronize_hash_data", {"hash_num": hash_id})
+    for frame_list in hash_list.incomplete_frame_lists:
+        requests.update(_frame_requests(frame_list))
+    return requests
+
+
+class MapSync:
+    """Keep up to window map requests in flight until no frame is missing.
+
+    Answers are not awaited, they land in the HashList through the state manager, which calls
+    progress. A request that has not been answered after timeout is sent again, up to attempts times.
+    With a cache, hashes of the root list that are on disk are read instead of requested, and a
+    complete map is written back.
+    """
+
+    def __init__(
+        self,
+        hash_list: Callable[[], HashList],
+        send: Callable[[str, dict[str, Any]], Awaitable[None]],
+        window: int = DEFAULT_WINDOW,
+        timeout: float = DEFAULT_TIMEOUT,
+        attempts: int = DEFAULT_ATTEMPTS,
+        cache: MapCache | None = None,
+    ) -> None:
+        """Create a sync of the map returned by hash_list, requests are sent with send(key, kwargs)."""
+        self._hash_list = hash_list
+        self._send = send
+        self.window = window
+        self.timeout = timeout
+        self.attempts = attempts
+        self.cache = cache
+        self._lock = asyncio.Lock()
+        self._progress = asyncio.Event()
+        self.sent = 0
+
+    @property
+    def running(self) -> bool:
+        """Check if a sync is running."""
+        return self._lock.locked()
+
+    def progress(self) -> None:
+        """Wake the sync up, call when a frame of the map arrived."""
+        self._progress.set()
+
+    async def run(self, refresh: bool = False) -> bool:
+        """Fetch the missing frames, return whether the map is complete.
+
+        With refresh the root hash list is asked for first, so hashes added on the device are found.
+        """
+        async with self._lock:
+            if refresh:
+                await self._refresh()
+            return await self._run()
+
+    async def _refresh(self) -> None:
+        self._progress.clear()
+        await self._send("get_all_boundary_hash_list", {"sub_cmd": 0})
+        self.sent += 1
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._progress.wait(), self.timeout)
+
+    async def _run(self) -> bool:
+        loop = asyncio.get_running_loop()
+        attempts: dict[tuple, int] = {}
+        # request key to the time it is given up on
+        in_flight: dict[tuple, float] = {}
+        # hashes already looked up in the cache
+        looked_up: set[int] = set()
+        while True:
+            self._progress.clear()
+            if self.cache is not None:
+                await self._restore(looked_up)
+            missing = missing_requests(self._hash_list())
+            now = loop.time()
+            for key, deadline in list(in_flight.items()):
+                if key not in missing or deadline <= now:
+                    del in_flight[key]
+            pending = [key for key in missing if key not in in_flight and attempts.get(key, 0) < self.attempts]
+            if not pending and not in_flight:
+                if missing:
+                    _LOGGER.warning("Map sync gave up on %d frames", len(missing))
+                elif self.cache is not None:
+                    await self._save()
+                return not missing
+
+            sends = pending[: max(self.window - len(in_flight), 0)]
+            for key in sends:
+                attempts[key] = attempts.get(key, 0) + 1
+            await self._send_all({key: missing[key] for key in sends})
+            # sends wait their turn in the command queue, the timeout runs from when they went out
+            sent_at = loop.time()
+            for key in sends:
+                in_flight[key] = sent_at + self.timeout
+
+            wait = min(in_flight.values()) - loop.time()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._progress.wait(), max(wait, 0))
+
+    async def _send_all(self, requests: dict[tuple, MapRequest]) -> None:
+        results = await asyncio.gather(*(self._send(*request) for request in requests.values()), return_exceptions=True)
+        self.sent += len(requests)
+        for key, result in zip(requests, results):
+            if isinstance(result, Exception):
+                _LOGGER.debug("Sending map request %s failed: %s", key, result)
+
+    async def _restore(self, looked_up: set[int]) -> None:
+        """Add the frames of missing hashes that are in the cache."""
+        cache = self.cache
+        if cache is None:
+            return
+        hash_list = self._hash_list()
+        wanted = [hash_id for hash_id in hash_list.missing_hashlist if hash_id not in looked_up]
+        if not wanted:
+            return
+        looked_up.update(wanted)
+        loaded = await asyncio.get_running_loop().run_in_executor(None, cache.load, wanted)
+        for frames in loaded.values():
+            for frame in frames:
+                hash_list.update(frame)
+        if loaded:
+            _LOGGER.debug("Restored %d map elements from the cache", len(loaded))
+
+    async def _save(self) -> None:
+        cache = self.cache
+        if cache is None:
+            return
+        hash_list = self._hash_list()
+        elements = {
+            hash_id: list(frame_list.data)
+            for frames in (hash_list.area, hash_list.obstacle, hash_list.path, hash_list.dump, hash_list.svg)
+            for hash_id, frame_list in frames.items()
+            if frame_list.complete
+        }
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, cache.save, set(hash_list.hashlist), elements)
+        except OSError as err:
+            _LOGGER.warning("Writing the map cache failed: %s", err)
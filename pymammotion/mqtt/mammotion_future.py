@@ -1,4 +1,5 @@
 from asyncio import Future
+from collections import deque
 
 import async_timeout
 
@@ -6,13 +7,16 @@ import async_timeout
 class MammotionFuture:
     """Create futures for each MQTT Message."""
 
-    def __init__(self, iot_id) -> None:
+    def __init__(self, iot_id, response: frozenset[tuple[str, str]] | None = None) -> None:
+        """Create a future for a command sent to iot_id."""
         self.iot_id = iot_id
+        # frames that answer the command, None if any frame does
+        self.response = response
         self.fut: Future = Future()
         self.loop = self.fut.get_loop()
 
     def _resolve(self, item: bytes) -> None:
-        if not self.fut.cancelled():
+        if not self.fut.done():
             self.fut.set_result(item)
 
     def resolve(self, item: bytes) -> None:
@@ -24,3 +28,55 @@ class MammotionFuture:
                 return await self.fut
         finally:
             self.fut.cancel()
+
+
+class MammotionFutures:
+    """Futures waiting for a response, indexed by iot_id and the frames they expect."""
+
+    def __init__(self) -> None:
+        """Create an empty set of futures."""
+        self._futures: dict[str, dict[frozenset[tuple[str, str]] | None, deque[MammotionFuture]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of futures waiting."""
+        return sum(len(waiting) for by_frame in self._futures.values() for waiting in by_frame.values())
+
+    def add(self, future: MammotionFuture) -> None:
+        """Wait for the response of a future, after the ones added before it."""
+        self._futures.setdefault(future.iot_id, {}).setdefault(future.response, deque()).append(future)
+
+    def discard(self, future: MammotionFuture) -> None:
+        """Forget a future once its waiter is done with it."""
+        waiting = self._futures.get(future.iot_id, {}).get(future.response)
+        if waiting is None:
+            return
+        try:
+            waiting.remove(future)
+        except ValueError:
+            return
+        self._prune(future.iot_id, future.response)
+
+    def _prune(self, iot_id: str, response: frozenset[tuple[str, str]] | None) -> None:
+        by_frame = self._futures[iot_id]
+        if not by_frame[response]:
+            del by_frame[response]
+            if not by_frame:
+                del self._futures[iot_id]
+
+    def resolve(self, iot_id: str, frame: tuple[str, str], data: bytes) -> bool:
+        """Resolve the oldest future that frame answers, or else the oldest one that takes any frame."""
+        by_frame = self._futures.get(iot_id)
+        if not by_frame:
+            return False
+        # a list, pruning removes entries from by_frame on the way
+        answered = [response for response in by_frame if response is not None and frame in response]
+        for response in [*answered, None]:
+            waiting = by_frame.get(response)
+            while waiting:
+                future = waiting.popleft()
+                if not waiting:
+                    self._prune(iot_id, response)
+                if not future.fut.done():
+                    future.resolve(data)
+                    return True
+        return False
@@ -6,10 +6,12 @@ import hashlib
 import hmac
 import json
 import logging
+import threading
 from logging import getLogger
 from typing import Awaitable, Callable, Optional
 
 import betterproto
+import orjson
 from linkkit.linkkit import LinkKit
 from paho.mqtt.client import MQTTMessage
 
@@ -17,6 +19,7 @@ from pymammotion.aliyun.cloud_gateway import CloudIOTGateway
 from pymammotion.data.mqtt.event import ThingEventMessage
 from pymammotion.data.mqtt.properties import ThingPropertiesMessage
 from pymammotion.data.mqtt.status import ThingStatusMessage
+from pymammotion.mqtt.topic_router import REPLY_TOPICS, SUBSCRIBED_TOPICS, TopicRouter
 from pymammotion.proto.luba_msg import LubaMsg
 
 logger = getLogger(__name__)
@@ -44,7 +47,7 @@ class MammotionMQTT:
         self.on_ready: Optional[Callable[[], Awaitable[None]]] = None
         self.on_error: Optional[Callable[[str], Awaitable[None]]] = None
         self.on_disconnected: Optional[Callable[[], Awaitable[None]]] = None
-        self.on_message: Optional[Callable[[str, str, str], Awaitable[None]]] = None
+        self.on_message: Optional[Callable[[str, dict, str], Awaitable[None]]] = None
 
         self._product_key = product_key
         self._device_name = device_name
@@ -62,6 +65,12 @@ class MammotionMQTT:
 
         self._client_id = client_id
         self.loop = asyncio.get_running_loop()
+        # messages handed over from the linkkit thread, drained on the loop in batches
+        self._inbox: list[tuple[str, dict, str]] = []
+        self._inbox_lock = threading.Lock()
+        self._drain_scheduled = False
+        # handler tasks of the messages, the loop only holds weak references to them
+        self._message_tasks: set[asyncio.Task[None]] = set()
 
         self._linkkit_client = LinkKit(
             region_id,
@@ -81,6 +90,15 @@ class MammotionMQTT:
         self._linkkit_client.on_topic_message = self._thing_on_topic_message
         self._mqtt_host = f"{self._product_key}.iot-as-mqtt.{region_id}.aliyuncs.com"
 
+        self._router = TopicRouter(f"/sys/{self._product_key}/{self._device_name}")
+        for suffix in SUBSCRIBED_TOPICS:
+            self._router.add_route(suffix, None if suffix in REPLY_TOPICS else self._forward_message)
+
+    @property
+    def topic_metrics(self) -> dict[str, int]:
+        """Messages received per topic suffix, topics we did not subscribe to are counted as unknown."""
+        return dict(self._router.metrics)
+
     def connect_async(self) -> None:
         """Connect async to MQTT Server."""
         logger.info("Connecting...")
@@ -100,27 +118,8 @@ class MammotionMQTT:
         self.is_connected = True
         # logger.debug('subscribe_topic, topic:%s' % echo_topic)
         # self._linkkit_client.subscribe_topic(echo_topic, 0)
-        self._linkkit_client.subscribe_topic(
-            f"/sys/{self._product_key}/{self._device_name}/app/down/account/bind_reply"
-        )
-        self._linkkit_client.subscribe_topic(
-            f"/sys/{self._product_key}/{self._device_name}/app/down/thing/event/property/post_reply"
-        )
-        self._linkkit_client.subscribe_topic(
-            f"/sys/{self._product_key}/{self._device_name}/app/down/thing/wifi/status/notify"
-        )
-        self._linkkit_client.subscribe_topic(
-            f"/sys/{self._product_key}/{self._device_name}/app/down/thing/wifi/connect/event/notify"
-        )
-        self._linkkit_client.subscribe_topic(
-            f"/sys/{self._product_key}/{self._device_name}/app/down/_thing/event/notify"
-        )
-        self._linkkit_client.subscribe_topic(f"/sys/{self._product_key}/{self._device_name}/app/down/thing/events")
-        self._linkkit_client.subscribe_topic(f"/sys/{self._product_key}/{self._device_name}/app/down/thing/status")
-        self._linkkit_client.subscribe_topic(f"/sys/{self._product_key}/{self._device_name}/app/down/thing/properties")
-        self._linkkit_client.subscribe_topic(
-            f"/sys/{self._product_key}/{self._device_name}/app/down/thing/model/down_raw"
-        )
+        for suffix in SUBSCRIBED_TOPICS:
+            self._linkkit_client.subscribe_topic(self._router.topic(suffix))
 
         self._linkkit_client.publish_topic(
             f"/sys/{self._product_key}/{self._device_name}/app/up/account/bind",
@@ -150,11 +149,39 @@ class MammotionMQTT:
             payload,
             qos,
         )
-        payload = json.loads(payload)
-        iot_id = payload.get("params", {}).get("iotId", "")
+        self._router.route(topic, payload)
+
+    def _forward_message(self, topic: str, payload: bytes) -> None:
+        """Parse the payload and hand it to the loop if it is for a device."""
+        message = orjson.loads(payload)
+        iot_id = (message.get("params") or {}).get("iotId", "")
         if iot_id != "" and self.on_message:
-            future = asyncio.run_coroutine_threadsafe(self.on_message(topic, payload, iot_id), self.loop)
-            asyncio.wrap_future(future, loop=self.loop)
+            with self._inbox_lock:
+                self._inbox.append((topic, message, iot_id))
+                if self._drain_scheduled:
+                    return
+                self._drain_scheduled = True
+            # only the first message of a batch wakes up the loop
+            self.loop.call_soon_threadsafe(self._drain_inbox)
+
+    def _drain_inbox(self) -> None:
+        """Start the handlers of every message handed over since the last drain, runs on the loop."""
+        with self._inbox_lock:
+            batch, self._inbox = self._inbox, []
+            self._drain_scheduled = False
+        if self.on_message is None:
+            return
+        # handlers can wait on command responses that arrive in later messages, so each gets a task
+        for topic, payload, iot_id in batch:
+            task: asyncio.Task[None] = self.loop.create_task(self.on_message(topic, payload, iot_id))
+            self._message_tasks.add(task)
+            task.add_done_callback(self._message_done)
+
+    def _message_done(self, task: asyncio.Task[None]) -> None:
+        """Forget the task of a handled message and log what it raised."""
+        self._message_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Handling an MQTT message failed", exc_info=task.exception())
 
     def _thing_on_connect(self, session_flag, rc, user_data) -> None:
         """Is called on thing connect."""
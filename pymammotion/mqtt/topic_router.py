@@ -0,0 +1,70 @@
+"""Route the topics of one MQTT session before their payload is parsed."""
+
+from collections import Counter
+from logging import getLogger
+from typing import Callable, Optional
+
+logger = getLogger(__name__)
+
+BIND_REPLY = "/app/down/account/bind_reply"
+PROPERTY_POST_REPLY = "/app/down/thing/event/property/post_reply"
+WIFI_STATUS_NOTIFY = "/app/down/thing/wifi/status/notify"
+WIFI_CONNECT_NOTIFY = "/app/down/thing/wifi/connect/event/notify"
+THING_EVENT_NOTIFY = "/app/down/_thing/event/notify"
+THING_EVENTS = "/app/down/thing/events"
+THING_STATUS = "/app/down/thing/status"
+THING_PROPERTIES = "/app/down/thing/properties"
+MODEL_DOWN_RAW = "/app/down/thing/model/down_raw"
+
+# every topic subscribed to once the thing is enabled
+SUBSCRIBED_TOPICS = (
+    BIND_REPLY,
+    PROPERTY_POST_REPLY,
+    WIFI_STATUS_NOTIFY,
+    WIFI_CONNECT_NOTIFY,
+    THING_EVENT_NOTIFY,
+    THING_EVENTS,
+    THING_STATUS,
+    THING_PROPERTIES,
+    MODEL_DOWN_RAW,
+)
+
+# acknowledgements of what we published, nothing in them is used
+REPLY_TOPICS = (BIND_REPLY, PROPERTY_POST_REPLY)
+
+UNKNOWN = "unknown"
+
+TopicHandler = Callable[[str, bytes], None]
+
+
+class TopicRouter:
+    """Map full topic names of one device session to handlers.
+
+    The topic names are built once from the prefix so routing is a single dict lookup.
+    Topics routed without a handler are only counted, as are topics nobody registered.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        """Create a router for topics under prefix."""
+        self._prefix = prefix
+        self._routes: dict[str, tuple[str, Optional[TopicHandler]]] = {}
+        self.metrics: Counter[str] = Counter()
+
+    def topic(self, suffix: str) -> str:
+        """Full topic name of a suffix."""
+        return f"{self._prefix}{suffix}"
+
+    def add_route(self, suffix: str, handler: Optional[TopicHandler]) -> None:
+        """Send messages on the topic to handler, or count and drop them when handler is None."""
+        self._routes[self.topic(suffix)] = (suffix, handler)
+
+    def route(self, topic: str, payload: bytes) -> bool:
+        """Hand a message to the handler of its topic, returns False if it was dropped."""
+        suffix, handler = self._routes.get(topic, (UNKNOWN, None))
+        self.metrics[suffix] += 1
+        if handler is None:
+            if suffix == UNKNOWN:
+                logger.debug("Message on unknown topic %s", topic)
+            return False
+        handler(topic, payload)
+        return True
@@ -0,0 +1,370 @@
+"""Protobuf codecs used to decode notifications and encode commands.
+
+The betterproto dataclasses are the model the rest of the library is written against.
+``UpbCodec`` decodes with the compiled ``*_pb2`` modules instead and hands out
+:class:`MessageView` objects, which read like the betterproto messages, so the state code
+works unchanged with either codec.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import inspect
+import logging
+from abc import ABC, abstractmethod
+from base64 import b64encode
+from typing import Any, Callable, List, get_type_hints
+
+import betterproto
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import Message as PbMessage
+
+from pymammotion.proto import luba_msg_pb2
+from pymammotion.proto.luba_msg import LubaMsg
+
+_LOGGER = logging.getLogger(__name__)
+
+_PROTO_TYPES: dict[int, str] = {
+    FieldDescriptor.TYPE_DOUBLE: betterproto.TYPE_DOUBLE,
+    FieldDescriptor.TYPE_FLOAT: betterproto.TYPE_FLOAT,
+    FieldDescriptor.TYPE_INT64: betterproto.TYPE_INT64,
+    FieldDescriptor.TYPE_UINT64: betterproto.TYPE_UINT64,
+    FieldDescriptor.TYPE_INT32: betterproto.TYPE_INT32,
+    FieldDescriptor.TYPE_FIXED64: betterproto.TYPE_FIXED64,
+    FieldDescriptor.TYPE_FIXED32: betterproto.TYPE_FIXED32,
+    FieldDescriptor.TYPE_BOOL: betterproto.TYPE_BOOL,
+    FieldDescriptor.TYPE_STRING: betterproto.TYPE_STRING,
+    FieldDescriptor.TYPE_MESSAGE: betterproto.TYPE_MESSAGE,
+    FieldDescriptor.TYPE_BYTES: betterproto.TYPE_BYTES,
+    FieldDescriptor.TYPE_UINT32: betterproto.TYPE_UINT32,
+    FieldDescriptor.TYPE_ENUM: betterproto.TYPE_ENUM,
+    FieldDescriptor.TYPE_SFIXED32: betterproto.TYPE_SFIXED32,
+    FieldDescriptor.TYPE_SFIXED64: betterproto.TYPE_SFIXED64,
+    FieldDescriptor.TYPE_SINT32: betterproto.TYPE_SINT32,
+    FieldDescriptor.TYPE_SINT64: betterproto.TYPE_SINT64,
+}
+
+
+class ProtoCodec(ABC):
+    """Decode LubaMsg notifications and encode commands with one protobuf runtime."""
+
+    name: str = ""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Decode a LubaMsg."""
+
+    def encode(self, message: Any) -> bytes:
+        """Serialize a betterproto or pb2 message."""
+        return message.SerializeToString()
+
+    @abstractmethod
+    def which_one_of(self, message: Any, group_name: str) -> tuple[str, Any]:
+        """Return the name and value of the field set in a oneof group, using the betterproto names."""
+
+    @abstractmethod
+    def has_field(self, message: Any) -> bool:
+        """Check if the message was serialized on the wire."""
+
+    @abstractmethod
+    def is_message(self, value: Any) -> bool:
+        """Check if a decoded value is a message rather than a scalar."""
+
+    @abstractmethod
+    def to_betterproto(self, message: Any) -> betterproto.Message:
+        """Return the message as a betterproto dataclass, for data that is stored and serialized."""
+
+
+class BetterprotoCodec(ProtoCodec):
+    """Pure python codec built on the betterproto dataclasses."""
+
+    name = "betterproto"
+
+    def decode(self, data: bytes) -> LubaMsg:
+        """Decode a LubaMsg."""
+        return LubaMsg().parse(data)
+
+    def which_one_of(self, message: betterproto.Message, group_name: str) -> tuple[str, Any]:
+        """Return the name and value of the field set in a oneof group."""
+        return betterproto.which_one_of(message, group_name)
+
+    def has_field(self, message: betterproto.Message) -> bool:
+        """Check if the message was serialized on the wire."""
+        return betterproto.serialized_on_wire(message)
+
+    def is_message(self, value: Any) -> bool:
+        """Check if a decoded value is a message rather than a scalar."""
+        return isinstance(value, betterproto.Message)
+
+    def to_betterproto(self, message: betterproto.Message) -> betterproto.Message:
+        """Betterproto messages are returned as is."""
+        return message
+
+
+@dataclasses.dataclass
+class _FieldSpec:
+    """A field present in both the betterproto dataclass and the pb2 descriptor."""
+
+    name: str
+    pb_name: str
+    proto_type: str
+    repeated: bool
+    schema: _MessageSchema | None = None
+    enum_names: list[str] | None = None
+
+
+class _MessageSchema:
+    """Maps a pb2 descriptor onto the betterproto dataclass generated from the same message."""
+
+    def __init__(self, descriptor: Descriptor, message_cls: type[betterproto.Message]) -> None:
+        self.descriptor = descriptor
+        self.message_cls = message_cls
+        self.fields: dict[str, _FieldSpec] = {}
+        self.by_pb_name: dict[str, _FieldSpec] = {}
+        # wire types and field numbers agree for the message itself
+        self.compatible = True
+        # ... and for every message reachable from it
+        self.deep_compatible = True
+        self._keys: dict[Callable[[str], str], dict[str, str]] = {}
+
+    def keys(self, casing: Callable[[str], str]) -> dict[str, str]:
+        """Return the dict keys of the fields for a casing, the same ones betterproto's to_dict uses."""
+        keys = self._keys.get(casing)
+        if keys is None:
+            keys = self._keys[casing] = {
+                pb_name: casing(spec.name).rstrip("_") for pb_name, spec in self.by_pb_name.items()
+            }
+        return keys
+
+
+def _build_schema(
+    descriptor: Descriptor, message_cls: type[betterproto.Message], schemas: dict[str, _MessageSchema]
+) -> _MessageSchema:
+    """Pair the fields of a descriptor with the betterproto fields by number."""
+    schema = schemas.get(descriptor.full_name)
+    if schema is not None:
+        return schema
+    schema = schemas[descriptor.full_name] = _MessageSchema(descriptor, message_cls)
+
+    pb_fields = descriptor.fields_by_number
+    # resolved once per class, betterproto's _type_hint resolves all hints on every call
+    type_hints = get_type_hints(message_cls, vars(inspect.getmodule(message_cls)))
+    numbers = set()
+    for field in dataclasses.fields(message_cls):
+        meta = betterproto.FieldMetadata.get(field)
+        numbers.add(meta.number)
+        pb_field = pb_fields.get(meta.number)
+        type_hint = type_hints[field.name]
+        repeated = getattr(type_hint, "__origin__", None) in (list, List)
+        if (
+            pb_field is None
+            or _PROTO_TYPES.get(pb_field.type) != meta.proto_type
+            or repeated != (pb_field.label == FieldDescriptor.LABEL_REPEATED)
+        ):
+            _LOGGER.debug("%s.%s differs between betterproto and pb2", descriptor.full_name, field.name)
+            schema.compatible = False
+            continue
+
+        spec = _FieldSpec(name=field.name, pb_name=pb_field.name, proto_type=meta.proto_type, repeated=repeated)
+        field_cls = type_hint.__args__[0] if repeated else type_hint
+        if meta.proto_type == betterproto.TYPE_MESSAGE:
+            if not isinstance(field_cls, type) or not issubclass(field_cls, betterproto.Message):
+                schema.compatible = False
+                continue
+            spec.schema = _build_schema(pb_field.message_type, field_cls, schemas)
+        elif meta.proto_type == betterproto.TYPE_ENUM:
+            # betterproto's to_dict looks enum names up by position, do the same
+            spec.enum_names = [member.name for member in field_cls]
+        schema.fields[field.name] = spec
+        schema.by_pb_name[pb_field.name] = spec
+
+    if numbers.symmetric_difference(pb_fields):
+        schema.compatible = False
+    return schema
+
+
+def _build_schemas(descriptor: Descriptor, message_cls: type[betterproto.Message]) -> _MessageSchema:
+    """Build the schema tree of a root message and work out which messages can be viewed."""
+    schemas: dict[str, _MessageSchema] = {}
+    root = _build_schema(descriptor, message_cls, schemas)
+    for schema in schemas.values():
+        schema.deep_compatible = schema.compatible
+    changed = True
+    while changed:
+        changed = False
+        for schema in schemas.values():
+            if schema.deep_compatible and any(
+                spec.schema is not None and not spec.schema.deep_compatible for spec in schema.fields.values()
+            ):
+                schema.deep_compatible = False
+                changed = True
+    return root
+
+
+class MessageView:
+    """Read only view of a pb2 message under the betterproto field names.
+
+    Attribute access, ``to_dict`` and ``SerializeToString`` behave like the betterproto
+    message of the same type. Use :meth:`ProtoCodec.to_betterproto` to get a real dataclass.
+    """
+
+    __slots__ = ("_message", "_schema", "_present")
+
+    def __init__(self, message: PbMessage, schema: _MessageSchema, present: bool = True) -> None:
+        """Wrap a pb2 message, present is False for a sub message that was not on the wire."""
+        self._message = message
+        self._schema = schema
+        self._present = present
+
+    def __getattr__(self, name: str) -> Any:
+        """Read a field by its betterproto name."""
+        spec = self._schema.fields.get(name)
+        if spec is None:
+            raise AttributeError(f"{self._schema.message_cls.__name__} has no field {name}")
+        value = getattr(self._message, spec.pb_name)
+        if spec.schema is not None:
+            if spec.repeated:
+                return [MessageView(item, spec.schema) for item in value]
+            return MessageView(value, spec.schema, self._message.HasField(spec.pb_name))
+        if spec.repeated:
+            return list(value)
+        return value
+
+    def __bytes__(self) -> bytes:
+        """Serialize the wrapped message."""
+        return self._message.SerializeToString()
+
+    def __repr__(self) -> str:
+        """Show the message under its betterproto name."""
+        return f"{self._schema.message_cls.__name__}View({self.to_dict(betterproto.Casing.SNAKE)})"
+
+    def SerializeToString(self) -> bytes:
+        """Serialize the wrapped message."""
+        return self._message.SerializeToString()
+
+    def to_dict(self, casing: betterproto.Casing = betterproto.Casing.CAMEL) -> dict[str, Any]:
+        """Return the same dict betterproto's to_dict gives for this message."""
+        output: dict[str, Any] = {}
+        schema = self._schema
+        keys = schema.keys(casing)
+        for pb_field, value in self._message.ListFields():
+            spec = schema.by_pb_name[pb_field.name]
+            key = keys[pb_field.name]
+            if spec.schema is not None:
+                if spec.repeated:
+                    output[key] = [MessageView(item, spec.schema).to_dict(casing) for item in value]
+                else:
+                    output[key] = MessageView(value, spec.schema).to_dict(casing)
+                continue
+            if spec.repeated:
+                values = list(value)
+            elif not value:
+                # a oneof member set to its default is listed by pb2 but skipped by betterproto
+                continue
+            else:
+                values = None
+            if spec.proto_type in betterproto.INT_64_TYPES:
+                output[key] = [str(item) for item in values] if values is not None else str(value)
+            elif spec.proto_type == betterproto.TYPE_BYTES:
+                output[key] = (
+                    [b64encode(item).decode("utf8") for item in values]
+                    if values is not None
+                    else b64encode(value).decode("utf8")
+                )
+            elif spec.enum_names is not None:
+                output[key] = (
+                    [spec.enum_names[item] for item in values] if values is not None else spec.enum_names[value]
+                )
+            else:
+                output[key] = values if values is not None else value
+        return output
+
+
+def _can_view(message: PbMessage, schema: _MessageSchema) -> bool:
+    """Check the fields that are set only go through messages both runtimes decode the same way."""
+    if schema.deep_compatible:
+        return True
+    if not schema.compatible:
+        return False
+    for pb_field, value in message.ListFields():
+        spec = schema.by_pb_name[pb_field.name]
+        if spec.schema is None or spec.schema.deep_compatible:
+            continue
+        for item in value if spec.repeated else (value,):
+            if not _can_view(item, spec.schema):
+                return False
+    return True
+
+
+class UpbCodec(BetterprotoCodec):
+    """Codec built on the compiled pb2 modules, upb when the protobuf runtime provides it.
+
+    A few messages were generated differently for betterproto and pb2 (field types or
+    numbers do not match), notifications carrying one of those are decoded with betterproto
+    so both codecs always produce the same state.
+    """
+
+    name = "protobuf"
+
+    def __init__(self) -> None:
+        """Pair the pb2 descriptors with the betterproto dataclasses."""
+        self._schema = _build_schemas(luba_msg_pb2.LubaMsg.DESCRIPTOR, LubaMsg)
+
+    def decode(self, data: bytes) -> MessageView | LubaMsg:
+        """Decode a LubaMsg, falling back to betterproto for messages the schemas disagree on."""
+        message = luba_msg_pb2.LubaMsg.FromString(data)
+        if _can_view(message, self._schema):
+            return MessageView(message, self._schema)
+        return LubaMsg().parse(data)
+
+    def which_one_of(self, message: MessageView | betterproto.Message, group_name: str) -> tuple[str, Any]:
+        """Return the name and value of the field set in a oneof group."""
+        if not isinstance(message, MessageView):
+            return betterproto.which_one_of(message, group_name)
+        try:
+            pb_name = message._message.WhichOneof(group_name)
+        except ValueError:
+            return "", None
+        if pb_name is None:
+            return "", None
+        spec = message._schema.by_pb_name[pb_name]
+        return spec.name, getattr(message, spec.name)
+
+    def has_field(self, message: MessageView | betterproto.Message) -> bool:
+        """Check if the message was serialized on the wire."""
+        if isinstance(message, MessageView):
+            return message._present
+        return betterproto.serialized_on_wire(message)
+
+    def is_message(self, value: Any) -> bool:
+        """Check if a decoded value is a message rather than a scalar."""
+        return isinstance(value, (MessageView, betterproto.Message))
+
+    def to_betterproto(self, message: MessageView | betterproto.Message) -> betterproto.Message:
+        """Decode a view again as the betterproto dataclass of its type."""
+        if isinstance(message, MessageView):
+            converted = message._schema.message_cls().parse(message.SerializeToString())
+            converted._serialized_on_wire = message._present
+            return converted
+        return message
+
+
+CODECS: dict[str, type[ProtoCodec]] = {
+    BetterprotoCodec.name: BetterprotoCodec,
+    UpbCodec.name: UpbCodec,
+    "upb": UpbCodec,
+}
+
+_codecs: dict[type[ProtoCodec], ProtoCodec] = {}
+
+
+def get_codec(name: str = BetterprotoCodec.name) -> ProtoCodec:
+    """Return the shared codec registered under name, betterproto by default."""
+    try:
+        codec_cls = CODECS[name]
+    except KeyError as err:
+        raise ValueError(f"Unknown protobuf codec: {name}") from err
+    codec = _codecs.get(codec_cls)
+    if codec is None:
+        codec = _codecs[codec_cls] = codec_cls()
+    return codec
@@ -0,0 +1,219 @@
+"""Classify serialized LubaMsg frames straight from the wire, without decoding them."""
+
+import dataclasses
+import inspect
+from typing import get_type_hints
+
+import betterproto
+
+from pymammotion.proto.luba_msg import LubaMsg
+
+WIRE_VARINT = 0
+WIRE_FIXED_64 = 1
+WIRE_LEN_DELIM = 2
+WIRE_FIXED_32 = 5
+
+BLE_SYNC_FRAME = ("net", "todev_ble_sync")
+WIFI_STATUS_FRAME = ("net", "toapp_wifi_iot_status")
+# frames the transports drop before decoding
+KEEPALIVE_FRAMES: frozenset[tuple[str, str]] = frozenset({BLE_SYNC_FRAME, WIFI_STATUS_FRAME})
+
+
+def _oneof_fields(message_cls: type[betterproto.Message]) -> dict[int, dataclasses.Field]:
+    """Field number -> field for every oneof member of a message."""
+    return {
+        meta.number: field
+        for field in dataclasses.fields(message_cls)
+        if (meta := betterproto.FieldMetadata.get(field)).group is not None
+    }
+
+
+def _sub_messages() -> dict[int, tuple[str, dict[int, str]]]:
+    """LubaMsg field number -> (group name, oneof field number -> sub message name)."""
+    type_hints = get_type_hints(LubaMsg, vars(inspect.getmodule(LubaMsg)))
+    return {
+        number: (
+            field.name,
+            {sub_number: sub_field.name for sub_number, sub_field in _oneof_fields(type_hints[field.name]).items()},
+        )
+        for number, field in _oneof_fields(LubaMsg).items()
+    }
+
+
+_SUB_MESSAGES = _sub_messages()
+# (group name, sub message name) -> (LubaMsg field number, oneof field number)
+FIELD_NUMBERS: dict[tuple[str, str], tuple[int, int]] = {
+    (group, name): (number, sub_number)
+    for number, (group, members) in _SUB_MESSAGES.items()
+    for sub_number, name in members.items()
+}
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Read a varint, returns the value and the position after it."""
+    byte = data[pos]
+    if byte < 0x80:
+        # tags and small values fit a single byte
+        return byte, pos + 1
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _skip_field(data: bytes, pos: int, wire_type: int) -> int:
+    """Return the position after the value of a field."""
+    if wire_type == WIRE_VARINT:
+        return _read_varint(data, pos)[1]
+    if wire_type == WIRE_LEN_DELIM:
+        length, pos = _read_varint(data, pos)
+        return pos + length
+    if wire_type == WIRE_FIXED_64:
+        return pos + 8
+    if wire_type == WIRE_FIXED_32:
+        return pos + 4
+    raise ValueError(f"Unsupported wire type {wire_type}")
+
+
+def encode_varint(value: int) -> bytes:
+    """Serialize a non negative int as a varint."""
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def split_field(data: bytes, number: int) -> tuple[bytes, bytes] | None:
+    """Cut a top level field out of a serialized message, returns the bytes before and after it.
+
+    None if the field is not set or the message is malformed.
+    """
+    try:
+        pos = 0
+        end = len(data)
+        while pos < end:
+            start = pos
+            tag, pos = _read_varint(data, pos)
+            pos = _skip_field(data, pos, tag & 7)
+            if tag >> 3 == number:
+                return data[:start], data[pos:]
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
+def read_fields(data: bytes) -> dict[int, int | bytes]:
+    """Read the top level fields of a serialized message by number, varints as ints and the rest as bytes.
+
+    A repeated field keeps its last value. Raises IndexError if the message is cut short.
+    """
+    fields: dict[int, int | bytes] = {}
+    pos = 0
+    end = len(data)
+    while pos < end:
+        tag, pos = _read_varint(data, pos)
+        wire_type = tag & 7
+        if wire_type == WIRE_VARINT:
+            fields[tag >> 3], pos = _read_varint(data, pos)
+            continue
+        start = pos
+        if wire_type == WIRE_LEN_DELIM:
+            length, start = _read_varint(data, pos)
+            pos = start + length
+        else:
+            pos = _skip_field(data, pos, wire_type)
+        if pos > end:
+            raise IndexError("field runs past the end of the message")
+        fields[tag >> 3] = data[start:pos]
+    return fields
+
+
+def _first_member(data: bytes, pos: int, end: int, members: dict[int, str]) -> str:
+    """Name of the first oneof member found between pos and end."""
+    while pos < end:
+        tag, pos = _read_varint(data, pos)
+        name = members.get(tag >> 3)
+        if name is not None:
+            return name
+        pos = _skip_field(data, pos, tag & 7)
+    return ""
+
+
+def classify_frame(data: bytes) -> tuple[str, str]:
+    """Return the LubaSubMsg group and the sub message name of a serialized LubaMsg.
+
+    Only the tags are read, nothing is allocated. Frames that carry no known sub message,
+    or that are malformed, give empty names and are left to the full decode.
+    """
+    try:
+        pos = 0
+        end = len(data)
+        while pos < end:
+            tag, pos = _read_varint(data, pos)
+            wire_type = tag & 7
+            sub_message = _SUB_MESSAGES.get(tag >> 3)
+            if sub_message is None or wire_type != WIRE_LEN_DELIM:
+                pos = _skip_field(data, pos, wire_type)
+                continue
+            length, pos = _read_varint(data, pos)
+            group, members = sub_message
+            return group, _first_member(data, pos, min(pos + length, end), members)
+    except (IndexError, ValueError):
+        pass
+    return "", ""
+
+
+def is_keepalive(data: bytes, frame: tuple[str, str] | None = None) -> bool:
+    """Check if a serialized LubaMsg is keepalive traffic that does not need decoding.
+
+    frame is classify_frame(data) if the caller has it already. A todev_ble_sync of 0 is not
+    keepalive, the transports always decoded those.
+    """
+    if frame is None:
+        frame = classify_frame(data)
+    if frame != BLE_SYNC_FRAME:
+        return frame in KEEPALIVE_FRAMES
+    group_number, sub_number = FIELD_NUMBERS[BLE_SYNC_FRAME]
+    try:
+        group = read_fields(data).get(group_number, b"")
+        return isinstance(group, bytes) and read_fields(group).get(sub_number, 0) != 0
+    except (IndexError, ValueError):
+        return False
+
+
+# request frame -> the frames the device answers it with, requests missing here are answered by any frame
+RESPONSE_FRAMES: dict[tuple[str, str], frozenset[tuple[str, str]]] = {
+    ("nav", "todev_gethash"): frozenset({("nav", "toapp_gethash_ack")}),
+    ("nav", "todev_get_commondata"): frozenset({("nav", "toapp_get_commondata_ack"), ("nav", "toapp_svg_msg")}),
+    ("nav", "todev_work_report_cmd"): frozenset({("nav", "toapp_work_report_ack")}),
+    ("nav", "todev_work_report_update_cmd"): frozenset({("nav", "toapp_work_report_update_ack")}),
+    ("nav", "bidire_reqconver_path"): frozenset({("nav", "bidire_reqconver_path")}),
+    ("sys", "todev_get_dev_fw_info"): frozenset({("sys", "toapp_dev_fw_info")}),
+    ("sys", "todev_lora_cfg_req"): frozenset({("sys", "toapp_lora_cfg_rsp")}),
+    ("sys", "todev_mow_info_up"): frozenset({("sys", "toapp_mow_info")}),
+    ("sys", "todev_report_cfg"): frozenset({("sys", "toapp_report_data")}),
+    ("net", "todev_devinfo_req"): frozenset({("net", "toapp_devinfo_resp")}),
+    ("net", "todev_get_mnet_cfg_req"): frozenset({("net", "toapp_get_mnet_cfg_rsp")}),
+    ("net", "todev_set_mnet_cfg_req"): frozenset({("net", "toapp_set_mnet_cfg_rsp")}),
+    ("net", "todev_mnet_info_req"): frozenset({("net", "toapp_mnet_info_rsp")}),
+    ("net", "todev_networkinfo_req"): frozenset({("net", "toapp_networkinfo_rsp")}),
+    ("net", "todev_uploadfile_req"): frozenset({("net", "toapp_uploadfile_rsp")}),
+    ("net", "todev__wifi_list_upload"): frozenset({("net", "toapp__list_upload")}),
+    ("net", "todev__wifi_msg_upload"): frozenset({("net", "toapp__wifi_msg")}),
+    ("driver", "rtk_cfg_req"): frozenset({("driver", "rtk_cfg_req_ack")}),
+    ("driver", "rtk_sys_mask_query"): frozenset({("driver", "rtk_sys_mask_query_ack")}),
+    ("ota", "todev_get_info_req"): frozenset({("ota", "toapp_get_info_rsp")}),
+    ("mul", "set_video"): frozenset({("mul", "set_video_ack")}),
+    ("mul", "set_wiper"): frozenset({("mul", "set_wiper_ack")}),
+}
+
+
+def expected_response(command: bytes) -> frozenset[tuple[str, str]] | None:
+    """Return the frames that answer a serialized command, None if any frame can."""
+    return RESPONSE_FRAMES.get(classify_frame(command))
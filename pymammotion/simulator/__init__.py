@@ -0,0 +1,7 @@
+"""Package for simulated mowers behind the cloud and Bluetooth transports."""
+
+from .ble import SimulatedBleakClient, SimulatedBluetooth
+from .cloud import SimulatedCloud
+from .mower import SimulatedMower
+
+__all__ = ["SimulatedBleakClient", "SimulatedBluetooth", "SimulatedCloud", "SimulatedMower"]
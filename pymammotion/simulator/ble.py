@@ -0,0 +1,167 @@
+"""Stand in for the Bleak client of a mower, speaking blufi frames to a simulated mower."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from bleak import BLEDevice
+from bleak_retry_connector import BleakNotFoundError
+
+from pymammotion.bluetooth.const import UUID_NOTIFICATION_CHARACTERISTIC, UUID_WRITE_CHARACTERISTIC
+from pymammotion.bluetooth.data.framectrldata import FrameCtrlData
+from pymammotion.simulator.mower import SimulatedMower
+
+# custom data packets are type 1 (data), subtype 19
+DATA_TYPE = 19 << 2 | 1
+# data bytes in one notification, what fits a 247 byte MTU after the ATT and blufi headers
+PACKET_DATA = 240
+# first data bytes of all but the last packet of a frame, the length of the whole frame
+FRAG_LENGTH_BYTES = 2
+
+NotifyCallback = Callable[[str, bytearray], Awaitable[None]]
+
+
+def notification_packets(frame: bytes, first_sequence: int, packet_data: int = PACKET_DATA) -> list[bytes]:
+    """Cut frame into the blufi packets a mower notifies, sequence numbers counting from first_sequence."""
+    total = len(frame).to_bytes(FRAG_LENGTH_BYTES, "little")
+    step = packet_data - FRAG_LENGTH_BYTES
+    chunks = []
+    remaining = frame
+    while len(remaining) > packet_data:
+        chunks.append((True, total + remaining[:step]))
+        remaining = remaining[step:]
+    chunks.append((False, remaining))
+    return [
+        bytes([DATA_TYPE, FrameCtrlData.getFrameCTRLValue(False, False, 1, False, frag), sequence & 255, len(data)])
+        + data
+        for sequence, (frag, data) in enumerate(chunks, first_sequence)
+    ]
+
+
+class SimulatedBleakClient:
+    """Take the place of BleakClientWithServiceCache for MammotionBaseBLEDevice.
+
+    Writes are put back together into commands for the mower, what it answers and pushes while
+    notifications are on is cut into packets again and handed to the notify callback, one task
+    per packet as Bleak does. latency is the time in seconds a write takes to reach the mower.
+    """
+
+    def __init__(
+        self,
+        mower: SimulatedMower,
+        disconnected_callback: Optional[Callable[["SimulatedBleakClient"], None]] = None,
+        latency: float = 0.0,
+    ) -> None:
+        """Create a client connected to mower."""
+        self.mower = mower
+        self.latency = latency
+        self.is_connected = True
+        self.loop = asyncio.get_event_loop()
+        self._disconnected_callback = disconnected_callback
+        self._callback: NotifyCallback | None = None
+        self._sequence = 0
+        self._incoming = bytearray()
+        self._push_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        # packets notified, keepalives included
+        self.packets = 0
+
+    @property
+    def services(self) -> "SimulatedBleakClient":
+        """Return the client itself, it resolves the characteristics."""
+        return self
+
+    def get_characteristic(self, uuid: Any) -> str | None:
+        """Get the characteristic of a Mammotion uuid."""
+        uuid = str(uuid)
+        return uuid if uuid in (UUID_WRITE_CHARACTERISTIC, UUID_NOTIFICATION_CHARACTERISTIC) else None
+
+    async def start_notify(self, _char_specifier: Any, callback: NotifyCallback, **_kwargs: Any) -> None:
+        """Notify callback of every packet from now on, the mower starts pushing."""
+        self._callback = callback
+        if self._push_task is None:
+            self._push_task = self.loop.create_task(self.mower.run(self._push))
+
+    async def stop_notify(self, _char_specifier: Any) -> None:
+        """Stop notifying and pushing."""
+        self._callback = None
+        if self._push_task is not None:
+            self._push_task.cancel()
+            self._push_task = None
+
+    async def write_gatt_char(self, _char_specifier: Any, data: bytes, response: bool = False) -> None:
+        """Collect a packet of a command, the mower gets it with the last packet."""
+        frame_ctrl = FrameCtrlData(data[1])
+        self._incoming += data[4 : 4 + data[3]]
+        if frame_ctrl.hasFrag():
+            return
+        command, self._incoming = bytes(self._incoming), bytearray()
+        if self.latency:
+            self.loop.call_later(self.latency, self._answer, command)
+        else:
+            self._answer(command)
+
+    def _answer(self, command: bytes) -> None:
+        for frame in self.mower.handle(command):
+            self._notify(frame)
+
+    async def _push(self, frame: bytes) -> None:
+        self._notify(frame)
+
+    def _notify(self, frame: bytes) -> None:
+        callback = self._callback
+        if callback is None or not self.is_connected:
+            return
+        packets = notification_packets(frame, self._sequence)
+        self._sequence = (self._sequence + len(packets)) & 255
+        for packet in packets:
+            self.packets += 1
+            # keep a reference until the task is done, the loop only holds weak ones
+            task = self.loop.create_task(callback(UUID_NOTIFICATION_CHARACTERISTIC, bytearray(packet)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def disconnect(self) -> bool:
+        """Disconnect and tell the disconnected callback."""
+        if not self.is_connected:
+            return True
+        await self.stop_notify(UUID_NOTIFICATION_CHARACTERISTIC)
+        self.is_connected = False
+        if self._disconnected_callback is not None:
+            self._disconnected_callback(self)
+        return True
+
+    async def clear_cache(self) -> bool:
+        """Nothing is cached."""
+        return True
+
+
+class SimulatedBluetooth:
+    """Mowers in range by address, connect is what MammotionBaseBLEDevice takes to reach them."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Create an empty radio, writes take latency seconds to reach a mower."""
+        self.latency = latency
+        self.mowers: dict[str, SimulatedMower] = {}
+        self.clients: dict[str, SimulatedBleakClient] = {}
+
+    def add_mower(self, mower: SimulatedMower, address: str | None = None) -> BLEDevice:
+        """Put mower in range and return the device to connect to, the address is made up if not given."""
+        address = address or "AA:BB:" + ":".join(f"{byte:02X}" for byte in len(self.mowers).to_bytes(4, "big"))
+        self.mowers[address] = mower
+        return BLEDevice(address, mower.name, None, -60)
+
+    async def connect(
+        self,
+        _client_class: type,
+        device: BLEDevice,
+        _name: str,
+        disconnected_callback: Optional[Callable[[SimulatedBleakClient], None]] = None,
+        **_kwargs: Any,
+    ) -> SimulatedBleakClient:
+        """Connect to the mower at the address of device, with the arguments of establish_connection."""
+        mower = self.mowers.get(device.address)
+        if mower is None:
+            raise BleakNotFoundError(f"{device.address} is not in range")
+        client = SimulatedBleakClient(mower, disconnected_callback, self.latency)
+        self.clients[device.address] = client
+        return client
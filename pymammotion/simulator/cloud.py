@@ -0,0 +1,165 @@
+"""Stand in for the MQTT client and the cloud gateway of an account, in front of simulated mowers."""
+
+import asyncio
+import base64
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+import orjson
+
+from pymammotion.aliyun.cloud_gateway import DeviceOfflineException
+from pymammotion.aliyun.model.dev_by_account_response import Device
+from pymammotion.simulator.mower import SimulatedMower
+
+PRODUCT_KEY = "a1sim"
+# the cloud answers this code for a device it cannot reach
+DEVICE_OFFLINE = 6205
+
+
+class SimulatedCloud:
+    """Take the place of MammotionMQTT and CloudIOTGateway for MammotionCloud.
+
+    Commands go to the mower with the iot_id they are sent to, what it answers and pushes comes
+    back as thing events through on_message, serialized to JSON and parsed again on the way like
+    the real ones. latency is the time in seconds a command takes to reach the mower.
+    """
+
+    def __init__(self, device_name: str = "SIM-ACCOUNT", latency: float = 0.0) -> None:
+        """Create an account without mowers, it connects when connect_async is called."""
+        self.loop = asyncio.get_event_loop()
+        self.latency = latency
+        self.is_connected = False
+        self.is_ready = False
+        self.on_connected: Optional[Callable[[], Awaitable[None]]] = None
+        self.on_ready: Optional[Callable[[], Awaitable[None]]] = None
+        self.on_disconnected: Optional[Callable[[], Awaitable[None]]] = None
+        self.on_message: Optional[Callable[[str, dict, str], Awaitable[None]]] = None
+        self.topic = f"/sys/{PRODUCT_KEY}/{device_name}/app/down/thing/events"
+        self.mowers: dict[str, SimulatedMower] = {}
+        # commands sent and frames delivered, keepalives included
+        self.commands = 0
+        self.frames = 0
+        self._push_tasks: dict[str, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def add_mower(self, mower: SimulatedMower) -> Device:
+        """Make mower reachable under its iot_id and return it as the account lists it, it pushes once started."""
+        self.mowers[mower.iot_id] = mower
+        return Device(
+            gmtModified=0,
+            netType="NET_WIFI",
+            categoryKey="LawnMower",
+            productKey=PRODUCT_KEY,
+            nodeType="DEVICE",
+            isEdgeGateway=False,
+            deviceName=mower.name,
+            categoryName="LawnMower",
+            identityAlias="",
+            productName="Luba",
+            iotId=mower.iot_id,
+            bindTime=0,
+            owned=1,
+            identityId="",
+            thingType="DEVICE",
+            status=1,
+        )
+
+    @property
+    def pending(self) -> int:
+        """Get the number of messages handed to on_message that are not handled yet."""
+        return len(self._tasks)
+
+    def get_cloud_client(self) -> "SimulatedCloud":
+        """Return the cloud itself, it sends the commands as well."""
+        return self
+
+    def connect_async(self) -> None:
+        """Connect, then report ready once the event topics would be subscribed."""
+        self._spawn(self._connect())
+
+    async def _connect(self) -> None:
+        self.is_connected = True
+        if self.on_connected is not None:
+            await self.on_connected()
+        self.is_ready = True
+        if self.on_ready is not None:
+            await self.on_ready()
+
+    def disconnect(self) -> None:
+        """Stop the pushes and disconnect."""
+        self.stop()
+        self.is_connected = False
+        self.is_ready = False
+        if self.on_disconnected is not None:
+            self._spawn(self.on_disconnected())
+
+    def start(self, spread: float = 0.0) -> None:
+        """Start the reports and rapid states of every mower not pushing yet, spread over spread seconds."""
+        for index, (iot_id, mower) in enumerate(self.mowers.items()):
+            if iot_id not in self._push_tasks:
+                delay = spread * index / len(self.mowers)
+                self._push_tasks[iot_id] = self.loop.create_task(mower.run(self._pusher(mower), delay))
+
+    def stop(self) -> None:
+        """Stop the pushes of every mower."""
+        for task in self._push_tasks.values():
+            task.cancel()
+        self._push_tasks.clear()
+
+    def _pusher(self, mower: SimulatedMower) -> Callable[[bytes], Awaitable[None]]:
+        async def push(frame: bytes) -> None:
+            self._deliver(mower, frame)
+
+        return push
+
+    def send_cloud_command(self, iot_id: str, command: bytes) -> str:
+        """Hand command to the mower and return the message id, safe to call from any thread."""
+        mower = self.mowers.get(iot_id)
+        if mower is None or not self.is_connected:
+            raise DeviceOfflineException(DEVICE_OFFLINE)
+        self.commands += 1
+        self.loop.call_soon_threadsafe(self._schedule, mower, command)
+        return str(uuid.uuid4())
+
+    def _schedule(self, mower: SimulatedMower, command: bytes) -> None:
+        if self.latency:
+            self.loop.call_later(self.latency, self._answer, mower, command)
+        else:
+            self._answer(mower, command)
+
+    def _answer(self, mower: SimulatedMower, command: bytes) -> None:
+        for frame in mower.handle(command):
+            self._deliver(mower, frame)
+
+    def _deliver(self, mower: SimulatedMower, frame: bytes) -> None:
+        """Send frame to on_message in a task of its own, as MammotionMQTT does."""
+        if self.on_message is None or not self.is_connected:
+            return
+        self.frames += 1
+        now = round(time.time() * 1000)
+        message = orjson.dumps(
+            {
+                "method": "thing.events",
+                "id": str(self.frames),
+                "version": "1.0",
+                "params": {
+                    "productKey": PRODUCT_KEY,
+                    "deviceName": mower.name,
+                    "iotId": mower.iot_id,
+                    "identifier": "device_protobuf_msg_event",
+                    "type": "info",
+                    "gmtCreate": now,
+                    "time": now,
+                    "value": {"content": base64.b64encode(frame).decode()},
+                },
+            }
+        )
+        payload = orjson.loads(message)
+        self._spawn(self.on_message(self.topic, payload, mower.iot_id))
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        # keep a reference until the task is done, the loop only holds weak ones
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
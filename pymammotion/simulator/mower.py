@@ -0,0 +1,390 @@
+"""A mower that answers serialized commands with the frames a real one sends back."""
+
+import asyncio
+import inspect
+import math
+import time
+from typing import Any, Awaitable, Callable, NamedTuple, get_type_hints
+
+import betterproto
+
+from pymammotion.data.model.hash_list import PathType
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.luba_msg import LubaMsg, MsgAttr, MsgCmdType, MsgDevice
+from pymammotion.proto.mctrl_driver import DrvMotionCtrl
+from pymammotion.proto.mctrl_nav import (
+    AppGetAllAreaHashName,
+    AreaHashName,
+    NavGetCommData,
+    NavGetCommDataAck,
+    NavGetHashList,
+    NavGetHashListAck,
+    NavMapNameMsg,
+    NavPlanJobSet,
+    NavSysParamMsg,
+    NavTaskCtrl,
+    NavTaskCtrlAck,
+)
+from pymammotion.proto.mctrl_sys import (
+    DeviceFwInfo,
+    DeviceProductTypeInfoT,
+    ReportInfoCfg,
+    ReportInfoData,
+    RptAct,
+    RptConnectStatus,
+    RptDevLocation,
+    RptDevStatus,
+    RptRtk,
+    RptWork,
+    SysCommCmd,
+    SystemRapidStateTunnelMsg,
+)
+from pymammotion.proto.wire import (
+    FIELD_NUMBERS,
+    RESPONSE_FRAMES,
+    WIRE_LEN_DELIM,
+    WIRE_VARINT,
+    classify_frame,
+    encode_varint,
+    read_fields,
+)
+from pymammotion.utility.constant import WorkMode
+
+# hashes in one frame of the root hash list
+HASHES_PER_FRAME = 8
+# side of a square area, areas are laid out in a row with GAP between them
+AREA_SIZE = 20.0
+GAP = 5.0
+# mowing speed along the lanes in metres per second, lanes are WIDTH apart
+MOWING_SPEED = 0.4
+WIDTH = 0.25
+
+# NavTaskCtrl action -> the mode the mower goes to
+TASK_ACTIONS = {
+    1: WorkMode.MODE_WORKING,
+    2: WorkMode.MODE_PAUSE,
+    3: WorkMode.MODE_WORKING,
+    4: WorkMode.MODE_READY,
+    5: WorkMode.MODE_RETURNING,
+}
+
+# LubaMsg field numbers of the header, in the order they are written
+_HEADER = {"msgtype": 1, "sender": 2, "rcver": 3, "msgattr": 4, "seqs": 5, "version": 6}
+_TIMESTAMP = 15
+
+Push = Callable[[bytes], Awaitable[None]]
+
+
+def _member_types() -> dict[tuple[str, str], Any]:
+    """(group name, sub message name) -> the type of the sub message."""
+    group_types = get_type_hints(LubaMsg, vars(inspect.getmodule(LubaMsg)))
+    hints = {
+        group: get_type_hints(group_types[group], vars(inspect.getmodule(group_types[group])))
+        for group in {group for group, _ in FIELD_NUMBERS}
+    }
+    return {(group, name): hints[group][name] for group, name in FIELD_NUMBERS}
+
+
+_MEMBER_TYPES = _member_types()
+
+
+class Request(NamedTuple):
+    """Header fields of a command that its answer is addressed by."""
+
+    msgtype: int
+    rcver: int
+
+
+def _varint_field(number: int, value: int) -> bytes:
+    return encode_varint(number << 3 | WIRE_VARINT) + encode_varint(value)
+
+
+def _len_field(number: int, payload: bytes) -> bytes:
+    return encode_varint(number << 3 | WIRE_LEN_DELIM) + encode_varint(len(payload)) + payload
+
+
+class SimulatedMower:
+    """Protocol state of one mower: a yard of square areas, a position and the report settings.
+
+    Frames go in and out serialized, as they do on the transports. Commands that have no
+    behaviour here but a known response type are answered with an empty response.
+    """
+
+    def __init__(
+        self,
+        name: str = "Luba-SIM",
+        iot_id: str | None = None,
+        areas: int = 4,
+        frames: int = 2,
+        points_per_frame: int = 20,
+        report_interval: float | None = 1.0,
+        rapid_state_interval: float | None = 1.0,
+    ) -> None:
+        """Create a docked mower with areas areas of frames map frames each, pushing at the intervals in seconds."""
+        self.name = name
+        self.iot_id = iot_id or f"IOT-{name}"
+        self.hash_ids = list(range(1001, 1001 + areas))
+        self.frames = frames
+        self.points_per_frame = points_per_frame
+        self.report_interval = report_interval
+        self.rapid_state_interval = rapid_state_interval
+        self.sys_status = WorkMode.MODE_READY
+        self.battery = 100.0
+        self.x = self.y = self.toward = 0.0
+        # setpoint of the last send_movement, mm/s and mrad/s
+        self.linear_speed = self.angular_speed = 0
+        # commands received by name, keepalive included
+        self.received: dict[str, int] = {}
+        self._seqs = 0
+        self._moved_at: float | None = None
+        self._lane_direction = 1.0
+
+    def handle(self, data: bytes) -> list[bytes]:
+        """Answer a serialized LubaMsg command, returns the frames to send back in order."""
+        group, name = classify_frame(data)
+        self.received[name] = self.received.get(name, 0) + 1
+        if not name:
+            return []
+        # only the command itself is decoded, a whole LubaMsg costs as much as the library's decode
+        fields = read_fields(data)
+        group_number, sub_number = FIELD_NUMBERS[group, name]
+        msgtype = fields.get(_HEADER["msgtype"], 0)
+        rcver = fields.get(_HEADER["rcver"], 0)
+        group_msg = fields.get(group_number, b"")
+        # a malformed command gets no answer
+        if not (isinstance(msgtype, int) and isinstance(rcver, int) and isinstance(group_msg, bytes)):
+            return []
+        request = Request(msgtype, rcver)
+        handler = getattr(self, f"_on_{name}", None)
+        if handler is not None:
+            value = read_fields(group_msg).get(sub_number, b"")
+            member_type = _MEMBER_TYPES[group, name]
+            is_message = isinstance(value, bytes) and issubclass(member_type, betterproto.Message)
+            command = member_type().parse(value) if is_message else value
+            frames: list[bytes] = handler(request, command)
+            return frames
+        response = RESPONSE_FRAMES.get((group, name))
+        if response is None:
+            return []
+        # any of the frames answers, always pick the same one
+        return [self._reply(request, *min(response), b"")]
+
+    def _on_todev_gethash(self, request: Request, command: NavGetHashList) -> list[bytes]:
+        return [self._root_frame(request, command.current_frame + 1 if command.sub_cmd == 2 else 1)]
+
+    def _on_todev_get_commondata(self, request: Request, command: NavGetCommData) -> list[bytes]:
+        current_frame = command.current_frame + 1 if command.sub_cmd == 2 else 1
+        return [self._area_frame(request, command.hash, current_frame, command.sub_cmd)]
+
+    def _on_todev_report_cfg(self, _request: Request, command: ReportInfoCfg) -> list[bytes]:
+        if command.act == RptAct.RPT_STOP:
+            self.report_interval = None
+            return []
+        self.report_interval = command.period / 1000 if command.period else self.report_interval
+        return [self.report_frame()]
+
+    def _on_todev_devmotion_ctrl(self, _request: Request, command: DrvMotionCtrl) -> list[bytes]:
+        self.move()
+        self.linear_speed = command.set_linear_speed
+        self.angular_speed = command.set_angular_speed
+        return []
+
+    def _on_todev_taskctrl(self, request: Request, command: NavTaskCtrl) -> list[bytes]:
+        self.move()
+        self.sys_status = TASK_ACTIONS.get(command.action, self.sys_status)
+        ack = NavTaskCtrlAck(type=command.type, action=command.action, nav_state=self.sys_status)
+        return [self._reply(request, "nav", "todev_taskctrl_ack", ack)]
+
+    def _on_toapp_map_name_msg(self, request: Request, command: NavMapNameMsg) -> list[bytes]:
+        names = [AreaHashName(name=f"area {index}", hash=hash_id) for index, hash_id in enumerate(self.hash_ids, 1)]
+        names_msg = AppGetAllAreaHashName(device_id=command.device_id, hashnames=names)
+        return [self._reply(request, "nav", "toapp_all_hash_name", names_msg)]
+
+    def _on_todev_planjob_set(self, request: Request, command: NavPlanJobSet) -> list[bytes]:
+        # there are no schedules, the plan asked for comes back empty
+        plan = NavPlanJobSet(pver=command.pver, sub_cmd=command.sub_cmd)
+        return [self._reply(request, "nav", "todev_planjob_set", plan)]
+
+    def _on_bidire_comm_cmd(self, request: Request, command: SysCommCmd) -> list[bytes]:
+        # general read and write commands come back with what was read or written
+        return [self._reply(request, "sys", "bidire_comm_cmd", command)]
+
+    def _on_nav_sys_param_cmd(self, request: Request, command: NavSysParamMsg) -> list[bytes]:
+        return [self._reply(request, "nav", "nav_sys_param_cmd", command)]
+
+    def _on_device_product_type_info(self, request: Request, _command: DeviceProductTypeInfoT) -> list[bytes]:
+        info = DeviceProductTypeInfoT(result=1, main_product_type="HM010", sub_product_type="HM010")
+        return [self._reply(request, "sys", "device_product_type_info", info)]
+
+    def _on_todev_get_dev_fw_info(self, request: Request, _command: int) -> list[bytes]:
+        info = DeviceFwInfo(result=1, version="1.10.5.23")
+        return [self._reply(request, "sys", "toapp_dev_fw_info", info)]
+
+    def _reply(self, request: Request, group: str, name: str, sub_message: betterproto.Message | bytes) -> bytes:
+        return self._encode(request.msgtype, request.rcver, MsgAttr.MSG_ATTR_RESP, group, name, sub_message)
+
+    def _encode(
+        self, msgtype: int, sender: int, msgattr: int, group: str, name: str, sub_message: betterproto.Message | bytes
+    ) -> bytes:
+        """Serialize a LubaMsg with sub_message as group.name.
+
+        Only the sub message goes through betterproto, building a whole LubaMsg fills in the
+        defaults of every group and costs ten times as much as the frame it encodes.
+        """
+        self._seqs += 1
+        header = {
+            "msgtype": msgtype,
+            "sender": sender,
+            "rcver": MsgDevice.DEV_MOBILEAPP,
+            "msgattr": msgattr,
+            "seqs": self._seqs,
+            "version": 1,
+        }
+        group_number, sub_number = FIELD_NUMBERS[group, name]
+        payload = sub_message if isinstance(sub_message, bytes) else bytes(sub_message)
+        return b"".join(
+            [
+                *(_varint_field(number, int(header[key])) for key, number in _HEADER.items() if header[key]),
+                _len_field(group_number, _len_field(sub_number, payload)),
+                _varint_field(_TIMESTAMP, round(time.time() * 1000)),
+            ]
+        )
+
+    def _root_frame(self, request: Request, current_frame: int) -> bytes:
+        pages = [
+            self.hash_ids[start : start + HASHES_PER_FRAME] for start in range(0, len(self.hash_ids), HASHES_PER_FRAME)
+        ] or [[]]
+        current_frame = min(current_frame, len(pages))
+        ack = NavGetHashListAck(
+            pver=1,
+            sub_cmd=2,
+            total_frame=len(pages),
+            current_frame=current_frame,
+            hash_len=len(self.hash_ids),
+            data_couple=pages[current_frame - 1],
+        )
+        return self._reply(request, "nav", "toapp_gethash_ack", ack)
+
+    def _area_frame(self, request: Request, hash_id: int, current_frame: int, sub_cmd: int) -> bytes:
+        if hash_id not in self.hash_ids:
+            ack = NavGetCommDataAck(pver=1, sub_cmd=sub_cmd, result=1, action=8, hash=hash_id)
+            return self._reply(request, "nav", "toapp_get_commondata_ack", ack)
+        points = self.area_points(hash_id)
+        current_frame = min(current_frame, self.frames)
+        page = points[(current_frame - 1) * self.points_per_frame : current_frame * self.points_per_frame]
+        ack = NavGetCommDataAck(
+            pver=1,
+            sub_cmd=sub_cmd,
+            action=8,
+            type=PathType.AREA,
+            hash=hash_id,
+            total_frame=self.frames,
+            current_frame=current_frame,
+            data_len=len(page),
+            data_couple=[CommDataCouple(x=x, y=y) for x, y in page],
+        )
+        return self._reply(request, "nav", "toapp_get_commondata_ack", ack)
+
+    def area_points(self, hash_id: int) -> list[tuple[float, float]]:
+        """Get the ENU outline of an area, frames * points_per_frame points around a square."""
+        left = self.hash_ids.index(hash_id) * (AREA_SIZE + GAP)
+        count = self.frames * self.points_per_frame
+        points = []
+        for index in range(count):
+            # distance along the outline, counter clockwise from the south west corner
+            along = 4 * AREA_SIZE * index / count
+            side, offset = divmod(along, AREA_SIZE)
+            corner = [(left, 0.0), (left + AREA_SIZE, 0.0), (left + AREA_SIZE, AREA_SIZE), (left, AREA_SIZE)]
+            x, y = corner[int(side)]
+            dx, dy = [(1, 0), (0, 1), (-1, 0), (0, -1)][int(side)]
+            points.append((x + dx * offset, y + dy * offset))
+        return points
+
+    def move(self, now: float | None = None) -> None:
+        """Advance the position to now, along the lanes of the first area while working."""
+        now = time.monotonic() if now is None else now
+        elapsed = 0.0 if self._moved_at is None else now - self._moved_at
+        self._moved_at = now
+        if self.sys_status == WorkMode.MODE_WORKING:
+            self._mow(elapsed)
+        elif self.linear_speed or self.angular_speed:
+            self.toward += self.angular_speed / 1000 * elapsed
+            self.x += math.cos(self.toward) * self.linear_speed / 1000 * elapsed
+            self.y += math.sin(self.toward) * self.linear_speed / 1000 * elapsed
+        self.battery = max(self.battery - (elapsed / 60 if self.sys_status == WorkMode.MODE_WORKING else 0), 0)
+
+    def _mow(self, elapsed: float) -> None:
+        # lanes run east and west across the first area, one WIDTH further north each time
+        self.x += self._lane_direction * MOWING_SPEED * elapsed
+        self.toward = 0.0 if self._lane_direction > 0 else math.pi
+        if not 0.0 <= self.x <= AREA_SIZE:
+            self.x = min(max(self.x, 0.0), AREA_SIZE)
+            self._lane_direction = -self._lane_direction
+            self.y = self.y + WIDTH if self.y + WIDTH <= AREA_SIZE else 0.0
+
+    def report_frame(self) -> bytes:
+        """Serialize a toapp_report_data of the current state."""
+        report = ReportInfoData(
+            connect=RptConnectStatus(connect_type=1, ble_rssi=-60, wifi_rssi=-50),
+            dev=RptDevStatus(
+                sys_status=self.sys_status,
+                charge_state=int(self.sys_status == WorkMode.MODE_READY),
+                battery_val=int(self.battery),
+                sys_time_stamp=int(time.time()),
+            ),
+            rtk=RptRtk(status=4, pos_level=2, gps_stars=30, lat_std=150, lon_std=150),
+            locations=[
+                RptDevLocation(
+                    real_pos_x=round(self.x * 10000),
+                    real_pos_y=round(self.y * 10000),
+                    real_toward=round(self.toward * 10000),
+                    pos_type=5,
+                )
+            ],
+            work=RptWork(area=len(self.hash_ids), knife_height=60),
+        )
+        return self._encode(
+            MsgCmdType.MSG_CMD_TYPE_EMBED_SYS,
+            MsgDevice.DEV_MAINCTL,
+            MsgAttr.MSG_ATTR_REPORT,
+            "sys",
+            "toapp_report_data",
+            report,
+        )
+
+    def rapid_state_frame(self) -> bytes:
+        """Serialize a system_rapid_state_tunnel of the current position."""
+        raw = [4, 2, 30, 0, 150, 150, 20, round(self.x * 1e8), round(self.y * 1e8), round(self.toward * 10000), 5, 0]
+        return self._encode(
+            MsgCmdType.MSG_CMD_TYPE_EMBED_SYS,
+            MsgDevice.DEV_MAINCTL,
+            MsgAttr.MSG_ATTR_REPORT,
+            "sys",
+            "system_rapid_state_tunnel",
+            SystemRapidStateTunnelMsg(rapid_state_data=raw),
+        )
+
+    async def run(self, push: Push, delay: float = 0.0) -> None:
+        """Push reports and rapid states at their intervals until cancelled, the first ones after delay seconds."""
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(delay)
+        next_report = next_rapid_state = loop.time()
+        while True:
+            now = loop.time()
+            self.move()
+            if self.report_interval and now >= next_report:
+                next_report = now + self.report_interval
+                await push(self.report_frame())
+            if self.rapid_state_interval and now >= next_rapid_state:
+                next_rapid_state = now + self.rapid_state_interval
+                await push(self.rapid_state_frame())
+            due = [
+                due
+                for interval, due in (
+                    (self.report_interval, next_report),
+                    (self.rapid_state_interval, next_rapid_state),
+                )
+                if interval
+            ]
+            # nothing to push until a report is asked for again
+            await asyncio.sleep(max(min(due) - loop.time(), 0) if due else 1.0)
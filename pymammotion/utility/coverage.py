@@ -0,0 +1,194 @@
+"""Track the ground the blade has passed over on a sparse bit raster."""
+
+import math
+from collections import OrderedDict
+from typing import Iterable
+
+import numpy as np
+
+from pymammotion.data.model.device_config import OperationSettings
+
+# cells per side of a tile, a packed tile is TILE * TILE / 8 bytes
+TILE = 256
+DEFAULT_RESOLUTION = 0.05
+# channel width is in centimetres
+DEFAULT_WIDTH = OperationSettings.channel_width / 100
+# positions further apart than this are not joined, the mower was lifted or the link dropped
+MAX_GAP = 2.0
+# tiles kept unpacked while the mower works in them
+HOT_TILES = 4
+
+Tile = tuple[int, int]
+
+
+class CoverageGrid:
+    """Bit raster of mowed cells, stored as packed tiles that only exist where something was stamped.
+
+    Areas are rasterized onto the same grid, coverage is reported as the mowed share of each area.
+    """
+
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION, width: float = DEFAULT_WIDTH) -> None:
+        """Create an empty grid of resolution metre cells, stamping a blade of width metres."""
+        self.resolution = resolution
+        self.width = width
+        self._tiles: dict[Tile, np.ndarray] = {}
+        # recently stamped tiles unpacked to bools, packed again when they fall out
+        self._hot: OrderedDict[Tile, np.ndarray] = OrderedDict()
+        self._areas: dict[int, dict[Tile, np.ndarray]] = {}
+        self._last: tuple[float, float] | None = None
+
+    @property
+    def nbytes(self) -> int:
+        """Get the bytes held by coverage and area tiles."""
+        tiles = list(self._tiles.values()) + list(self._hot.values())
+        tiles += [tile for area in self._areas.values() for tile in area.values()]
+        return sum(tile.nbytes for tile in tiles)
+
+    def clear(self) -> None:
+        """Forget everything that was mowed."""
+        self._tiles.clear()
+        self._hot.clear()
+        self._last = None
+
+    def lift(self) -> None:
+        """Do not join the next position to the last one."""
+        self._last = None
+
+    def stamp(self, x: float, y: float) -> None:
+        """Mark the blade footprint from the last position to this ENU position."""
+        last = self._last
+        self._last = (x, y)
+        if last is None or math.hypot(x - last[0], y - last[1]) > MAX_GAP:
+            last = (x, y)
+        self._stamp_segment(last[0], last[1], x, y)
+
+    def _stamp_segment(self, x0: float, y0: float, x1: float, y1: float) -> None:
+        radius = self.width / 2
+        res = self.resolution
+        col_min = math.floor((min(x0, x1) - radius) / res)
+        col_max = math.floor((max(x0, x1) + radius) / res)
+        row_min = math.floor((min(y0, y1) - radius) / res)
+        row_max = math.floor((max(y0, y1) + radius) / res)
+        # cell centres of the bounding box, a cell is mowed when its centre is within radius of the segment
+        cx = (np.arange(col_min, col_max + 1) + 0.5) * res
+        cy = (np.arange(row_min, row_max + 1) + 0.5) * res
+        dx, dy = x1 - x0, y1 - y0
+        length2 = dx * dx + dy * dy
+        px = cx[np.newaxis, :] - x0
+        py = cy[:, np.newaxis] - y0
+        t = np.clip((px * dx + py * dy) / length2, 0.0, 1.0) if length2 else 0.0
+        footprint = (px - t * dx) ** 2 + (py - t * dy) ** 2 <= radius * radius
+        for tile, rows, cols, sub in _split(row_min, col_min, footprint):
+            self._hot_tile(tile)[rows, cols] |= sub
+
+    def _hot_tile(self, tile: Tile) -> np.ndarray:
+        cells = self._hot.get(tile)
+        if cells is not None:
+            self._hot.move_to_end(tile)
+            return cells
+        packed = self._tiles.pop(tile, None)
+        cells = np.zeros((TILE, TILE), dtype=bool) if packed is None else np.unpackbits(packed, axis=1).view(bool)
+        self._hot[tile] = cells
+        if len(self._hot) > HOT_TILES:
+            self._pack(*self._hot.popitem(last=False))
+        return cells
+
+    def _pack(self, tile: Tile, cells: np.ndarray) -> None:
+        self._tiles[tile] = np.packbits(cells, axis=1)
+
+    def _flush(self) -> None:
+        while self._hot:
+            self._pack(*self._hot.popitem(last=False))
+
+    def set_areas(self, areas: Iterable[tuple[int, np.ndarray]]) -> None:
+        """Rasterize (hash, (N, 2) ENU points) area polygons, replacing the ones set before."""
+        self._areas = {hash_id: self._rasterize(points) for hash_id, points in areas if len(points) >= 3}
+
+    def _rasterize(self, points: np.ndarray) -> dict[Tile, np.ndarray]:
+        """Fill the cells whose centre is inside the polygon, one scanline per row of cells."""
+        res = self.resolution
+        x0, y0 = points[:, 0], points[:, 1]
+        x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+        row_min = math.floor(y0.min() / res)
+        rows = np.arange(row_min, math.floor(y0.max() / res) + 1)
+        cy = (rows[:, np.newaxis] + 0.5) * res
+        spans = (y0 > cy) != (y1 > cy)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = np.where(spans, x0 + (cy - y0) * (x1 - x0) / (y1 - y0), np.inf)
+        crossing.sort(axis=1)
+        col_min = math.floor(x0.min() / res)
+        cells = np.zeros((len(rows), math.floor(x0.max() / res) - col_min + 1), dtype=bool)
+        # cells with a centre between the first and second crossing, the third and fourth, and so on
+        for row, count in enumerate(np.count_nonzero(spans, axis=1)):
+            for start, end in crossing[row, : count - count % 2].reshape(-1, 2):
+                first = math.ceil(start / res - 0.5) - col_min
+                last = math.floor(end / res - 0.5) - col_min
+                cells[row, max(first, 0) : last + 1] = True
+        tiles: dict[Tile, np.ndarray] = {}
+        for tile, tile_rows, tile_cols, sub in _split(row_min, col_min, cells):
+            if sub.any():
+                tiles.setdefault(tile, np.zeros((TILE, TILE), dtype=bool))[tile_rows, tile_cols] |= sub
+        return {tile: np.packbits(tile_cells, axis=1) for tile, tile_cells in tiles.items()}
+
+    def area_coverage(self) -> dict[int, float]:
+        """Get the percent of every area that was mowed."""
+        self._flush()
+        coverage: dict[int, float] = {}
+        for hash_id, area in self._areas.items():
+            total = sum(_popcount(mask) for mask in area.values())
+            mowed = sum(_popcount(mask & self._tiles[tile]) for tile, mask in area.items() if tile in self._tiles)
+            coverage[hash_id] = 100.0 * mowed / total if total else 0.0
+        return coverage
+
+    def uncovered_patches(self, hash_id: int, block: float = 1.0, min_share: float = 0.5) -> np.ndarray:
+        """Get the (K, 2) ENU centres of block metre squares of the area that are mostly not mowed."""
+        self._flush()
+        cells = max(round(block / self.resolution), 1)
+        centres = []
+        for (tile_row, tile_col), mask in self._areas.get(hash_id, {}).items():
+            area_cells = np.unpackbits(mask, axis=1).view(bool)
+            uncovered = area_cells.copy()
+            mowed = self._tiles.get((tile_row, tile_col))
+            if mowed is not None:
+                uncovered &= ~np.unpackbits(mowed, axis=1).view(bool)
+            in_area = _per_block(area_cells, cells)
+            share = np.divide(_per_block(uncovered, cells), in_area, out=np.zeros(in_area.shape), where=in_area > 0)
+            for block_row, block_col in zip(*np.nonzero(share >= min_share)):
+                row = tile_row * TILE + block_row * cells
+                col = tile_col * TILE + block_col * cells
+                centres.append(((col + cells / 2) * self.resolution, (row + cells / 2) * self.resolution))
+        return np.array(centres, dtype=np.float64).reshape(-1, 2)
+
+
+def _split(row_min: int, col_min: int, cells: np.ndarray) -> Iterable[tuple[Tile, slice, slice, np.ndarray]]:
+    """Cut a block of cells whose corner is at (row_min, col_min) along tile edges."""
+    row_max = row_min + cells.shape[0]
+    col_max = col_min + cells.shape[1]
+    for tile_row in range(row_min // TILE, (row_max - 1) // TILE + 1):
+        top = max(row_min, tile_row * TILE)
+        bottom = min(row_max, (tile_row + 1) * TILE)
+        for tile_col in range(col_min // TILE, (col_max - 1) // TILE + 1):
+            left = max(col_min, tile_col * TILE)
+            right = min(col_max, (tile_col + 1) * TILE)
+            yield (
+                (tile_row, tile_col),
+                slice(top - tile_row * TILE, bottom - tile_row * TILE),
+                slice(left - tile_col * TILE, right - tile_col * TILE),
+                cells[top - row_min : bottom - row_min, left - col_min : right - col_min],
+            )
+
+
+def _per_block(values: np.ndarray, cells: int) -> np.ndarray:
+    """Count the set cells of every cells x cells block of a tile, the last blocks may be cut short."""
+    blocks = -(-TILE // cells)
+    padded = np.zeros((blocks * cells, blocks * cells), dtype=np.int32)
+    padded[:TILE, :TILE] = values
+    return padded.reshape(blocks, cells, blocks, cells).sum(axis=(1, 3))
+
+
+# set bits of every byte value
+_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1)
+
+
+def _popcount(packed: np.ndarray) -> int:
+    return int(_BITS[packed].sum())
@@ -27,6 +27,7 @@ class CoordinateConverter:
         self.set_init_lla(latitude_rad, longitude_rad)
 
     def set_init_lla(self, lat_rad, lon_rad) -> None:
+        self.origin = (lat_rad, lon_rad)
         sin_lat = math.sin(lat_rad)
         cos_lat = math.cos(lat_rad)
         sin_lon = math.sin(lon_rad)
@@ -51,10 +52,16 @@ class CoordinateConverter:
         self.R_[2][1] = sin_lon * cos_lat
         self.R_[2][2] = sin_lat
 
+        # the rows enu_to_lla needs, as floats, indexing the matrix per point is slow
+        self._r0 = (-sin_lon, cos_lon, 0.0)
+        self._r1 = (-cos_lon * sin_lat, -sin_lon * sin_lat, cos_lat)
+
     def enu_to_lla(self, e, n) -> Point:
-        d3 = self.R_[0][0] * n + self.R_[1][0] * e + self.x0_
-        d4 = self.R_[0][1] * n + self.R_[1][1] * e + self.y0_
-        d5 = self.R_[0][2] * n + self.R_[1][2] * e + self.z0_
+        r00, r01, r02 = self._r0
+        r10, r11, r12 = self._r1
+        d3 = r00 * n + r10 * e + self.x0_
+        d4 = r01 * n + r11 * e + self.y0_
+        d5 = r02 * n + r12 * e + self.z0_
 
         hypot = math.hypot(d3, d4)
         atan2_lat = math.atan2(self.WGS84A * d5, self.b_ * hypot)
@@ -70,3 +77,26 @@ class CoordinateConverter:
         )
 
         return Point(latitude=lat, longitude=lon)
+
+    def enu_to_lla_array(self, e: np.ndarray, n: np.ndarray) -> np.ndarray:
+        """Convert arrays of points like enu_to_lla, returns an (N, 2) array of latitude, longitude."""
+        e = np.asarray(e, dtype=np.float64)
+        n = np.asarray(n, dtype=np.float64)
+        r00, r01, r02 = self._r0
+        r10, r11, r12 = self._r1
+        d3 = r00 * n + r10 * e + self.x0_
+        d4 = r01 * n + r11 * e + self.y0_
+        d5 = r02 * n + r12 * e + self.z0_
+
+        hypot = np.hypot(d3, d4)
+        atan2_lat = np.arctan2(self.WGS84A * d5, self.b_ * hypot)
+
+        lla = np.empty((e.size, 2), dtype=np.float64)
+        lla[:, 0] = np.degrees(
+            np.arctan2(
+                d5 + self.ep2_ * self.b_ * np.sin(atan2_lat) ** 3,
+                hypot - self.e2_ * self.WGS84A * np.cos(atan2_lat) ** 3,
+            )
+        ).ravel()
+        lla[:, 1] = np.degrees(np.arctan2(d4, d3)).ravel()
+        return lla
@@ -0,0 +1,129 @@
+"""Locate a point among the area and obstacle polygons of a map."""
+
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class MapPosition:
+    """Where a point is on the map, hashes are 0 when it is in none."""
+
+    area: int = 0
+    obstacle: int = 0
+    # metres to the edge of the area the point is in, None outside of every area
+    boundary_distance: float | None = None
+
+
+class Polygon:
+    """Closed polygon of ENU points, the last point connects back to the first."""
+
+    def __init__(self, hash_id: int, points: np.ndarray, is_obstacle: bool = False) -> None:
+        """Create a polygon of (N, 2) points."""
+        self.hash_id = hash_id
+        self.is_obstacle = is_obstacle
+        self.x0 = np.ascontiguousarray(points[:, 0], dtype=np.float64)
+        self.y0 = np.ascontiguousarray(points[:, 1], dtype=np.float64)
+        self.x1 = np.roll(self.x0, -1)
+        self.y1 = np.roll(self.y0, -1)
+        self.dx = self.x1 - self.x0
+        self.dy = self.y1 - self.y0
+        # x of an edge moves by inv_slope per metre of y, horizontal edges never span a y
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.inv_slope = np.where(self.dy == 0, 0.0, self.dx / self.dy)
+        length2 = self.dx**2 + self.dy**2
+        # degenerate edges are points, any t gives the same distance
+        self.inv_length2 = np.where(length2 == 0, 0.0, 1 / np.where(length2 == 0, 1.0, length2))
+        self.offset = self.x0 * self.dx + self.y0 * self.dy
+        self.min_x, self.min_y = float(self.x0.min()), float(self.y0.min())
+        self.max_x, self.max_y = float(self.x0.max()), float(self.y0.max())
+        self.area = abs(float(np.dot(self.x0, self.y1) - np.dot(self.x1, self.y0))) / 2
+
+    def contains(self, x: float, y: float) -> bool:
+        """Check if the point is inside, by counting the edges a ray to the east crosses."""
+        if not (self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y):
+            return False
+        crossings = ((self.y0 > y) != (self.y1 > y)) & (x < self.x0 + (y - self.y0) * self.inv_slope)
+        return bool(np.count_nonzero(crossings) & 1)
+
+    def boundary_distance(self, x: float, y: float) -> float:
+        """Get the distance from the point to the nearest edge."""
+        # position of the nearest point along every edge, 0 at its start and 1 at its end
+        t = (x * self.dx + y * self.dy - self.offset) * self.inv_length2
+        np.minimum(np.maximum(t, 0.0, out=t), 1.0, out=t)
+        ex = self.x0 + t * self.dx - x
+        ey = self.y0 + t * self.dy - y
+        return math.sqrt(float((ex * ex + ey * ey).min()))
+
+
+class _Cell:
+    """Edges of every polygon overlapping a grid cell, laid out to test them all at once."""
+
+    def __init__(self, polygons: list[Polygon]) -> None:
+        self.polygons = polygons
+        self.x0 = np.concatenate([polygon.x0 for polygon in polygons])
+        self.y0 = np.concatenate([polygon.y0 for polygon in polygons])
+        self.y1 = np.concatenate([polygon.y1 for polygon in polygons])
+        self.inv_slope = np.concatenate([polygon.inv_slope for polygon in polygons])
+        self.owner = np.repeat(np.arange(len(polygons)), [len(polygon.x0) for polygon in polygons])
+
+    def containing(self, x: float, y: float) -> list[Polygon]:
+        crossings = ((self.y0 > y) != (self.y1 > y)) & (x < self.x0 + (y - self.y0) * self.inv_slope)
+        counts = np.bincount(self.owner[crossings], minlength=len(self.polygons))
+        return [self.polygons[index] for index in np.flatnonzero(counts & 1)]
+
+
+class SpatialIndex:
+    """Uniform grid over the area and obstacle polygons of a map, answering where a point is."""
+
+    def __init__(self, areas: Iterable[tuple[int, np.ndarray]], obstacles: Iterable[tuple[int, np.ndarray]]) -> None:
+        """Index (hash, (N, 2) ENU points) pairs, polygons of fewer than 3 points are left out."""
+        polygons = [Polygon(hash_id, points) for hash_id, points in areas if len(points) >= 3]
+        polygons += [Polygon(hash_id, points, True) for hash_id, points in obstacles if len(points) >= 3]
+        self._count = len(polygons)
+        self._cells: dict[tuple[int, int], _Cell] = {}
+        self._min_x = self._min_y = 0.0
+        self._cell_size = 1.0
+        if not polygons:
+            return
+        self._min_x = min(polygon.min_x for polygon in polygons)
+        self._min_y = min(polygon.min_y for polygon in polygons)
+        width = max(polygon.max_x for polygon in polygons) - self._min_x
+        height = max(polygon.max_y for polygon in polygons) - self._min_y
+        # about one polygon per cell on a square map
+        self._cell_size = max(width, height, 1.0) / math.ceil(math.sqrt(len(polygons)))
+        cells: dict[tuple[int, int], list[Polygon]] = {}
+        for polygon in polygons:
+            min_cell = self._cell(polygon.min_x, polygon.min_y)
+            max_cell = self._cell(polygon.max_x, polygon.max_y)
+            for cell_x in range(min_cell[0], max_cell[0] + 1):
+                for cell_y in range(min_cell[1], max_cell[1] + 1):
+                    cells.setdefault((cell_x, cell_y), []).append(polygon)
+        self._cells = {cell: _Cell(cell_polygons) for cell, cell_polygons in cells.items()}
+
+    def __len__(self) -> int:
+        """Return the number of indexed polygons."""
+        return self._count
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return int((x - self._min_x) // self._cell_size), int((y - self._min_y) // self._cell_size)
+
+    def locate(self, x: float, y: float) -> MapPosition:
+        """Find the area and obstacle the ENU point is in, the smallest one where they overlap."""
+        cell = self._cells.get(self._cell(x, y))
+        if cell is None:
+            return MapPosition()
+        containing = cell.containing(x, y)
+        areas = [polygon for polygon in containing if not polygon.is_obstacle]
+        obstacles = [polygon for polygon in containing if polygon.is_obstacle]
+        obstacle = min(obstacles, key=_size).hash_id if obstacles else 0
+        if not areas:
+            return MapPosition(obstacle=obstacle)
+        area = min(areas, key=_size)
+        return MapPosition(area=area.hash_id, obstacle=obstacle, boundary_distance=area.boundary_distance(x, y))
+
+
+def _size(polygon: Polygon) -> float:
+    return polygon.area
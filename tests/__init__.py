@@ -0,0 +1 @@
+"""Tests for pymammotion, and the recorded frames and fakes the benchmarks share with them."""
@@ -0,0 +1,51 @@
+"""Keyword arguments that every MammotionCommand command builder can be called with."""
+
+import inspect
+import types
+import typing
+from enum import Enum
+from typing import Any
+
+from pymammotion.data.model.generate_route_information import GenerateRouteInformation
+from pymammotion.mammotion.commands.mammotion_command import COMMAND_KEYS, MammotionCommand
+
+SCALARS: dict[Any, Any] = {int: 1, float: 0.5, bool: True, str: "", bytes: b""}
+
+# arguments that cannot be built from the annotations alone
+ARGUMENTS: dict[str, dict[str, Any]] = {
+    "generate_route_information": {"generate_route_information": GenerateRouteInformation(one_hashs=[1])},
+    "modify_generate_route_information": {"generate_route_information": GenerateRouteInformation(one_hashs=[1])},
+}
+
+
+def _argument(annotation: Any) -> Any:
+    """Build a value for a parameter from its annotation."""
+    if annotation is inspect.Parameter.empty:
+        return ""
+    if annotation in SCALARS:
+        return SCALARS[annotation]
+    origin = typing.get_origin(annotation)
+    if origin is list:
+        return [_argument(typing.get_args(annotation)[0])]
+    if origin in (typing.Union, types.UnionType):
+        return _argument(next(arg for arg in typing.get_args(annotation) if arg is not type(None)))
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return next(iter(annotation))
+    return annotation()
+
+
+def commands() -> dict[str, dict[str, Any]]:
+    """Map every command builder to the keyword arguments used to call it."""
+    builders: dict[str, dict[str, Any]] = {}
+    for name in COMMAND_KEYS:
+        if name in ARGUMENTS:
+            builders[name] = ARGUMENTS[name]
+            continue
+        parameters = list(inspect.signature(getattr(MammotionCommand, name), eval_str=True).parameters.values())[1:]
+        builders[name] = {
+            parameter.name: parameter.default
+            if parameter.default is not inspect.Parameter.empty
+            else _argument(parameter.annotation)
+            for parameter in parameters
+        }
+    return builders
@@ -0,0 +1,103 @@
+"""Fakes that stand in for a mower and its transport in tests and benchmarks."""
+
+import asyncio
+from typing import Any
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.hash_list import HashList, PathType
+from pymammotion.data.state_manager import StateManager
+from pymammotion.mammotion.commands.mammotion_command import MammotionCommand
+from pymammotion.mammotion.devices.base import MammotionBaseDevice
+from pymammotion.mammotion.devices.map_sync import MapSync
+from pymammotion.proto.codec import ProtoCodec
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck, NavGetHashListAck
+from tests.frames import FRAMES
+
+# round trip of a map request through the cloud and the mower
+LATENCY = 0.02
+REPLAY_DEVICE_NAME = "Luba-REPLAY"
+SESSION_FRAMES = list(FRAMES.values())
+
+
+class FakeYard:
+    """Answer map requests from a yard of areas after LATENCY, the way the state manager stores them."""
+
+    def __init__(self, areas: int, frames: int, hashes_per_frame: int = 8, drop: frozenset = frozenset()) -> None:
+        """Create a yard of areas hashes with frames frames each, the requests in drop are lost once."""
+        self.hash_ids = list(range(1001, 1001 + areas))
+        self.frames = frames
+        self.root = [
+            self.hash_ids[start : start + hashes_per_frame] for start in range(0, areas, hashes_per_frame)
+        ] or [[]]
+        self.drop = set(drop)
+        self.map = HashList()
+        self.sync = MapSync(lambda: self.map, self.send)
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+
+    async def send(self, key: str, kwargs: dict[str, Any]) -> None:
+        """Schedule the answer to a request."""
+        self.requests.append((key, kwargs))
+        if key in ("get_all_boundary_hash_list", "get_hash_response"):
+            answer = self._root_frame(kwargs.get("current_frame", 0) + 1)
+        elif key == "synchronize_hash_data":
+            answer = self._area_frame(kwargs["hash_num"], 1)
+        else:
+            region_data = kwargs["regional_data"]
+            answer = self._area_frame(region_data.hash, region_data.current_frame + 1)
+        if answer in self.drop:
+            self.drop.discard(answer)
+            return
+        asyncio.get_running_loop().call_later(LATENCY, self._answer, answer)
+
+    def _root_frame(self, current_frame: int) -> tuple:
+        return ("root", current_frame)
+
+    def _area_frame(self, hash_id: int, current_frame: int) -> tuple:
+        return ("area", hash_id, current_frame)
+
+    def _answer(self, answer: tuple) -> None:
+        if answer[0] == "root":
+            current_frame = answer[1]
+            self.map.update_root_hash_list(
+                NavGetHashListAck(
+                    total_frame=len(self.root), current_frame=current_frame, data_couple=self.root[current_frame - 1]
+                )
+            )
+        else:
+            _, hash_id, current_frame = answer
+            self.map.update(
+                NavGetCommDataAck(
+                    type=PathType.AREA, action=8, hash=hash_id, total_frame=self.frames, current_frame=current_frame
+                )
+            )
+        self.sync.progress()
+
+
+class ReplayDevice(MammotionBaseDevice):
+    """Device without a transport, commands it sends are counted and dropped."""
+
+    transport = "cloud"
+
+    def __init__(self, name: str = REPLAY_DEVICE_NAME, codec: ProtoCodec | None = None) -> None:
+        """Create a device with a fresh MowingDevice."""
+        super().__init__(StateManager(MowingDevice(), codec))
+        self._commands = MammotionCommand(name, self._codec)
+        self.commands: list[str] = []
+
+    async def queue_command(self, key: str, **kwargs: Any) -> bytes | None:
+        """Count the command."""
+        self.commands.append(key)
+        return None
+
+    async def post_command(self, key: str, **kwargs: Any) -> None:
+        """Count the command."""
+        self.commands.append(key)
+
+    async def send_unacknowledged(self, command: bytes) -> None:
+        """Drop the command."""
+
+    async def _ble_sync(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        """Nothing to stop."""
@@ -0,0 +1,95 @@
+"""Frames recorded from real mowers, copied from tests/fixtures.py so they can be imported by tests and benchmarks.
+
+Transport prefixes are stripped, every value is a complete serialized LubaMsg.
+"""
+
+import base64
+
+# sys.system_tard_state_tunnel
+SYSTEM_TARD_STATE_TUNNEL = (
+    b"\x08\xf4\x01\x10\x01\x18\x07(\xbf\x96\x0b0\x01R`\xd2\x01]\n[\x0b\x01d<\x00\x00\xbc\xda"
+    b"\xcf\xf6\xf9\x98\xc2\xa8h\xb3\xe7\xcc\x90\xc3\x8e\x89\xbbm\xe1\x80\x84\x03\x00\x00\xba\xf3\xfe\xf1\xd6\x96"
+    b"\x91\xf2\x15\x81\xb2\xff\xff\xff\xff\xff\xff\xff\x01\xcc\x98\xfc\xff\xff\xff\xff\xff\xff\x01\x00\x00\x00\x89\xaf"
+    b"\xb7\xe7\xf7\x84\xc6\xd3L\x00\xb9\x95\x8c\xf6\xe6\xeb\xc1\xe1Y\xde\xd9\xd2\xfc\xab\xc2\x9b\x903\x00"
+)
+
+# nav.toapp_get_commondata_ack, one area frame
+SINGLE_HASH_RESULT = (
+    b"\x08\xf0\x01\x10\x01\x18\x07(\xe8\xda\x0c0\x01Z\xf0\x01\x8a\x02\xec\x01\x08\x01 \x08194k"
+    b"\xf0\x00\xf0\xeaIH\x01P\x01`\x90\x01j\n\r\x0cg\x9c\xc1\x15,\x00\x92@j\n\r\x86"
+    b"0\x9f\xc1\x15:R\x8b@j\n\r^\xb7\xa0\xc1\x15\x06\xa0z@j\n\r\xf6\xa7\x9e\xc1\x15"
+    b"%\xfe\n@j\n\r\xc0\x06\x96\xc1\x15Jb\xd2\xbfj\n\ry\xd4\x9a\xc1\x15\xcbs\xf3\xbf"
+    b"j\n\r\x1a\xbd\xa3\xc1\x151\x9b\x08\xc0j\n\r\xe5B\xa5\xc1\x15\x88\xc7\xfb\xbfj\n\rR"
+    b";\xa7\xc1\x15\x96\xce\xb3\xbfj\n\r\\\xa3\xa7\xc1\x15\x9e\x86}\xbfj\n\r\xc3\xaa\xa9\xc1\x15"
+    b"N;\x07\xbfj\n\rb\x91\xad\xc1\x15\xb9\xe6>?j\n\r\xf1\xdc\xb4\xc1\x15\x1e\xba`@"
+    b'j\n\rBZ\xb8\xc1\x15\x17Jl@j\n\rL"\xb9\xc1\x15i\xda\x82@j\n\r\xa5'
+    b"\x06\xa2\xc1\x15%\x96\x99@j\n\r-\x8e\x9d\xc1\x15\x113\x9d@j\n\r\x0cg\x9c\xc1\x15"
+    b",\x00\x92@"
+)
+
+# sys.system_rapid_state_tunnel
+SYS_RAPID_STATE_TUNNEL = (
+    b"\x08\xf4\x01\x10\x01\x18\x07(\xfc\xed\x0e0\x01R&\xca\x01#\n!\x04\x02+\xb4\xbf\x01IL"
+    b"\x1b\xea\xbe\xf6\xff\xff\xff\xff\xff\xff\x01\x9a$\xfe\x96\xda\xff\xff\xff\xff\xff\xff\x01\x05\x00"
+)
+
+# net.toapp_devinfo_resp with the firmware versions
+FIRMWARE_INFO = (
+    b"\x08\xf8\x01\x10\x01\x18\x07 \x02(\x010\x018\x80\x80 B\xcb\x01b\xc8\x01\n\x12\x08\x01\x10"
+    b'\x06\x18\x01"\n1.10.5.237\n\x1e\x08\x01\x10\x03\x18\x01"\x161.6'
+    b'.22.2040 (3be066bf)\n\x1c\x08\x02\x10\x03\x18\x01"'
+    b"\x141.1.1.622 (a993d995)\n\x1b\x08\x03\x10\x03\x18"
+    b'\x01"\x132.2.0.150 (2cf62fc)\n\x1b\x08\x04\x10\x03'
+    b'\x18\x01"\x132.2.0.150 (2cf62fc)\n\x0c\x08\x05\x10'
+    b'\x03\x18\x01"\x047361\n\x1e\x08\x06\x10\x03\x18\x01"\x161.6.22.20'
+    b'40 (3be066bf)\n\x0c\x08\x07\x10\x03\x18\x01"\x041.28'
+)
+
+# sys.toapp_report_data
+TOAPP_REPORT_DATA = (
+    b"\x08\xf4\x01\x10\x01\x18\x07(\xc170\x01R\xb8\x01\xba\x02\xb4\x01\n\x18\x08\x01\x10\xb8\xff\xff\xff"
+    b"\xff\xff\xff\xff\xff\x01\x18\xcf\xff\xff\xff\xff\xff\xff\xff\xff\x01\x12\x0e\x08\x0b\x10\x02\x18d(\x0e0"
+    b'\x95\xaf\xe5\xb1\x06\x1a\x13\x08\x04\x10\x02\x18 @\x80\x80\xb4\xf9\x91\x80\x80\x80\x03P\x980"-'
+    b"\x08\xa0\xab\xf7\xff\xff\xff\xff\xff\xff\x01\x10\xe4\xe0\xfc\xff\xff\xff\xff\xff\xff\x01\x18\xe7\xc8\xf8\xff\xff"
+    b"\xff\xff\xff\xff\x01 \x050\xe5\xa7\xe3\xd2\x93\xd2\xd5\x98**D\x10\xcf\xd6\xfa\xf5\xb5\xc1\xef\x9e"
+    b"C\x18\xd6\x80\xd8\x02 n0\xf0\xe0\x81\xc0\xa4\xe5\x81\xc5G8\x84\xa4\x07@\xfd\xf6\x07`\x99"
+    b"\xf0\x9b\xe0\xce\x88\xe2\x96Gp\xe2\xa5\xde\xf0\xe3\xbc\xaf\x8aQx\xfc\xb5\xf4\xf2\x8d\xa5\x80\xe7q"
+    b"\xa0\x01<"
+)
+
+FRAMES: dict[str, bytes] = {
+    "system_tard_state_tunnel": SYSTEM_TARD_STATE_TUNNEL,
+    "single_hash_result": SINGLE_HASH_RESULT,
+    "sys_rapid_state_tunnel": SYS_RAPID_STATE_TUNNEL,
+    "firmware_info": FIRMWARE_INFO,
+    "toapp_report_data": TOAPP_REPORT_DATA,
+}
+
+
+def thing_event_payload(frame: bytes, iot_id: str = "IOT-TEST", message_id: str = "1") -> dict:
+    """Wrap a frame the way the cloud delivers it on the thing/events topic."""
+    return {
+        "method": "thing.events",
+        "id": message_id,
+        "version": "1.0",
+        "params": {
+            "groupIdList": [],
+            "groupId": "",
+            "categoryKey": "LawnMower",
+            "batchId": "batch",
+            "gmtCreate": 1718000000000,
+            "productKey": "a1pk",
+            "type": "info",
+            "deviceName": "Luba-TEST",
+            "iotId": iot_id,
+            "checkLevel": 0,
+            "namespace": "mammotion",
+            "tenantId": "tenant",
+            "name": "device_protobuf_msg_event",
+            "thingType": "DEVICE",
+            "time": 1718000000000,
+            "tenantInstanceId": "instance",
+            "identifier": "device_protobuf_msg_event",
+            "value": {"content": base64.b64encode(frame).decode()},
+        },
+    }
@@ -0,0 +1,37 @@
+"""Polygons for the map tests and benchmarks, as (hash, points) pairs in metres."""
+
+import math
+
+import numpy as np
+
+from pymammotion.utility.spatial import Polygon
+
+# areas per side of the square yard, each with an obstacle in its middle
+SIDE = 20
+# metres between area centres
+SPACING = 30.0
+# points on the outline of every area
+POINTS = 64
+
+
+def _circle(x: float, y: float, radius: float) -> np.ndarray:
+    angles = np.linspace(0, 2 * math.pi, POINTS, endpoint=False)
+    return np.column_stack((x + radius * np.cos(angles), y + radius * np.sin(angles)))
+
+
+def yard() -> tuple[list[tuple[int, np.ndarray]], list[tuple[int, np.ndarray]]]:
+    """Build the (hash, points) pairs of SIDE x SIDE round areas and their obstacles."""
+    centres = [(i * SPACING, j * SPACING) for i in range(SIDE) for j in range(SIDE)]
+    areas = [(index + 1, _circle(x, y, SPACING * 0.45)) for index, (x, y) in enumerate(centres)]
+    obstacles = [(10000 + index, _circle(x, y, 2.0)) for index, (x, y) in enumerate(centres)]
+    return areas, obstacles
+
+
+def naive_locate(polygons: list[Polygon], x: float, y: float) -> list[int]:
+    """Test every polygon, the way a loop over the map would."""
+    return [polygon.hash_id for polygon in polygons if polygon.contains(x, y)]
+
+
+def square(x: float, y: float, size: float) -> np.ndarray:
+    """Build the corners of a square with its lower left corner at x, y."""
+    return np.array([(x, y), (x + size, y), (x + size, y + size), (x, y + size)], dtype=np.float64)
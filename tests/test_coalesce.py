@@ -0,0 +1,43 @@
+"""Identical reads share one request, writes are always sent."""
+
+import asyncio
+
+from pymammotion.mammotion.commands.coalesce import ReadCoalescer, is_idempotent_read
+
+
+def test_is_idempotent_read() -> None:
+    assert is_idempotent_read("allpowerfull_rw", {"id": 3, "context": 1, "rw": 0})
+    assert not is_idempotent_read("allpowerfull_rw", {"id": 5, "context": 1, "rw": 1})
+    assert is_idempotent_read("get_report_cfg", {})
+    assert not is_idempotent_read("send_movement", {"linear_speed": 0, "angular_speed": 0})
+
+
+def test_coalesce() -> None:
+    async def run() -> tuple[list, list[str], int]:
+        reads = ReadCoalescer()
+        sent = []
+
+        async def send(key: str) -> str:
+            sent.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        calls = [
+            ("allpowerfull_rw", {"id": 3, "context": 1, "rw": 0}),
+            ("allpowerfull_rw", {"context": 1, "id": 3, "rw": 0}),
+            ("allpowerfull_rw", {"id": 4, "context": 1, "rw": 0}),
+            ("allpowerfull_rw", {"id": 5, "context": 1, "rw": 1}),
+            ("allpowerfull_rw", {"id": 5, "context": 1, "rw": 1}),
+        ]
+        results = await asyncio.gather(
+            *(reads.send(key, kwargs, lambda i=i: send(f"{key}-{i}")) for i, (key, kwargs) in enumerate(calls))
+        )
+        # once answered the next read is sent again
+        await reads.send(*calls[0], lambda: send("again"))
+        return results, sent, reads.merged
+
+    results, sent, merged = asyncio.run(run())
+    assert results[0] == results[1] == "allpowerfull_rw-0"
+    assert sorted(sent[:-1]) == [f"allpowerfull_rw-{i}" for i in (0, 2, 3, 4)]
+    assert sent[-1] == "again"
+    assert merged == 1
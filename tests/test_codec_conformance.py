@@ -0,0 +1,106 @@
+"""Both protobuf codecs must decode to the same messages and leave the same device state."""
+
+import asyncio
+
+import betterproto
+import pytest
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.raw_data import SUB_MESSAGE_GROUPS, RawData
+from pymammotion.data.state_manager import StateManager
+from pymammotion.mammotion.commands.mammotion_command import MammotionCommand
+from pymammotion.proto.codec import ProtoCodec, get_codec
+from tests.frames import FRAMES
+
+CODECS = [get_codec("betterproto"), get_codec("protobuf")]
+
+
+def _to_dict(message) -> dict | str:
+    try:
+        return message.to_dict(casing=betterproto.Casing.SNAKE)
+    except Exception as err:  # noqa: BLE001
+        return type(err).__name__
+
+
+def _decoded(codec, data: bytes) -> dict:
+    message = codec.decode(data)
+    group, group_msg = codec.which_one_of(message, "LubaSubMsg")
+    name, _ = codec.which_one_of(group_msg, SUB_MESSAGE_GROUPS[group])
+    return {
+        "group": group,
+        "name": name,
+        "net": codec.has_field(message.net),
+        "dict": _to_dict(message),
+        "bytes": codec.encode(message),
+    }
+
+
+def _state(codec, data: bytes) -> dict:
+    async def callback(*_args) -> None:
+        pass
+
+    state_manager = StateManager(MowingDevice(), codec)
+    state_manager.gethash_ack_callback = callback
+    state_manager.get_commondata_ack_callback = callback
+    raw_data = RawData(codec=codec)
+    message = codec.decode(data)
+    raw_data.update(message)
+    try:
+        asyncio.run(state_manager.notification(message))
+        error = None
+    except Exception as err:  # noqa: BLE001
+        error = type(err).__name__
+    return {"raw": raw_data.to_dict(), "device": state_manager.get_device().to_dict(), "error": error}
+
+
+@pytest.mark.parametrize("frame", FRAMES)
+def test_decode(frame: str) -> None:
+    expected, actual = (_decoded(codec, FRAMES[frame]) for codec in CODECS)
+    assert actual == expected
+
+
+@pytest.mark.parametrize("frame", FRAMES)
+def test_state(frame: str) -> None:
+    expected, actual = (_state(codec, FRAMES[frame]) for codec in CODECS)
+    assert actual == expected
+
+
+def test_tard_state_is_not_read_as_rapid_state() -> None:
+    for codec in CODECS:
+        state = _state(codec, FRAMES["system_tard_state_tunnel"])
+        assert state["error"] is None
+        assert state["device"]["mowing_state"] == MowingDevice().to_dict()["mowing_state"]
+
+
+@pytest.mark.parametrize(
+    ("command", "kwargs"),
+    [
+        ("get_report_cfg", {}),
+        ("get_device_product_model", {}),
+        ("send_movement", {"linear_speed": 100, "angular_speed": -50}),
+        ("get_all_boundary_hash_list", {"sub_cmd": 0}),
+        ("read_and_set_rtk_pairing_code", {"op": 1, "cfg": ""}),
+    ],
+)
+def test_commands(command: str, kwargs: dict) -> None:
+    """Commands are serialized by the codec, every codec has to read them back the same way."""
+    encoded = getattr(MammotionCommand("Luba-TEST", CODECS[1]), command)(**kwargs)
+    expected, actual = (_decoded(codec, encoded) for codec in CODECS)
+    assert actual == expected
+
+
+def test_account_passes_its_codec_to_devices() -> None:
+    from bleak.backends.device import BLEDevice
+
+    from pymammotion.mammotion.devices.mammotion import Mammotion
+
+    async def run() -> ProtoCodec:
+        mammotion = Mammotion(codec="protobuf")
+        mammotion.add_ble_device(BLEDevice("00:00:00:00:00:00", "Luba-CODEC", None, -60))
+        try:
+            return mammotion.get_device_by_name("Luba-CODEC")._state_manager.codec
+        finally:
+            mammotion.devices.devices.pop("Luba-CODEC")
+            Mammotion()
+
+    assert asyncio.run(run()) is CODECS[1]
@@ -0,0 +1,24 @@
+"""Control commands jump ahead of map sync without starving it."""
+
+from pymammotion.mammotion.commands.priority import STARVATION_LIMIT, CommandPriority, CommandQueue, command_priority
+
+
+def test_order() -> None:
+    queue = CommandQueue()
+    for key in ["get_regional_data"] * 3 + ["get_report_cfg"] * 6 + ["cancel_job"]:
+        queue.put_nowait((command_priority(key), key))
+    assert queue.qsize() == 10
+    order = [queue.get_nowait() for _ in range(10)]
+    assert queue.empty()
+    # the stop goes first, sync gets a turn after STARVATION_LIMIT interactive commands
+    assert order[0] == "cancel_job"
+    assert order.index("get_regional_data") == STARVATION_LIMIT
+    assert order[-1] == "get_regional_data"
+
+
+def test_realtime_is_never_held_back() -> None:
+    queue = CommandQueue()
+    for _ in range(STARVATION_LIMIT * 2):
+        queue.put_nowait((CommandPriority.BACKGROUND, "sync"))
+        queue.put_nowait((CommandPriority.REALTIME, "move"))
+    assert [queue.get_nowait() for _ in range(STARVATION_LIMIT * 2)] == ["move"] * STARVATION_LIMIT * 2
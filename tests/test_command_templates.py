@@ -0,0 +1,32 @@
+"""Commands served from a template decode like freshly built ones."""
+
+import time
+
+import pytest
+
+from pymammotion.mammotion.commands.mammotion_command import TEMPLATE_COMMANDS, MammotionCommand
+from pymammotion.mammotion.commands.template import CommandTemplate
+from pymammotion.proto.luba_msg import LubaMsg
+from tests.command_arguments import commands
+
+ARGUMENTS = commands()
+
+
+@pytest.mark.parametrize("key", sorted(TEMPLATE_COMMANDS))
+def test_template(key: str) -> None:
+    command = MammotionCommand("Luba-TEST")
+    kwargs = ARGUMENTS[key]
+    command.build(key, **kwargs)
+    before = round(time.time() * 1000)
+    templated = LubaMsg().parse(command.build(key, **kwargs))
+    built = LubaMsg().parse(getattr(command, key)(**kwargs))
+    assert templated.timestamp >= before
+    templated.timestamp = built.timestamp
+    assert templated == built
+
+
+def test_render() -> None:
+    encoded = MammotionCommand("Luba-TEST").get_report_cfg()
+    rendered = LubaMsg().parse(CommandTemplate(encoded).render(1234567890123))
+    assert rendered.timestamp == 1234567890123
+    assert CommandTemplate(b"\x08\x01").render() == b"\x08\x01"
@@ -0,0 +1,29 @@
+"""The array conversion matches the per point one and devices reuse their converter."""
+
+import numpy as np
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.utility.map import CoordinateConverter
+
+
+def test_array_matches_points() -> None:
+    converter = CoordinateConverter(0.9, 0.1)
+    east = np.array([0.0, 12.5, -150.25, 3000.0])
+    north = np.array([0.0, -7.0, 80.5, -2500.0])
+
+    lla = converter.enu_to_lla_array(north, east)
+
+    expected = [converter.enu_to_lla(n, e) for e, n in zip(east, north)]
+    np.testing.assert_allclose(lla, [(point.latitude, point.longitude) for point in expected], rtol=0, atol=1e-12)
+
+
+def test_device_converter_follows_rtk_origin() -> None:
+    device = MowingDevice()
+    device.location.RTK.latitude = 0.9
+    device.location.RTK.longitude = 0.1
+    converter = device.coordinate_converter
+    assert device.coordinate_converter is converter
+
+    device.location.RTK.latitude = 0.8
+    assert device.coordinate_converter is not converter
+    assert device.coordinate_converter.origin == (0.8, 0.1)
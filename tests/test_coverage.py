@@ -0,0 +1,87 @@
+"""CoverageGrid stamps the blade footprint and reports it per area."""
+
+import numpy as np
+import pytest
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.hash_list import PathType
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck
+from pymammotion.proto.mctrl_sys import SystemRapidStateTunnelMsg
+from pymammotion.utility.constant import WorkMode
+from pymammotion.utility.coverage import TILE, CoverageGrid
+from tests.shapes import square
+
+
+def test_lanes_cover_their_share_of_an_area() -> None:
+    grid = CoverageGrid(resolution=0.1, width=1.0)
+    grid.set_areas([(1, square(0, 0, 10)), (2, square(20, 0, 10))])
+
+    # one lane through the middle of the first area, starting outside of it
+    for x in np.arange(-2.0, 12.0, 0.5):
+        grid.stamp(float(x), 5.0)
+
+    coverage = grid.area_coverage()
+    assert coverage[1] == pytest.approx(10.0, abs=0.5)
+    assert coverage[2] == 0.0
+
+
+def test_lifted_positions_are_not_joined() -> None:
+    grid = CoverageGrid(resolution=0.1, width=0.5)
+    grid.set_areas([(1, square(0, 0, 10))])
+    grid.stamp(1.0, 1.0)
+    grid.lift()
+    grid.stamp(2.0, 1.0)
+
+    # two dots of about 0.2 square metres each
+    assert grid.area_coverage()[1] == pytest.approx(0.4, abs=0.1)
+
+
+def test_stamps_across_tiles_and_hot_tile_eviction() -> None:
+    grid = CoverageGrid(resolution=0.05, width=0.25)
+    side = TILE * 0.05 * 3
+    grid.set_areas([(1, square(0, 0, side))])
+    for y in np.arange(0.1, side, 0.25):
+        grid.lift()
+        for x in np.arange(0.0, side + 1.0, 1.5):
+            grid.stamp(float(x), float(y))
+
+    assert grid.area_coverage()[1] > 99.0
+    assert len(grid.uncovered_patches(1)) == 0
+
+
+def test_uncovered_patches_find_the_hole() -> None:
+    grid = CoverageGrid(resolution=0.1, width=1.0)
+    grid.set_areas([(1, square(0, 0, 10))])
+    for y in np.arange(0.5, 10.0, 1.0):
+        grid.lift()
+        for x in np.arange(0.0, 10.5, 1.0):
+            # leave out the square metre around (5.5, 5.5)
+            if not (4.5 <= y <= 6.0 and 5.0 <= x <= 6.0):
+                grid.stamp(float(x), float(y))
+
+    patches = grid.uncovered_patches(1, block=1.0)
+    assert len(patches) >= 1
+    assert all(np.hypot(*(patch - (5.5, 5.5))) < 2.0 for patch in patches)
+
+
+def _rapid_state(x: float, y: float) -> SystemRapidStateTunnelMsg:
+    # positions are scaled twice by 10^4 on the way in
+    return SystemRapidStateTunnelMsg(rapid_state_data=[4, 0, 0, 0, 0, 0, 0, int(x * 1e8), int(y * 1e8), 0, 0, 0])
+
+
+def test_device_stamps_only_while_working() -> None:
+    device = MowingDevice()
+    frame = NavGetCommDataAck(type=PathType.AREA, hash=3, total_frame=1, current_frame=1)
+    frame.data_couple = [CommDataCouple(x=x, y=y) for x, y in square(0, 0, 10)]
+    device.map.update(frame)
+
+    device.run_state_update(_rapid_state(2.0, 5.0))
+    assert device.area_coverage()[3] == 0.0
+    assert device.location.area_hash == 3
+
+    device.report_data.dev.sys_status = WorkMode.MODE_WORKING
+    device.run_state_update(_rapid_state(2.0, 5.0))
+    device.run_state_update(_rapid_state(3.0, 5.0))
+    # a 0.25 m blade over 1 m of a 100 square metre area
+    assert device.area_coverage()[3] == pytest.approx(0.3, abs=0.1)
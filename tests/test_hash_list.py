@@ -0,0 +1,92 @@
+"""HashList keeps its missing hashes and frames in step with the frames it is given."""
+
+import numpy as np
+
+from pymammotion.data.model.hash_list import HashList, PathType
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck, NavGetHashListAck
+from pymammotion.utility.map import CoordinateConverter
+
+
+def _frame(hash_id: int, current_frame: int, total_frame: int = 3, path_type: int = PathType.AREA) -> NavGetCommDataAck:
+    return NavGetCommDataAck(type=path_type, hash=hash_id, total_frame=total_frame, current_frame=current_frame)
+
+
+def test_missing_hashes_follow_root_and_frames() -> None:
+    hash_list = HashList()
+    hash_list.update_root_hash_list(NavGetHashListAck(total_frame=2, current_frame=1, data_couple=[1, 2]))
+    assert hash_list.missing_hash_frame() == [2]
+    hash_list.update_root_hash_list(NavGetHashListAck(total_frame=2, current_frame=2, data_couple=[3]))
+    assert hash_list.missing_hash_frame() == []
+    assert hash_list.missing_hashlist == [1, 2, 3]
+
+    assert hash_list.update(_frame(2, 1))
+    assert hash_list.update(_frame(3, 1, path_type=PathType.OBSTACLE))
+    assert hash_list.missing_hashlist == [1]
+
+    # a replaced root frame can drop hashes
+    hash_list.update_root_hash_list(NavGetHashListAck(total_frame=2, current_frame=1, data_couple=[2]))
+    assert hash_list.missing_hashlist == []
+
+
+def test_frames_are_indexed_by_current_frame() -> None:
+    hash_list = HashList()
+    assert hash_list.update(_frame(1, 1))
+    assert hash_list.update(_frame(1, 3))
+    assert not hash_list.update(_frame(1, 3))
+    assert hash_list.missing_frame(_frame(1, 1)) == [2]
+    assert hash_list.incomplete_frame_lists == [hash_list.area[1]]
+
+    assert hash_list.update(_frame(1, 2))
+    assert hash_list.missing_frame(_frame(1, 1)) == []
+    assert hash_list.incomplete_frame_lists == []
+    assert [frame.current_frame for frame in hash_list.area[1].data] == [1, 3, 2]
+
+
+def test_index_is_built_from_given_frames() -> None:
+    hash_list = HashList()
+    hash_list.update_root_hash_list(NavGetHashListAck(total_frame=1, current_frame=1, data_couple=[1, 2]))
+    hash_list.update(_frame(1, 1))
+
+    loaded = HashList(root_hash_list=hash_list.root_hash_list, area=hash_list.area)
+
+    assert loaded.missing_hashlist == [2]
+    assert loaded.missing_frame(_frame(1, 1)) == [2, 3]
+
+
+def _points(hash_id: int, current_frame: int, *points: tuple[float, float]) -> NavGetCommDataAck:
+    frame = _frame(hash_id, current_frame, total_frame=2)
+    frame.data_couple = [CommDataCouple(x=x, y=y) for x, y in points]
+    return frame
+
+
+def test_geometry_is_built_when_the_last_frame_arrives() -> None:
+    hash_list = HashList()
+    hash_list.update(_points(1, 2, (3.0, 4.0)))
+    assert hash_list.frame_list(1).enu is None
+
+    hash_list.update(_points(1, 1, (1.0, 2.0), (2.0, 3.0)))
+    enu = hash_list.frame_list(1).enu
+    assert enu.dtype == np.float64
+    assert enu.flags.c_contiguous
+    assert not enu.flags.writeable
+    np.testing.assert_array_equal(enu, [[1.0, 2.0], [2.0, 3.0], [3.0, 4.0]])
+
+    # a changed frame is a new shape
+    hash_list.update(_points(1, 2, (5.0, 6.0)))
+    np.testing.assert_array_equal(hash_list.frame_list(1).enu[-1], [5.0, 6.0])
+
+
+def test_lat_lon_is_converted_once_per_origin() -> None:
+    hash_list = HashList()
+    hash_list.update(_points(1, 1, (10.0, 20.0)))
+    hash_list.update(_points(1, 2, (-5.0, 0.5)))
+    frame_list = hash_list.frame_list(1)
+    converter = CoordinateConverter(0.9, 0.1)
+
+    lla = frame_list.lla(converter)
+    assert frame_list.lla(converter) is lla
+    point = converter.enu_to_lla(20.0, 10.0)
+    np.testing.assert_allclose(lla[0], [point.latitude, point.longitude])
+
+    assert frame_list.lla(CoordinateConverter(0.8, 0.1)) is not lla
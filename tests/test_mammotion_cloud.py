@@ -0,0 +1,146 @@
+"""Account level MQTT events reach the device they are for."""
+
+import asyncio
+from types import SimpleNamespace
+
+from pymammotion.data.mqtt.event import ThingEventPayload
+from pymammotion.mammotion.commands.mammotion_command import MammotionCommand
+from pymammotion.mammotion.devices.mammotion_cloud import MammotionBaseCloudDevice, MammotionCloud
+from pymammotion.mqtt.mammotion_future import MammotionFuture, MammotionFutures
+from pymammotion.proto.luba_msg import LubaMsg
+from pymammotion.proto.mctrl_nav import MctlNav, SvgMessageAckT
+from pymammotion.proto.wire import classify_frame
+from tests.frames import FRAMES, thing_event_payload
+
+TOPIC = "/sys/a1pk/Luba-TEST/app/down/thing/events"
+
+
+def test_route_by_iot_id() -> None:
+    async def run() -> dict[str, list[str]]:
+        cloud = MammotionCloud(SimpleNamespace(), None)
+        received: dict[str, list[str]] = {"IOT-1": [], "IOT-2": [], "account": []}
+
+        def handler(name: str):
+            async def handle(event) -> None:
+                received[name].append(event.iot_id)
+
+            return handle
+
+        for iot_id in ("IOT-1", "IOT-2"):
+            cloud.register_device(iot_id, handler(iot_id), handler(iot_id))
+        stale = handler("IOT-2")
+        cloud.unregister_device("IOT-2", stale)
+        for iot_id in ("IOT-1", "IOT-2", "IOT-3"):
+            await cloud._on_mqtt_message(TOPIC, thing_event_payload(FRAMES["firmware_info"], iot_id), iot_id)
+        cloud.mqtt_message_event.add_subscribers(handler("account"))
+        await cloud._on_mqtt_message(TOPIC, thing_event_payload(FRAMES["firmware_info"], "IOT-3"), "IOT-3")
+        return received
+
+    assert asyncio.run(run()) == {"IOT-1": ["IOT-1"], "IOT-2": ["IOT-2"], "account": ["IOT-3"]}
+
+
+def test_response_futures() -> None:
+    async def run() -> list[bytes]:
+        futures = MammotionFutures()
+        gethash = MammotionFuture("IOT-1", frozenset({("nav", "toapp_gethash_ack")}))
+        any_frame = MammotionFuture("IOT-1")
+        for future in (gethash, any_frame):
+            futures.add(future)
+        # a report answers the command without a known response, not the hash request
+        assert futures.resolve("IOT-1", ("sys", "toapp_report_data"), b"report")
+        assert not futures.resolve("IOT-2", ("nav", "toapp_gethash_ack"), b"other device")
+        assert futures.resolve("IOT-1", ("nav", "toapp_gethash_ack"), b"hash")
+        results = [await future.async_get(1) for future in (gethash, any_frame)]
+        for future in (gethash, any_frame):
+            futures.discard(future)
+        assert len(futures) == 0
+        return results
+
+    assert asyncio.run(run()) == [b"hash", b"report"]
+
+
+def test_device_queues() -> None:
+    """A device that never answers does not hold up the commands of another one."""
+
+    async def run() -> bytes:
+        loop = asyncio.get_running_loop()
+        cloud = MammotionCloud(SimpleNamespace(), None)
+
+        def send_cloud_command(iot_id: str, _command: bytes) -> None:
+            if iot_id == "IOT-2":
+                loop.call_soon_threadsafe(cloud.waiting_queue.resolve, iot_id, ("sys", "toapp_report_data"), b"ok")
+
+        cloud._mqtt_client.get_cloud_client = lambda: SimpleNamespace(send_cloud_command=send_cloud_command)
+        await cloud.on_ready()
+        offline, online = loop.create_future(), loop.create_future()
+        await cloud.queue_command("IOT-1", "get_report_cfg", b"", offline)
+        await cloud.queue_command("IOT-2", "get_report_cfg", b"", online)
+        result = await asyncio.wait_for(online, 1)
+        assert not offline.done()
+        assert cloud.has_queued_commands("IOT-1") is False
+        return result
+
+    assert asyncio.run(run()) == b"ok"
+
+
+def test_svg_answers_commondata_request() -> None:
+    """An svg hash is requested like an area and answered with an svg message."""
+    svg = bytes(LubaMsg(nav=MctlNav(toapp_svg_msg=SvgMessageAckT(data_hash=1001, total_frame=1, current_frame=1))))
+
+    async def run() -> bytes:
+        loop = asyncio.get_running_loop()
+        cloud = MammotionCloud(SimpleNamespace(), None)
+
+        def send_cloud_command(iot_id: str, _command: bytes) -> None:
+            loop.call_soon_threadsafe(cloud.waiting_queue.resolve, iot_id, classify_frame(svg), svg)
+
+        cloud._mqtt_client.get_cloud_client = lambda: SimpleNamespace(send_cloud_command=send_cloud_command)
+        await cloud.on_ready()
+        future = loop.create_future()
+        command = MammotionCommand("Luba-TEST").synchronize_hash_data(hash_num=1001)
+        await cloud.queue_command("IOT-1", "synchronize_hash_data", command, future)
+        return await asyncio.wait_for(future, 1)
+
+    assert asyncio.run(run()) == svg
+
+
+def test_posted_commands_keep_their_priority_and_slot() -> None:
+    """Map requests are posted through the device queue, a stop still goes first."""
+
+    async def run() -> tuple[list[bytes], list[bytes], int]:
+        loop = asyncio.get_running_loop()
+        cloud = MammotionCloud(SimpleNamespace(), None, max_in_flight=1)
+        sent: list[bytes] = []
+        busy = 0
+        most_busy = 0
+
+        def send_cloud_command(iot_id: str, command: bytes) -> None:
+            nonlocal busy, most_busy
+            busy += 1
+            most_busy = max(most_busy, busy)
+            sent.append(command)
+            if command == b"stop":
+                loop.call_soon_threadsafe(cloud.waiting_queue.resolve, iot_id, ("sys", "toapp_report_data"), b"ok")
+            busy -= 1
+
+        cloud._mqtt_client.get_cloud_client = lambda: SimpleNamespace(send_cloud_command=send_cloud_command)
+        posts = [loop.create_future() for _ in range(3)]
+        for index, future in enumerate(posts):
+            await cloud.queue_command("IOT-1", "get_regional_data", b"map %d" % index, future, wait_response=False)
+        stop = loop.create_future()
+        await cloud.queue_command("IOT-1", "cancel_job", b"stop", stop)
+        await cloud.on_ready()
+        results = await asyncio.wait_for(asyncio.gather(*posts, stop), 1)
+        return sent, results, most_busy
+
+    sent, results, most_busy = asyncio.run(run())
+    assert sent == [b"stop", b"map 0", b"map 1", b"map 2"]
+    assert results == [b"", b"", b"", b"ok"]
+    assert most_busy == 1
+
+
+def test_event_without_content_is_skipped() -> None:
+    event = ThingEventPayload({"method": "thing.events", "params": {"iotId": "IOT-1"}})
+
+    # returns before the device is used
+    asyncio.run(MammotionBaseCloudDevice._parse_message_for_device(SimpleNamespace(), event))
@@ -0,0 +1,55 @@
+"""Messages handed over from the linkkit thread reach on_message in order."""
+
+import asyncio
+import threading
+
+import orjson
+
+from pymammotion.mqtt import MammotionMQTT
+from pymammotion.mqtt.topic_router import THING_EVENTS
+from tests.frames import FRAMES, thing_event_payload
+
+
+async def _pump(number: int) -> list[str]:
+    client = MammotionMQTT("cn-shanghai", "a1pk", "Luba-TEST", "secret", "token", None)
+    topic = client._router.topic(THING_EVENTS)
+    received = []
+    done = asyncio.Event()
+
+    async def on_message(_topic: str, payload: dict, iot_id: str) -> None:
+        received.append((payload["id"], iot_id))
+        if len(received) == number:
+            done.set()
+
+    client.on_message = on_message
+    payloads = [orjson.dumps(thing_event_payload(FRAMES["firmware_info"], message_id=str(i))) for i in range(number)]
+    producer = threading.Thread(target=lambda: [client._thing_on_topic_message(topic, p, 0, None) for p in payloads])
+    producer.start()
+    await asyncio.wait_for(done.wait(), 10)
+    producer.join()
+    return received
+
+
+def test_inbox_order() -> None:
+    assert asyncio.run(_pump(200)) == [(str(i), "IOT-TEST") for i in range(200)]
+
+
+def test_handler_tasks_are_kept_until_done() -> None:
+    async def run() -> tuple[int, int]:
+        client = MammotionMQTT("cn-shanghai", "a1pk", "Luba-TEST", "secret", "token", None)
+        topic = client._router.topic(THING_EVENTS)
+        release = asyncio.Event()
+
+        async def on_message(_topic: str, _payload: dict, _iot_id: str) -> None:
+            await release.wait()
+
+        client.on_message = on_message
+        client._forward_message(topic, orjson.dumps({"method": "thing.events", "params": None}))
+        client._forward_message(topic, orjson.dumps(thing_event_payload(FRAMES["firmware_info"])))
+        await asyncio.sleep(0)
+        pending = len(client._message_tasks)
+        release.set()
+        await asyncio.sleep(0.01)
+        return pending, len(client._message_tasks)
+
+    assert asyncio.run(run()) == (1, 0)
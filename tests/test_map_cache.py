@@ -0,0 +1,53 @@
+"""MapCache lets a restarted sync skip the map elements it already has."""
+
+import asyncio
+
+from pymammotion.data.map_cache import MapCache
+from pymammotion.data.model.hash_list import PathType
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck, SvgMessageAckT
+from tests.fakes import FakeYard
+
+
+def _sync(yard: FakeYard, cache: MapCache) -> None:
+    yard.sync.cache = cache
+    assert asyncio.run(yard.sync.run(refresh=True))
+
+
+def test_warm_start_only_fetches_the_root(tmp_path) -> None:
+    _sync(FakeYard(areas=12, frames=3), MapCache(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 12
+
+    yard = FakeYard(areas=12, frames=3)
+    _sync(yard, MapCache(tmp_path))
+
+    # the refresh and the second root frame
+    assert [key for key, _ in yard.requests] == ["get_all_boundary_hash_list", "get_hash_response"]
+    assert sorted(yard.map.area) == yard.hash_ids
+    assert all(len(frames.data) == 3 for frames in yard.map.area.values())
+
+
+def test_hashes_gone_from_the_root_are_evicted(tmp_path) -> None:
+    _sync(FakeYard(areas=4, frames=2), MapCache(tmp_path))
+    _sync(FakeYard(areas=2, frames=2), MapCache(tmp_path))
+
+    assert MapCache(tmp_path).hashes == {1001, 1002}
+
+
+def test_frames_round_trip(tmp_path) -> None:
+    hash_id = 2**63 + 5
+    frames = [
+        NavGetCommDataAck(type=PathType.AREA, hash=hash_id, total_frame=2, current_frame=1, action=8),
+        SvgMessageAckT(type=PathType.SVG, data_hash=hash_id, total_frame=2, current_frame=2),
+    ]
+    MapCache(tmp_path).save({hash_id}, {hash_id: frames})
+
+    assert MapCache(tmp_path).load([hash_id, 7]) == {hash_id: frames}
+
+
+def test_unreadable_entries_are_dropped(tmp_path) -> None:
+    (tmp_path / "9.bin").write_bytes(b"\x00\xff\xff")
+    cache = MapCache(tmp_path)
+
+    assert cache.load([9]) == {}
+    assert cache.hashes == set()
+    assert not (tmp_path / "9.bin").exists()
@@ -0,0 +1,61 @@
+"""MapSync fetches every frame with a bounded window and retries only what is lost."""
+
+import asyncio
+
+from tests.fakes import FakeYard
+
+
+def test_sync_fetches_every_frame_once() -> None:
+    yard = FakeYard(areas=20, frames=3)
+
+    assert asyncio.run(yard.sync.run(refresh=True))
+    assert sorted(yard.map.area) == yard.hash_ids
+    assert all(len(frames.data) == 3 for frames in yard.map.area.values())
+    # the refresh, the root frames and every area frame, nothing twice
+    assert len(yard.requests) == 1 + len(yard.root) - 1 + 20 * 3
+
+
+def test_window_bounds_requests_in_flight() -> None:
+    yard = FakeYard(areas=20, frames=3)
+    yard.sync.window = 3
+    in_flight: list[int] = []
+    send = yard.send
+
+    async def counting_send(key: str, kwargs: dict) -> None:
+        await send(key, kwargs)
+        # answers land in the map, the sent requests not answered yet are in flight
+        in_flight.append(len(yard.requests) - _answered(yard))
+
+    yard.sync._send = counting_send
+    assert asyncio.run(yard.sync.run())
+    assert max(in_flight) <= 3
+
+
+def test_lost_frames_are_requested_again() -> None:
+    yard = FakeYard(areas=4, frames=3, drop=frozenset({("area", 1002, 2), ("root", 1)}))
+    yard.sync.timeout = 0.1
+
+    assert asyncio.run(yard.sync.run(refresh=True))
+    assert len(yard.map.area[1002].data) == 3
+    # only the two lost frames were sent twice
+    assert len(yard.requests) == 1 + 1 + 4 * 3 + 1
+
+
+def test_sync_gives_up_on_unanswered_frames() -> None:
+    yard = FakeYard(areas=2, frames=2)
+    yard.sync.timeout = 0.05
+    yard.sync.attempts = 2
+    send = yard.send
+
+    async def losing_send(key: str, kwargs: dict) -> None:
+        yard.drop.add(("area", 1002, 1))
+        await send(key, kwargs)
+
+    yard.sync._send = losing_send
+    assert not asyncio.run(yard.sync.run())
+    assert 1002 not in yard.map.area
+    assert len(yard.map.area[1001].data) == 2
+
+
+def _answered(yard: FakeYard) -> int:
+    return len(yard.map.root_hash_list.data) + sum(len(frames.data) for frames in yard.map.area.values())
@@ -0,0 +1,46 @@
+"""Movement sends the newest setpoint and stops when setpoints stop arriving."""
+
+import asyncio
+
+from pymammotion.mammotion.control.movement_channel import STOP, MovementChannel
+
+
+def test_latest_setpoint_wins_and_stops() -> None:
+    async def run() -> tuple[list, bool]:
+        sent = []
+
+        async def send(command: tuple) -> None:
+            sent.append(command)
+
+        channel = MovementChannel(send, lambda linear, angular: (linear, angular), rate=100, idle_timeout=0.05)
+        for speed in (10, 20, 30):
+            channel.set(speed, 0)
+        await asyncio.sleep(0.2)
+        return sent, channel.moving
+
+    sent, moving = asyncio.run(run())
+    assert sent[0] == (30, 0)
+    assert set(sent[:-1]) == {(30, 0)}
+    assert sent[-1] == STOP
+    assert not moving
+
+
+def test_stop_setpoint() -> None:
+    async def run() -> list:
+        sent = []
+
+        async def send(command: tuple) -> None:
+            sent.append(command)
+
+        channel = MovementChannel(send, lambda linear, angular: (linear, angular), rate=100, idle_timeout=1)
+        channel.set(50, 0)
+        await asyncio.sleep(0.03)
+        channel.set(*STOP)
+        await asyncio.sleep(0.03)
+        await channel.stop()
+        return sent
+
+    sent = asyncio.run(run())
+    assert sent[0] == (50, 0)
+    assert sent[-2:] == [STOP, STOP]
+    assert STOP not in sent[:-2]
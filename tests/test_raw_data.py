@@ -0,0 +1,38 @@
+"""The LubaMsg view of a MowingDevice is built from RawData and is not serialized with it."""
+
+from pymammotion.data.model.device import MowingDevice
+
+RAW = {"sys": {"toapp_report_data": {"dev": {"battery_val": 80}}}}
+
+
+def test_device_view_follows_the_raw_data() -> None:
+    device = MowingDevice.from_raw(RAW)
+
+    assert device.device.sys == RAW["sys"]
+    assert device.device is device.device
+    device.update_raw({})
+    assert device.device.sys != RAW["sys"]
+
+
+def test_serialized_state_leaves_out_the_device_view() -> None:
+    device = MowingDevice.from_raw(RAW)
+    device.mower_state.product_key = "a1pk"
+
+    serialized = device.to_dict()
+    assert sorted(serialized) == [
+        "err_code_list",
+        "err_code_list_time",
+        "error_codes",
+        "limits",
+        "location",
+        "map",
+        "mower_state",
+        "mowing_state",
+        "mqtt_properties",
+        "report_data",
+    ]
+    restored = MowingDevice.from_dict(serialized)
+    assert restored.mower_state.product_key == "a1pk"
+    # the raw data comes back with the next notifications, or through update_raw
+    restored.update_raw(RAW)
+    assert restored.device.sys == RAW["sys"]
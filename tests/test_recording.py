@@ -0,0 +1,79 @@
+"""Recorded notifications replay into a device the same way they came in."""
+
+import asyncio
+import time
+
+import pytest
+
+from pymammotion.data.recording import NotificationRecorder, NotificationReplayer
+from tests.fakes import SESSION_FRAMES, ReplayDevice
+
+
+def test_replay_rebuilds_the_recorded_state(tmp_path) -> None:
+    path = tmp_path / "session.rec"
+
+    async def record() -> dict:
+        device = ReplayDevice()
+        with NotificationRecorder(path) as recorder:
+            device.set_recorder(recorder)
+            for frame in SESSION_FRAMES:
+                await device.feed_notification(frame)
+        return device.mower.to_dict()
+
+    async def replay() -> dict:
+        device = ReplayDevice()
+        with NotificationReplayer(path) as replayer:
+            frames = [(frame.device, frame.transport, bytes(frame.data)) for frame in replayer]
+            assert frames == [("Luba-REPLAY", "cloud", frame) for frame in SESSION_FRAMES]
+            assert await replayer.replay(device, speed=None) == len(SESSION_FRAMES)
+        return device.mower.to_dict()
+
+    recorded = asyncio.run(record())
+    assert asyncio.run(replay()) == recorded
+
+
+def test_replay_keeps_the_pace_and_filters_devices(tmp_path) -> None:
+    path = tmp_path / "session.rec"
+    with NotificationRecorder(path) as recorder:
+        recorder.record("Luba-REPLAY", "ble", SESSION_FRAMES[0], timestamp=10.0)
+        recorder.record("Luba-OTHER", "ble", SESSION_FRAMES[0], timestamp=10.5)
+        recorder.record("Luba-REPLAY", "ble", SESSION_FRAMES[0], timestamp=11.0)
+
+    async def replay(speed: float | None) -> tuple[int, float]:
+        start = time.monotonic()
+        with NotificationReplayer(path) as replayer:
+            fed = await replayer.replay(ReplayDevice(), speed=speed, device_id="Luba-REPLAY")
+        return fed, time.monotonic() - start
+
+    fed, elapsed = asyncio.run(replay(4.0))
+    assert fed == 2
+    assert elapsed >= 0.25
+    assert asyncio.run(replay(None))[0] == 2
+
+
+def test_truncated_recordings_stop_at_the_last_whole_frame(tmp_path) -> None:
+    path = tmp_path / "session.rec"
+    with NotificationRecorder(path) as recorder:
+        recorder.record("Luba-REPLAY", "cloud", b"first", timestamp=1.0)
+        recorder.record("Luba-REPLAY", "cloud", b"second", timestamp=2.0)
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with NotificationReplayer(path) as replayer:
+        assert [bytes(frame.data) for frame in replayer] == [b"first"]
+
+
+def test_other_files_are_refused(tmp_path) -> None:
+    path = tmp_path / "map.bin"
+    path.write_bytes(b"not a recording")
+
+    with pytest.raises(ValueError, match="not a notification recording"):
+        NotificationReplayer(path)
+
+
+def test_device_ids_over_255_bytes_are_rejected(tmp_path) -> None:
+    with NotificationRecorder(tmp_path / "session.rec") as recorder:
+        with pytest.raises(ValueError, match="255 bytes"):
+            recorder.record("é" * 128, "ble", SESSION_FRAMES[0])
+        recorder.record("é" * 127, "ble", SESSION_FRAMES[0])
+    with NotificationReplayer(tmp_path / "session.rec") as replayer:
+        assert [frame.device for frame in replayer] == ["é" * 127]
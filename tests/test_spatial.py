@@ -0,0 +1,52 @@
+"""SpatialIndex finds the area and obstacle a point is in."""
+
+import numpy as np
+import pytest
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.hash_list import PathType
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck
+from pymammotion.utility.spatial import MapPosition, Polygon, SpatialIndex
+from tests.shapes import naive_locate, square, yard
+
+
+def test_locate_area_obstacle_and_distance() -> None:
+    index = SpatialIndex([(1, square(0, 0, 10)), (2, square(10, 0, 10))], [(3, square(2, 2, 2))])
+
+    assert index.locate(3, 3) == MapPosition(area=1, obstacle=3, boundary_distance=3.0)
+    assert index.locate(15, 1) == MapPosition(area=2, boundary_distance=1.0)
+    assert index.locate(25, 5) == MapPosition()
+    assert index.locate(-100, 5) == MapPosition()
+
+
+def test_nested_areas_resolve_to_the_smallest() -> None:
+    index = SpatialIndex([(1, square(0, 0, 100)), (2, square(40, 40, 10))], [])
+
+    assert index.locate(45, 45).area == 2
+    assert index.locate(20, 20).area == 1
+
+
+def test_index_agrees_with_testing_every_polygon() -> None:
+    areas, obstacles = yard()
+    index = SpatialIndex(areas, obstacles)
+    polygons = [Polygon(hash_id, points) for hash_id, points in areas + obstacles]
+
+    for x, y in np.random.default_rng(1).uniform(-20, 600, (200, 2)):
+        position = index.locate(x, y)
+        assert sorted(hash_id for hash_id in (position.area, position.obstacle) if hash_id) == sorted(
+            naive_locate(polygons, x, y)
+        )
+
+
+def test_device_location_follows_the_map() -> None:
+    device = MowingDevice()
+    frame = NavGetCommDataAck(type=PathType.AREA, hash=7, total_frame=1, current_frame=1)
+    frame.data_couple = [CommDataCouple(x=x, y=y) for x, y in square(0, 0, 10)]
+    device.map.update(frame)
+
+    device._locate(4.0, 2.5)
+
+    assert device.location.area_hash == 7
+    assert device.location.obstacle_hash == 0
+    assert device.location.boundary_distance == pytest.approx(2.5)
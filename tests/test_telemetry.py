@@ -0,0 +1,88 @@
+"""TelemetryBuffer keeps a fixed window of samples and reads it back as views."""
+
+import numpy as np
+import pytest
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.telemetry import TelemetryBuffer
+from pymammotion.proto.mctrl_sys import (
+    ReportInfoData,
+    RptDevLocation,
+    RptDevStatus,
+    RptRtk,
+    SystemRapidStateTunnelMsg,
+)
+
+
+def _raw(x: float, y: float, stars: int = 20) -> list[int]:
+    return [4, 0, stars, 0, 150, 160, 0, int(x * 1e8), int(y * 1e8), 31415, 0, 7]
+
+
+def test_wrapped_ring_reads_back_in_order() -> None:
+    buffer = TelemetryBuffer(capacity=5)
+    for second in range(8):
+        buffer.append_rapid_state(_raw(second, 0), timestamp=float(second))
+
+    assert len(buffer) == 5
+    views = buffer.views()
+    assert len(views) == 2
+    assert all(np.shares_memory(view, buffer._data) for view in views)
+    assert buffer.window()["timestamp"].tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert buffer.window()["pos_x"].tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+
+
+def test_exactly_full_ring_reads_back() -> None:
+    buffer = TelemetryBuffer(capacity=4)
+    for second in range(4):
+        buffer.append_rapid_state(_raw(second, 0), timestamp=float(second))
+
+    assert buffer.window()["timestamp"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert buffer.window(1.0, 3.0)["timestamp"].tolist() == [1.0, 2.0]
+
+
+def test_window_is_half_open_and_a_view_when_not_wrapped() -> None:
+    buffer = TelemetryBuffer(capacity=10)
+    for second in range(6):
+        buffer.append_rapid_state(_raw(0, 0), timestamp=float(second))
+
+    window = buffer.window(2.0, 4.0)
+    assert window["timestamp"].tolist() == [2.0, 3.0]
+    assert np.shares_memory(window, buffer._data)
+    assert len(buffer.window(10.0)) == 0
+
+
+def test_downsample_keeps_the_last_sample_of_every_bucket() -> None:
+    buffer = TelemetryBuffer(capacity=100)
+    for second in range(25):
+        buffer.append_rapid_state(_raw(second, 0), timestamp=float(second))
+
+    assert buffer.downsample(10.0)["timestamp"].tolist() == [9.0, 19.0, 24.0]
+    assert buffer.downsample(10.0, since=5.0, until=15.0)["timestamp"].tolist() == [9.0, 14.0]
+
+
+def test_reports_carry_the_last_values_forward() -> None:
+    buffer = TelemetryBuffer(capacity=10)
+    buffer.append_rapid_state(_raw(1.5, -2.0), timestamp=1.0)
+    buffer.append_report(ReportInfoData(dev=RptDevStatus(battery_val=80)), timestamp=2.0)
+    buffer.append_report(
+        ReportInfoData(
+            rtk=RptRtk(status=1, gps_stars=9), locations=[RptDevLocation(real_pos_x=30000, real_pos_y=40000)]
+        ),
+        timestamp=3.0,
+    )
+
+    first, battery, rtk = buffer.window()
+    assert first["battery"] == -1
+    assert first["lat_std"] == pytest.approx(0.015)
+    assert (battery["pos_x"], battery["pos_y"], battery["satellites"], battery["battery"]) == (1.5, -2.0, 20, 80)
+    assert (rtk["pos_x"], rtk["pos_y"], rtk["satellites"], rtk["battery"]) == (3.0, 4.0, 9, 80)
+
+
+def test_device_records_rapid_state_and_reports() -> None:
+    device = MowingDevice()
+    device.run_state_update(SystemRapidStateTunnelMsg(rapid_state_data=_raw(2.0, 5.0)))
+    device.update_report_data(ReportInfoData(dev=RptDevStatus(battery_val=55)))
+
+    samples = device.telemetry.window()
+    assert samples["pos_x"].tolist() == [2.0, 2.0]
+    assert samples["battery"].tolist() == [-1, 55]
@@ -0,0 +1,32 @@
+"""ThingEventPayload reads what routing needs from the payload and parses the rest on demand."""
+
+from pymammotion.data.mqtt.event import DeviceProtobufMsgEventParams, ThingEventMessage, ThingEventPayload
+from tests.frames import FRAMES, thing_event_payload
+
+
+def test_routing_fields_come_from_the_payload() -> None:
+    payload = thing_event_payload(FRAMES["firmware_info"], iot_id="IOT-1", message_id="42")
+    event = ThingEventPayload(payload)
+
+    assert (event.method, event.id, event.version) == ("thing.events", "42", "1.0")
+    assert (event.identifier, event.iot_id) == ("device_protobuf_msg_event", "IOT-1")
+    assert (event.device_name, event.product_key) == ("Luba-TEST", "a1pk")
+    assert event.content == payload["params"]["value"]["content"]
+    assert event._event is None
+
+
+def test_message_is_built_once_on_first_use() -> None:
+    event = ThingEventPayload(thing_event_payload(FRAMES["firmware_info"], iot_id="IOT-1"))
+
+    params = event.params
+    assert isinstance(event.event, ThingEventMessage)
+    assert isinstance(params, DeviceProtobufMsgEventParams)
+    assert params.iotId == "IOT-1"
+    assert event.event is event.event
+    assert event.params is params
+
+
+def test_missing_params() -> None:
+    event = ThingEventPayload({"method": "thing.events"})
+
+    assert (event.identifier, event.iot_id, event.content) == (None, "", None)
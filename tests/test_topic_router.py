@@ -0,0 +1,29 @@
+"""Reply and unknown topics are counted and dropped before their payload is parsed."""
+
+from pymammotion.mqtt.topic_router import (
+    BIND_REPLY,
+    REPLY_TOPICS,
+    SUBSCRIBED_TOPICS,
+    THING_EVENTS,
+    UNKNOWN,
+    TopicRouter,
+)
+
+PREFIX = "/sys/a1pk/Luba-TEST"
+
+
+def _router(received: list) -> TopicRouter:
+    router = TopicRouter(PREFIX)
+    for suffix in SUBSCRIBED_TOPICS:
+        router.add_route(suffix, None if suffix in REPLY_TOPICS else lambda *args: received.append(args))
+    return router
+
+
+def test_route() -> None:
+    received = []
+    router = _router(received)
+    assert router.route(f"{PREFIX}{THING_EVENTS}", b"{}")
+    assert not router.route(f"{PREFIX}{BIND_REPLY}", b"not json")
+    assert not router.route(f"{PREFIX}/app/down/thing/other", b"{}")
+    assert received == [(f"{PREFIX}{THING_EVENTS}", b"{}")]
+    assert router.metrics == {THING_EVENTS: 1, BIND_REPLY: 1, UNKNOWN: 1}
@@ -0,0 +1,72 @@
+"""The wire scanner has to agree with a full decode."""
+
+import pytest
+
+from pymammotion.data.model.raw_data import SUB_MESSAGE_GROUPS
+from pymammotion.mammotion.commands.mammotion_command import MammotionCommand
+from pymammotion.proto.codec import get_codec
+from pymammotion.proto.wire import (
+    _SUB_MESSAGES,
+    BLE_SYNC_FRAME,
+    FIELD_NUMBERS,
+    RESPONSE_FRAMES,
+    classify_frame,
+    expected_response,
+    is_keepalive,
+    read_fields,
+)
+from tests.frames import FRAMES
+
+COMMAND = MammotionCommand("Luba-TEST")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        *FRAMES.values(),
+        COMMAND.send_todev_ble_sync(sync_type=3),
+        COMMAND.get_report_cfg(),
+        COMMAND.send_movement(linear_speed=100, angular_speed=0),
+    ],
+)
+def test_classify_frame(data: bytes) -> None:
+    codec = get_codec()
+    group, group_msg = codec.which_one_of(codec.decode(data), "LubaSubMsg")
+    name, _ = codec.which_one_of(group_msg, SUB_MESSAGE_GROUPS[group])
+    assert classify_frame(data) == (group, name)
+
+
+def test_keepalive() -> None:
+    assert classify_frame(COMMAND.send_todev_ble_sync(sync_type=3)) == BLE_SYNC_FRAME
+    assert is_keepalive(COMMAND.send_todev_ble_sync(sync_type=3))
+    assert not any(is_keepalive(data) for data in FRAMES.values())
+    # a sync of 0 is decoded like any other frame
+    assert classify_frame(COMMAND.send_todev_ble_sync(sync_type=0)) == BLE_SYNC_FRAME
+    assert not is_keepalive(COMMAND.send_todev_ble_sync(sync_type=0))
+
+
+@pytest.mark.parametrize("data", [b"", b"\xff\xff", b"\x52", b"\x52\x05"])
+def test_malformed(data: bytes) -> None:
+    assert classify_frame(data)[1] == ""
+
+
+def test_expected_response() -> None:
+    assert expected_response(COMMAND.get_hash_response(total_frame=2, current_frame=1)) == {
+        ("nav", "toapp_gethash_ack")
+    }
+    # svg hashes are fetched with the same request as areas
+    assert ("nav", "toapp_svg_msg") in expected_response(COMMAND.synchronize_hash_data(hash_num=1001))
+    assert expected_response(COMMAND.send_movement(linear_speed=100, angular_speed=0)) is None
+    names = {(group, name) for group, members in _SUB_MESSAGES.values() for name in members.values()}
+    assert set(RESPONSE_FRAMES).union(*RESPONSE_FRAMES.values()) <= names
+
+
+def test_read_fields() -> None:
+    data = COMMAND.get_report_cfg()
+    message = get_codec().decode(data)
+    fields = read_fields(data)
+    assert (fields[1], fields[3]) == (message.msgtype, message.rcver)
+    group_number, sub_number = FIELD_NUMBERS["sys", "todev_report_cfg"]
+    assert read_fields(fields[group_number])[sub_number] == bytes(message.sys.todev_report_cfg)
+    with pytest.raises(IndexError):
+        read_fields(data[:-3])